@@ -1,8 +1,17 @@
+import asyncio
+import io
+from typing import List
 from fastapi import APIRouter, UploadFile, File, HTTPException, Form
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from app.core.extractor import extract_text_from_file
-from app.core.audit import run_audit_on_text, run_audit_on_text_by_page
-from app.api.audit_workflow import update_audit_request, insert_evidence_from_audit_results, get_evidence_results_by_audit_and_document
+from app.core.audit import run_audit_on_text, run_audit_on_pages_scheduled
+from app.api.audit_workflow import update_audit_request, insert_evidence_from_audit_results, get_evidence_results_by_audit_and_document, get_audit_flow
+from app.core.tracing import start_trace
+from app.core.progress import ProgressTracker
+from app.core.checkpoint import AuditCheckpoint
+from app.core.scheduler import audit_scheduler
+from app.core.serialization import ndjson_lines
 from app.settings import LLM_PROVIDER
 
 router = APIRouter()
@@ -12,24 +21,102 @@ class AuditRequest(BaseModel):
     model: str = None
     provider: str = LLM_PROVIDER  # Use default from settings
 
+async def _audit_document(upload: UploadFile, audit_request_id: str, document_id: str, model: str, provider: str,
+                          flow: str, weight: float, progress: ProgressTracker, checkpoint: AuditCheckpoint) -> list:
+    """Extract, evaluate and persist one document, keeping blocking work off the event loop; returns its evidence"""
+    text, pages = await asyncio.wrap_future(audit_scheduler.submit(extract_text_from_file, upload))
+    results = await run_audit_on_pages_scheduled(pages, model=model, provider=provider, progress=progress,
+                                                 flow=flow, weight=weight, checkpoint=checkpoint)
+    await asyncio.to_thread(insert_evidence_from_audit_results, results, audit_request_id, document_id)
+    await asyncio.to_thread(checkpoint.clear)
+    await asyncio.to_thread(progress.finish)
+    return await asyncio.to_thread(get_evidence_results_by_audit_and_document, audit_request_id, document_id)
+
 @router.post('/uploadandaudit')
-async def upload_file(file: UploadFile = File(...), audit_request_id: str = Form(...), document_id: str = Form(...), model: str = "gemini-1.5-flash", provider: str = LLM_PROVIDER):
+async def upload_file(file: UploadFile = File(...), audit_request_id: str = Form(...), document_id: str = Form(...), model: str = "gemini-1.5-flash", provider: str = LLM_PROVIDER,
+                      resume: bool = True):
     # print(f"audit_request_id: {audit_request_id}, document_id: {document_id}")
+    progress = ProgressTracker(audit_request_id, document_id)
+    checkpoint = AuditCheckpoint(audit_request_id, document_id, model, provider)
     try:
-        text, pages = extract_text_from_file(file)
-        # return {"text": text, "pages": pages}
-        # results = run_audit_on_text(text, model, provider)
-        update_audit_request(audit_request_id, "in_progress","Starting LLM Audit")
-        results = run_audit_on_text_by_page(pages, model=model, provider=provider)
-        insert_evidence_from_audit_results(results, audit_request_id, document_id)
-        update_audit_request(audit_request_id, "in_progress","HITL in progress")
-        final_results = get_evidence_results_by_audit_and_document(audit_request_id, document_id)
+        if not resume:
+            await asyncio.to_thread(checkpoint.clear)
+        with start_trace("uploadandaudit", audit_request_id=audit_request_id, document_id=document_id,
+                         filename=file.filename, provider=provider, model=model or ""):
+            # results = run_audit_on_text(text, model, provider)
+            await asyncio.to_thread(update_audit_request, audit_request_id, "in_progress", "Starting LLM Audit")
+            flow, weight = await get_audit_flow(audit_request_id)
+            final_results = await _audit_document(file, audit_request_id, document_id, model, provider, flow, weight,
+                                                   progress, checkpoint)
+            await asyncio.to_thread(update_audit_request, audit_request_id, "in_progress", "HITL in progress")
         
         return {"results": final_results}
 
     except Exception as e:
+        await asyncio.to_thread(progress.finish, "failed")
         raise HTTPException(status_code=400, detail=str(e))
 
+async def _audit_batch_document(upload: UploadFile, audit_request_id: str, document_id: str, model: str, provider: str,
+                                flow: str, weight: float, resume: bool):
+    """Extract, evaluate and persist one document of a batch in its own trace; returns its NDJSON line"""
+    progress = ProgressTracker(audit_request_id, document_id)
+    checkpoint = AuditCheckpoint(audit_request_id, document_id, model, provider)
+    try:
+        # Started here, in the document's task, so the trace context is set and reset in one context
+        with start_trace("uploadandaudit_batch_document", audit_request_id=audit_request_id, document_id=document_id,
+                         filename=upload.filename, provider=provider, model=model or ""):
+            if not resume:
+                await asyncio.to_thread(checkpoint.clear)
+            final_results = await _audit_document(upload, audit_request_id, document_id, model, provider, flow, weight,
+                                                   progress, checkpoint)
+        return {"document_id": document_id, "filename": upload.filename, "status": "completed", "results": final_results}
+    except asyncio.CancelledError:
+        # The client went away; the checkpoint keeps what was evaluated for a resumed run
+        await asyncio.to_thread(progress.finish, "cancelled")
+        raise
+    except Exception as e:
+        await asyncio.to_thread(progress.finish, "failed")
+        return {"document_id": document_id, "filename": upload.filename, "status": "failed", "error": str(e)}
+
+async def _stream_batch_audit(uploads: list, audit_request_id: str, document_ids: list, model: str, provider: str, resume: bool):
+    # No yield inside the trace: an async generator may be resumed in another context than it set it in
+    with start_trace("uploadandaudit_batch", audit_request_id=audit_request_id, documents=len(uploads),
+                     provider=provider, model=model or ""):
+        await asyncio.to_thread(update_audit_request, audit_request_id, "in_progress", "Starting LLM Audit")
+        flow, weight = await get_audit_flow(audit_request_id)
+    tasks = [
+        asyncio.create_task(_audit_batch_document(upload, audit_request_id, document_id, model, provider, flow, weight, resume))
+        for upload, document_id in zip(uploads, document_ids)
+    ]
+    try:
+        completed = failed = 0
+        # One line per document as soon as it is persisted, whatever order they finish in
+        for document in asyncio.as_completed(tasks):
+            line = await document
+            if line["status"] == "completed":
+                completed += 1
+            else:
+                failed += 1
+            yield ndjson_lines([line])
+        await asyncio.to_thread(update_audit_request, audit_request_id, "in_progress", "HITL in progress")
+        yield ndjson_lines([{"status": "finished", "documents": len(uploads), "completed": completed, "failed": failed}])
+    finally:
+        # Client disconnected or the stream was closed early: stop the documents' queued LLM calls
+        for task in tasks:
+            task.cancel()
+
+@router.post('/uploadandaudit/batch')
+async def upload_files_batch(files: List[UploadFile] = File(...), audit_request_id: str = Form(...), document_ids: List[str] = Form(...), model: str = "gemini-1.5-flash", provider: str = LLM_PROVIDER,
+                             resume: bool = True):
+    if len(files) != len(document_ids):
+        raise HTTPException(status_code=400, detail="Provide one document_id per file, in the same order")
+    # Uploads are closed once this handler returns, before the response is streamed
+    uploads = [UploadFile(io.BytesIO(await file.read()), filename=file.filename) for file in files]
+    return StreamingResponse(
+        _stream_batch_audit(uploads, audit_request_id, document_ids, model, provider, resume),
+        media_type="application/x-ndjson",
+    )
+
 @router.post('/run')
 async def run_audit(request: AuditRequest):
     try:
@@ -1,15 +1,27 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from typing import List, Optional, Dict, Any
 from pydantic import BaseModel, Field
 from datetime import datetime, date
 from uuid import uuid4, UUID
 import psycopg
+from psycopg.rows import namedtuple_row
+from psycopg.types.json import Jsonb
+import base64
+import csv
+import hashlib
+import io
 import json
+import math
 import uuid
-from sqlalchemy.orm import Session
-from sqlalchemy import text
-from app.config.database import get_db
 from app.config.database_simple import get_db_connection
+from app.config.database_async import get_async_db_connection
+from app.core.metrics import stage_timer
+from app.core.tracing import span
+from app.core.serialization import json_cursor, ndjson_lines
+from app.core.prepared import execute_prepared, execute_prepared_async
+from app.core.cache import cached_response, WORKFLOW_FRAMEWORKS_KEY
+from app.settings import EVIDENCE_WRITE_MODE, AUDIT_FAIR_SHARE_BY
 
 router = APIRouter(tags=["audit-workflow"])
 
@@ -26,6 +38,45 @@ def row_to_dict(row, columns):
             d[col] = value
     return d
 
+async def _fetch_json_rows(query, params, prepared=False):
+    """
+    Run a read query and return JSON-ready dict rows (see app.core.serialization).
+    prepared=True runs it as a prepared statement (app.core.prepared); use it for
+    hot queries with an explicit column list.
+    """
+    async with get_async_db_connection() as conn, json_cursor(conn) as cursor:
+        if prepared:
+            await execute_prepared_async(cursor, query, params)
+        else:
+            await cursor.execute(query, params)
+        return await cursor.fetchall()
+
+AUDIT_REQUESTS_SQL = "SELECT * FROM intelliaudit_dev.audit_requests ORDER BY created_at DESC"
+AUDIT_REQUEST_SQL = "SELECT * FROM intelliaudit_dev.audit_requests WHERE audit_request_id = %(audit_id)s"
+
+# Hot read queries, kept here so `python migrate.py explain` can check that each one is index-backed
+AUDIT_DOCUMENTS_SQL = "SELECT * FROM intelliaudit_dev.documents WHERE audit_request_id = %(audit_id)s ORDER BY created_at DESC"
+AUDIT_FINDINGS_SQL = "SELECT * FROM intelliaudit_dev.audit_findings WHERE audit_request_id = %(audit_id)s ORDER BY created_at DESC"
+AUDIT_REPORTS_SQL = "SELECT * FROM intelliaudit_dev.reports WHERE audit_request_id = %(audit_id)s ORDER BY created_at DESC"
+AUDIT_LOGS_SQL = "SELECT * FROM intelliaudit_dev.audit_logs WHERE related_id = %(audit_id)s ORDER BY created_at DESC"
+AUDIT_PROGRESS_SQL = "SELECT * FROM intelliaudit_dev.audit_progress WHERE audit_request_id = %(audit_id)s ORDER BY updated_at DESC"
+EVIDENCE_BY_AUDIT_DOCUMENT_SQL = """
+    SELECT 
+        evidence_id,
+        criteria,
+        page_number,
+        extracted_text,
+        ai_explanation,
+        confidence_score,
+        review_status,
+        risk_level,
+        remarks,
+        pages
+    FROM intelliaudit_dev.evidence
+    WHERE audit_request_id = %s AND document_id = %s
+    ORDER BY created_at
+"""
+
 # Pydantic Models matching the exact database schema
 
 class AuditFramework(BaseModel):
@@ -57,6 +108,7 @@ class AuditRequest(BaseModel):
     compliance_score: Optional[float] = None
     risk_assessment: Optional[str] = None
     final_comments: Optional[str] = None
+    priority: int = Field(1, ge=1, le=10)
     created_by: Optional[UUID] = None
     created_at: Optional[datetime] = None
 
@@ -200,75 +252,70 @@ class UserActivityLog(BaseModel):
 #         return frameworks
 #     except Exception as e:
 #         raise HTTPException(status_code=500, detail=f"Failed to fetch audit frameworks: {str(e)}")
-async def get_audit_frameworks():
+async def get_audit_frameworks(request: Request):
     """Get all audit frameworks with their related audit areas"""
     try:
-        conn = get_db_connection()
-        try:
-            with conn.cursor() as cursor:
-                cursor.execute("""
-                    SELECT 
-                        f.framework_id,
-                        f.name,
-                        f.version,
-                        f.created_at,
-                        f.updated_at,
-                        f.created_by,
-                        f.updated_by,
-                        json_agg(
-                            json_build_object(
-                                'audit_area_id', aa.audit_area_id,
-                                'framework_id', aa.framework_id,
-                                'name', aa.name,
-                                'description', aa.description,
-                                'created_at', aa.created_at,
-                                'updated_at', aa.updated_at,
-                                'created_by', aa.created_by,
-                                'updated_by', aa.updated_by
-                            )
-                        ) FILTER (WHERE aa.audit_area_id IS NOT NULL) as audit_areas
-                    FROM intelliaudit_dev.metadata_audit_frameworks f
-                    LEFT JOIN intelliaudit_dev.metadata_audit_areas aa ON f.framework_id = aa.framework_id
-                    GROUP BY f.framework_id, f.name, f.version, f.created_at, f.updated_at, f.created_by, f.updated_by
-                    ORDER BY f.name
-                """)
-                frameworks = []
-                for row in cursor.fetchall():
-                    # Convert audit_areas UUIDs to strings
-                    audit_areas = row[7] if row[7] and row[7] != [None] else []
-                    if isinstance(audit_areas, list):
-                        for area in audit_areas:
-                            for k, v in area.items():
-                                if isinstance(v, uuid.UUID):
-                                    area[k] = str(v)
-                    framework_data = {
-                        "framework_id": str(row[0]) if isinstance(row[0], uuid.UUID) else row[0],
-                        "name": row[1],
-                        "version": row[2],
-                        "created_at": row[3].isoformat() if hasattr(row[3], 'isoformat') else row[3],
-                        "updated_at": row[4].isoformat() if hasattr(row[4], 'isoformat') else row[4],
-                        "created_by": str(row[5]) if isinstance(row[5], uuid.UUID) else row[5],
-                        "updated_by": str(row[6]) if isinstance(row[6], uuid.UUID) else row[6],
-                        "audit_areas": audit_areas
-                    }
-                    frameworks.append(framework_data)
-                return frameworks
-        finally:
-            conn.close()
+        return await cached_response(request, WORKFLOW_FRAMEWORKS_KEY, _load_workflow_frameworks)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch audit frameworks: {str(e)}")
 
+async def _load_workflow_frameworks():
+    async with get_async_db_connection() as conn, conn.cursor() as cursor:
+        await cursor.execute("""
+            SELECT 
+                f.framework_id,
+                f.name,
+                f.version,
+                f.created_at,
+                f.updated_at,
+                f.created_by,
+                f.updated_by,
+                json_agg(
+                    json_build_object(
+                        'audit_area_id', aa.audit_area_id,
+                        'framework_id', aa.framework_id,
+                        'name', aa.name,
+                        'description', aa.description,
+                        'created_at', aa.created_at,
+                        'updated_at', aa.updated_at,
+                        'created_by', aa.created_by,
+                        'updated_by', aa.updated_by
+                    )
+                ) FILTER (WHERE aa.audit_area_id IS NOT NULL) as audit_areas
+            FROM intelliaudit_dev.metadata_audit_frameworks f
+            LEFT JOIN intelliaudit_dev.metadata_audit_areas aa ON f.framework_id = aa.framework_id
+            GROUP BY f.framework_id, f.name, f.version, f.created_at, f.updated_at, f.created_by, f.updated_by
+            ORDER BY f.name
+        """)
+        frameworks = []
+        for row in await cursor.fetchall():
+            # Convert audit_areas UUIDs to strings
+            audit_areas = row[7] if row[7] and row[7] != [None] else []
+            if isinstance(audit_areas, list):
+                for area in audit_areas:
+                    for k, v in area.items():
+                        if isinstance(v, uuid.UUID):
+                            area[k] = str(v)
+            framework_data = {
+                "framework_id": str(row[0]) if isinstance(row[0], uuid.UUID) else row[0],
+                "name": row[1],
+                "version": row[2],
+                "created_at": row[3].isoformat() if hasattr(row[3], 'isoformat') else row[3],
+                "updated_at": row[4].isoformat() if hasattr(row[4], 'isoformat') else row[4],
+                "created_by": str(row[5]) if isinstance(row[5], uuid.UUID) else row[5],
+                "updated_by": str(row[6]) if isinstance(row[6], uuid.UUID) else row[6],
+                "audit_areas": audit_areas
+            }
+            frameworks.append(framework_data)
+        return frameworks
+
 @router.get("/areas", response_model=List[Dict[str, Any]])
-async def get_audit_areas(db: Session = Depends(get_db)):
+async def get_audit_areas():
     """Get all audit areas"""
     try:
-        result = db.execute(text("SELECT id, audit_framework_id, name, description, created_at FROM metadata_audit_areas ORDER BY name"))
-        areas = []
-        columns = [desc[0] for desc in result.cursor.description]
-        for row in result:
-            area_dict = row_to_dict(row, columns)
-            areas.append(area_dict)
-        return areas
+        return ORJSONResponse(await _fetch_json_rows(
+            "SELECT id, audit_framework_id, name, description, created_at FROM intelliaudit_dev.metadata_audit_areas ORDER BY name", None
+        ))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch audit areas: {str(e)}")
 
@@ -331,51 +378,48 @@ async def create_audit_request(audit: AuditRequest):
     try:
         audit_request_id = uuid4()
         now = datetime.utcnow()
-        conn = get_db_connection()
-        try:
-            with conn.cursor() as cursor:
-                cursor.execute("""
-                    INSERT INTO intelliaudit_dev.audit_requests (
-                        audit_request_id, audit_name, framework_id, audit_areas,
-                        status, current_step, started_at, last_active_at, created_at
-                    ) VALUES (
-                        %s, %s, %s, %s,
-                        %s, %s, %s, %s, %s
-                    ) RETURNING audit_request_id, audit_name
-                """, (
-                    str(audit_request_id),
-                    audit.audit_name,
-                    str(audit.framework_id) if audit.framework_id else None,
-                    audit.audit_areas,  # Should be a list or JSON-serializable
-                    audit.status,
-                    audit.current_step,
-                    now,
-                    now,
-                    now
-                ))
+        async with get_async_db_connection() as conn, conn.cursor() as cursor:
+            await cursor.execute("""
+                INSERT INTO intelliaudit_dev.audit_requests (
+                    audit_request_id, audit_name, framework_id, audit_areas,
+                    status, current_step, started_at, last_active_at, priority, created_by, created_at
+                ) VALUES (
+                    %s, %s, %s, %s,
+                    %s, %s, %s, %s, %s, %s, %s
+                ) RETURNING audit_request_id, audit_name
+            """, (
+                str(audit_request_id),
+                audit.audit_name,
+                str(audit.framework_id) if audit.framework_id else None,
+                audit.audit_areas,  # Should be a list or JSON-serializable
+                audit.status,
+                audit.current_step,
+                now,
+                now,
+                audit.priority,
+                str(audit.created_by) if audit.created_by else None,
+                now
+            ))
 
-                row = cursor.fetchone()
-                conn.commit()
+            row = await cursor.fetchone()
+            await conn.commit()
 
-                return {
-                    "audit_request_id": str(row[0]),
-                    "audit_name": row[1]
-                }
-
-        finally:
-            conn.close()
+            return {
+                "audit_request_id": str(row[0]),
+                "audit_name": row[1]
+            }
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to create audit request: {str(e)}")
 
 
-async def update_audit_request(audit_request_id: str, status: str, current_step: str):
-    """Update an audit request and return 'Success' on success"""
+def update_audit_request(audit_request_id: str, status: str, current_step: str):
+    """Update an audit request's status and current step (called synchronously from the audit pipeline)"""
     try:
         conn = get_db_connection()
         now = datetime.utcnow()
         try:
-            with conn.cursor() as cursor:
+            with conn.cursor() as cursor, stage_timer("db_write"):
                 cursor.execute("""
                 UPDATE intelliaudit_dev.audit_requests
                 SET status = %s, current_step = %s, started_at = %s, last_active_at = %s, updated_at = %s
@@ -395,31 +439,39 @@ async def update_audit_request(audit_request_id: str, status: str, current_step:
         raise HTTPException(status_code=500, detail=f"Failed to update audit request: {str(e)}")
 
 
+AUDIT_SCHEDULING_SQL = "SELECT priority, created_by FROM intelliaudit_dev.audit_requests WHERE audit_request_id = %s"
+
+async def get_audit_flow(audit_request_id: str):
+    """Scheduler flow and weight for an audit's LLM calls (see app/core/scheduler.py)"""
+    try:
+        async with get_async_db_connection() as conn, conn.cursor() as cursor:
+            await cursor.execute(AUDIT_SCHEDULING_SQL, (audit_request_id,))
+            row = await cursor.fetchone()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to load audit priority: {str(e)}")
+    priority, created_by = row if row else (1, None)
+    if AUDIT_FAIR_SHARE_BY == "user" and created_by:
+        return f"user:{created_by}", float(priority)
+    return f"audit:{audit_request_id}", float(priority)
+
 @router.get("/audits", response_model=List[Dict[str, Any]])
-async def get_audit_requests(db: Session = Depends(get_db)):
+async def get_audit_requests():
     """Get all audit requests"""
     try:
-        result = db.execute(text("SELECT * FROM audit_requests ORDER BY created_at DESC"))
-        audits = []
-        columns = [desc[0] for desc in result.cursor.description]
-        for row in result:
-            audits.append(row_to_dict(row, columns))
-        return audits
+        return ORJSONResponse(await _fetch_json_rows(AUDIT_REQUESTS_SQL, None))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch audit requests: {str(e)}")
 
 @router.get("/audits/{audit_id}", response_model=Dict[str, Any])
-async def get_audit_request(audit_id: UUID, db: Session = Depends(get_db)):
+async def get_audit_request(audit_id: UUID):
     """Get a specific audit request"""
     try:
-        result = db.execute(text("SELECT * FROM audit_requests WHERE id = :audit_id"), {"audit_id": str(audit_id)})
-        row = result.fetchone()
-        
-        if not row:
+        rows = await _fetch_json_rows(AUDIT_REQUEST_SQL, {"audit_id": str(audit_id)})
+        if not rows:
             raise HTTPException(status_code=404, detail="Audit request not found")
-        
-        columns = [desc[0] for desc in result.cursor.description]
-        return row_to_dict(row, columns)
+        return ORJSONResponse(rows[0])
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch audit request: {str(e)}")
 
@@ -429,95 +481,85 @@ async def create_document(document: DocumentRequest):
     try:
         document_id = uuid4()
         now = datetime.utcnow()
-        conn = get_db_connection()
-        try:
-            with conn.cursor() as cursor:
-                cursor.execute("""
-                    INSERT INTO documents (
-                        document_id, audit_request_id, name, file_type, file_size_kb,
-                        upload_source, status, updated_at, created_at
-                    ) VALUES (
-                        %s, %s, %s, %s,
-                        %s, %s, %s, %s, %s
-                    ) RETURNING document_id, name
-                """, (
-                    str(document_id),
-                    str(document.audit_request_id),
-                    document.name,
-                    document.file_type,
-                    document.file_size_kb,
-                    document.upload_source,
-                    document.status,
-                    now,
-                    now
-                ))
-
-                row = cursor.fetchone()
-                conn.commit()
+        async with get_async_db_connection() as conn, conn.cursor() as cursor:
+            await cursor.execute("""
+                INSERT INTO intelliaudit_dev.documents (
+                    document_id, audit_request_id, name, file_type, file_size_kb,
+                    upload_source, status, updated_at, created_at
+                ) VALUES (
+                    %s, %s, %s, %s,
+                    %s, %s, %s, %s, %s
+                ) RETURNING document_id, name
+            """, (
+                str(document_id),
+                str(document.audit_request_id),
+                document.name,
+                document.file_type,
+                document.file_size_kb,
+                document.upload_source,
+                document.status,
+                now,
+                now
+            ))
 
-                return {
-                    "document_id": str(row[0]),
-                    "name": row[1]
-                }
+            row = await cursor.fetchone()
+            await conn.commit()
 
-        finally:
-            conn.close()
+            return {
+                "document_id": str(row[0]),
+                "name": row[1]
+            }
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to create document: {str(e)}")
         
 
 @router.get("/audits/{audit_id}/documents", response_model=List[Dict[str, Any]])
-async def get_audit_documents(audit_id: UUID, db: Session = Depends(get_db)):
+async def get_audit_documents(audit_id: UUID):
     """Get all documents for an audit request"""
     try:
-        result = db.execute(text("SELECT * FROM documents WHERE audit_id = :audit_id ORDER BY uploaded_at DESC"), {"audit_id": str(audit_id)})
-        documents = []
-        columns = [desc[0] for desc in result.cursor.description]
-        for row in result:
-            documents.append(row_to_dict(row, columns))
-        return documents
+        return ORJSONResponse(await _fetch_json_rows(AUDIT_DOCUMENTS_SQL, {"audit_id": str(audit_id)}))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch documents: {str(e)}")
 
 @router.post("/evidence", response_model=Evidence)
-async def create_evidence(evidence: Evidence, db: Session = Depends(get_db)):
+async def create_evidence(evidence: Evidence):
     """Create new evidence"""
     try:
         evidence_id = uuid4()
         now = datetime.utcnow()
         
-        query = text("""
-            INSERT INTO evidence (
+        query = """
+            INSERT INTO intelliaudit_dev.evidence (
                 id, audit_id, document_id, audit_area, checklist_item, definition,
                 page_number, extracted_text, ai_explanation, confidence_score,
                 reviewed_by, review_status, reviewed_at, created_at
             ) VALUES (
-                :id, :audit_id, :document_id, :audit_area, :checklist_item, :definition,
-                :page_number, :extracted_text, :ai_explanation, :confidence_score,
-                :reviewed_by, :review_status, :reviewed_at, :created_at
+                %(id)s, %(audit_id)s, %(document_id)s, %(audit_area)s, %(checklist_item)s, %(definition)s,
+                %(page_number)s, %(extracted_text)s, %(ai_explanation)s, %(confidence_score)s,
+                %(reviewed_by)s, %(review_status)s, %(reviewed_at)s, %(created_at)s
             ) RETURNING *
-        """)
+        """
         
-        result = db.execute(query, {
-            "id": str(evidence_id),
-            "audit_id": str(evidence.audit_id),
-            "document_id": str(evidence.document_id),
-            "audit_area": evidence.audit_area,
-            "checklist_item": evidence.checklist_item,
-            "definition": evidence.definition,
-            "page_number": evidence.page_number,
-            "extracted_text": evidence.extracted_text,
-            "ai_explanation": json.dumps(evidence.ai_explanation) if evidence.ai_explanation else None,
-            "confidence_score": evidence.confidence_score,
-            "reviewed_by": str(evidence.reviewed_by) if evidence.reviewed_by else None,
-            "review_status": evidence.review_status,
-            "reviewed_at": evidence.reviewed_at,
-            "created_at": now
-        })
-        
-        db.commit()
-        row = result.fetchone()
+        async with get_async_db_connection() as conn, conn.cursor(row_factory=namedtuple_row) as cursor:
+            await cursor.execute(query, {
+                "id": str(evidence_id),
+                "audit_id": str(evidence.audit_id),
+                "document_id": str(evidence.document_id),
+                "audit_area": evidence.audit_area,
+                "checklist_item": evidence.checklist_item,
+                "definition": evidence.definition,
+                "page_number": evidence.page_number,
+                "extracted_text": evidence.extracted_text,
+                "ai_explanation": json.dumps(evidence.ai_explanation) if evidence.ai_explanation else None,
+                "confidence_score": evidence.confidence_score,
+                "reviewed_by": str(evidence.reviewed_by) if evidence.reviewed_by else None,
+                "review_status": evidence.review_status,
+                "reviewed_at": evidence.reviewed_at,
+                "created_at": now
+            })
+            row = await cursor.fetchone()
+            await conn.commit()
         
         return Evidence(
             id=row.id,
@@ -536,66 +578,220 @@ async def create_evidence(evidence: Evidence, db: Session = Depends(get_db)):
             created_at=row.created_at
         )
     except Exception as e:
-        db.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to create evidence: {str(e)}")
 
-def insert_evidence_from_audit_results(results: list, audit_request_id: str, document_id: str):
+EVIDENCE_UPSERT_BATCH_SIZE = 500
+
+def evidence_key(criteria: Optional[str], page, evidence_text: Optional[str]) -> str:
+    """
+    Natural key of an evidence row: criterion, page and a hash of the extracted
+    text. Must match the backfill in migrations/0002_evidence_key.sql.
+    """
+    text_hash = hashlib.md5((evidence_text or "").encode()).hexdigest()
+    return hashlib.md5(f"{criteria or ''}|{'' if page is None else page}|{text_hash}".encode()).hexdigest()
+
+# New keys are inserted; existing keys only get the AI-produced columns, and only when they changed,
+# so unchanged rows are not rewritten and review_status / annotation / reviewed_* are kept
+EVIDENCE_UPSERT_SQL = """
+    INSERT INTO intelliaudit_dev.evidence (
+        evidence_id, audit_request_id, document_id, evidence_key,
+        criteria, page_number, pages, extracted_text,
+        ai_explanation, confidence_score, review_status, remarks, risk_level,
+        created_at, updated_at
+    )
+    SELECT
+        evidence_id, %(audit_request_id)s, %(document_id)s, evidence_key,
+        criteria, page_number, string_to_array(pages, ',')::int[], extracted_text,
+        ai_explanation, confidence_score, 'pending', remarks, risk_level,
+        %(now)s, %(now)s
+    FROM unnest(
+        %(evidence_ids)s::uuid[], %(evidence_keys)s::text[], %(criteria)s::jsonb[], %(page_numbers)s::int[],
+        %(pages)s::text[], %(texts)s::text[], %(explanations)s::jsonb[], %(scores)s::numeric[], %(remarks)s::text[],
+        %(risk_levels)s::text[]
+    ) AS r(evidence_id, evidence_key, criteria, page_number, pages, extracted_text,
+           ai_explanation, confidence_score, remarks, risk_level)
+    ON CONFLICT (audit_request_id, document_id, evidence_key) DO UPDATE SET
+        criteria = EXCLUDED.criteria,
+        pages = EXCLUDED.pages,
+        ai_explanation = EXCLUDED.ai_explanation,
+        confidence_score = EXCLUDED.confidence_score,
+        remarks = EXCLUDED.remarks,
+        risk_level = EXCLUDED.risk_level,
+        updated_at = EXCLUDED.updated_at
+    WHERE (evidence.criteria, evidence.pages, evidence.ai_explanation, evidence.confidence_score, evidence.remarks, evidence.risk_level)
+        IS DISTINCT FROM
+        (EXCLUDED.criteria, EXCLUDED.pages, EXCLUDED.ai_explanation, EXCLUDED.confidence_score, EXCLUDED.remarks, EXCLUDED.risk_level)
+    RETURNING (xmax = 0) AS inserted
+"""
+
+# Evidence the latest audit no longer produced, plus legacy rows without a key. The key hashes the LLM's
+# wording, which varies between runs, so rows a reviewer has reviewed or annotated are kept regardless
+EVIDENCE_DELETE_STALE_SQL = """
+    DELETE FROM intelliaudit_dev.evidence
+    WHERE audit_request_id = %s AND document_id = %s
+      AND (evidence_key IS NULL OR evidence_key <> ALL(%s::text[]))
+      AND COALESCE(review_status, 'pending') = 'pending'
+      AND (annotation IS NULL OR annotation IN ('null'::jsonb, '{}'::jsonb))
+"""
+
+def _text_or_none(value):
+    return None if value is None else str(value)
+
+def _score(value):
+    """A compliance score as a finite number, "85%" included; anything else ("N/A", "High") is None"""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        number = value
+    else:
+        try:
+            number = float(str(value).strip().rstrip("%"))
+        except (TypeError, ValueError):
+            return None
+    return number if math.isfinite(number) else None
+
+def _page_int(page) -> Optional[int]:
+    """A page number as int; an integral float or numeric string is converted, anything else is None"""
+    if isinstance(page, bool):
+        return None
+    if isinstance(page, int):
+        return page
+    try:
+        number = float(page)
+    except (TypeError, ValueError):
+        return None
+    return int(number) if number.is_integer() else None
+
+def _page_ints(result: dict) -> Optional[list]:
+    """The result's pages as ints, dropping any that are not page numbers"""
+    pages = result.get("pages")
+    if pages is None:
+        return None
+    return [number for number in map(_page_int, pages) if number is not None]
+
+def _merge_evidence(cursor, results: list, audit_request_id: str, document_id: str, now: datetime):
+    """Upsert results by evidence_key in batches, then drop rows the audit no longer produced"""
+    rows = {}
+    for result in results:
+        key = evidence_key(result.get("criteria"), result.get("page"), result.get("evidence"))
+        # Same criterion, page and text twice in one run is one piece of evidence; the last one wins
+        rows[key] = result
+
+    items = list(rows.items())
+    inserted = changed = 0
+    for start in range(0, len(items), EVIDENCE_UPSERT_BATCH_SIZE):
+        batch = items[start:start + EVIDENCE_UPSERT_BATCH_SIZE]
+        cursor.execute(EVIDENCE_UPSERT_SQL, {
+            "audit_request_id": str(audit_request_id),
+            "document_id": str(document_id),
+            "now": now,
+            "evidence_ids": [uuid4() for _ in batch],
+            "evidence_keys": [key for key, _ in batch],
+            "criteria": [Jsonb({
+                "criteria": result.get("criteria"),
+                "category": result.get("category"),
+                "factor": result.get("factor", "")
+            }) for _, result in batch],
+            # Normalized to int here: one non-integer page would otherwise fail the ::int[] cast of the whole batch
+            "page_numbers": [_page_int(result.get("page")) for _, result in batch],
+            # Comma-joined per row, since the page lists differ in length and cannot form one 2-D array
+            "pages": [None if pages is None else ",".join(map(str, pages))
+                      for pages in (_page_ints(result) for _, result in batch)],
+            "texts": [result.get("evidence") for _, result in batch],
+            "explanations": [Jsonb(result.get("explanation")) for _, result in batch],
+            # Normalized to a number here for the same reason; one "N/A" would fail the ::numeric[] cast
+            "scores": [_text_or_none(_score(result.get("compliance_score", 0))) for _, result in batch],
+            "remarks": [result.get("remarks", "") for _, result in batch],
+            "risk_levels": [result.get("risk_level", "") for _, result in batch],
+        })
+        for (was_inserted,) in cursor.fetchall():
+            if was_inserted:
+                inserted += 1
+            else:
+                changed += 1
+
+    cursor.execute(EVIDENCE_DELETE_STALE_SQL, (str(audit_request_id), str(document_id), list(rows)))
+    print(f"Merged {len(rows)} evidence records: {inserted} new, {changed} changed, "
+          f"{len(rows) - inserted - changed} unchanged, {cursor.rowcount} removed")
+
+def _replace_evidence(cursor, results: list, audit_request_id: str, document_id: str, now: datetime):
+    """Delete every row for the document and insert the results as new, pending evidence"""
+    cursor.execute("""
+        DELETE FROM intelliaudit_dev.evidence
+        WHERE audit_request_id = %s AND document_id = %s
+    """, (str(audit_request_id), str(document_id)))
+
+    print(f"Inserting {len(results)} evidence records (LLM already filtered for evidence)")
+
+    # Insert all results since LLM only responds when evidence is found
+    seen_keys = set()
+    for result in results:
+        evidence_id = uuid4()
+        key = evidence_key(result.get("criteria"), result.get("page"), result.get("evidence"))
+        # Keys are unique per document; a repeat in the same run is stored without one
+        stored_key = key if key not in seen_keys else None
+        seen_keys.add(key)
+        criteria_json = {
+            "criteria": result.get("criteria"),
+            "category": result.get("category"),
+            "factor": result.get("factor", "")
+        }
+        cursor.execute("""
+            INSERT INTO intelliaudit_dev.evidence (
+                evidence_id, audit_request_id, document_id, evidence_key,
+                criteria, page_number, pages, extracted_text,
+                ai_explanation, confidence_score, review_status, remarks, risk_level,
+                created_at, updated_at
+            ) VALUES (
+                %s, %s, %s, %s,
+                %s, %s, %s, %s,
+                %s, %s, %s,
+                %s, %s, %s, %s
+            )
+        """, (
+            str(evidence_id),
+            str(audit_request_id),
+            str(document_id),
+            stored_key,
+            json.dumps(criteria_json),
+            _page_int(result.get("page")),
+            _page_ints(result),
+            result.get("evidence"),
+            json.dumps(result.get("explanation")),
+            _score(result.get("compliance_score", 0)),
+            "pending",
+            result.get("remarks", ""),
+            result.get("risk_level", ""),
+            now,
+            now
+        ))
+
+@span("insert_evidence_from_audit_results")
+@stage_timer("db_write")
+def insert_evidence_from_audit_results(results: list, audit_request_id: str, document_id: str,
+                                       mode: str = EVIDENCE_WRITE_MODE):
     """
-    Deletes old records and inserts new audit result evidence rows 
-    into intelliaudit_dev.evidence table.
-    
+    Persists audit result evidence rows into intelliaudit_dev.evidence.
+
+    In "merge" mode (default) rows are matched on evidence_key, so a re-audit
+    only writes evidence that is new or changed and keeps reviewers' status
+    and annotations. "replace" deletes the document's evidence and inserts
+    everything again.
+
     :param results: Output from run_audit_on_text_by_page (list of dicts)
     :param audit_request_id: UUID of the audit request
     :param document_id: UUID of the document
+    :param mode: "merge" or "replace"
     """
     try:
         conn = get_db_connection()
         now = datetime.utcnow()
 
         with conn.cursor() as cursor:
-            # First delete existing records for this audit request and document
-            cursor.execute("""
-                DELETE FROM intelliaudit_dev.evidence
-                WHERE audit_request_id = %s AND document_id = %s
-            """, (str(audit_request_id), str(document_id)))
-
-            print(f"Inserting {len(results)} evidence records (LLM already filtered for evidence)")
-
-            # Insert all results since LLM only responds when evidence is found
-            for result in results:
-                evidence_id = uuid4()
-                criteria_json = {
-                    "criteria": result.get("criteria"),
-                    "category": result.get("category"),
-                    "factor": result.get("factor", "")
-                }
-                cursor.execute("""
-                    INSERT INTO intelliaudit_dev.evidence (
-                        evidence_id, audit_request_id, document_id,
-                        criteria, page_number, extracted_text,
-                        ai_explanation, confidence_score, review_status, remarks, risk_level,
-                        created_at, updated_at
-                    ) VALUES (
-                        %s, %s, %s,
-                        %s, %s, %s,
-                        %s, %s, %s,
-                        %s, %s, %s, %s
-                    )
-                """, (
-                    str(evidence_id),
-                    str(audit_request_id),
-                    str(document_id),
-                    json.dumps(criteria_json),
-                    result.get("page"),
-                    result.get("evidence"),
-                    json.dumps(result.get("explanation")),
-                    result.get("compliance_score", 0),
-                    "pending",
-                    result.get("remarks", ""),
-                    result.get("risk_level", ""),
-                    now,
-                    now
-                ))
+            if mode == "replace":
+                _replace_evidence(cursor, results, audit_request_id, document_id, now)
+            else:
+                _merge_evidence(cursor, results, audit_request_id, document_id, now)
 
         conn.commit()
     except Exception as e:
@@ -604,6 +800,7 @@ def insert_evidence_from_audit_results(results: list, audit_request_id: str, doc
     finally:
         conn.close()
 
+@span("get_evidence_results_by_audit_and_document")
 def get_evidence_results_by_audit_and_document(audit_request_id: str, document_id: str) -> list:
     """
     Fetches inserted evidence records for a given audit_request_id and document_id,
@@ -612,21 +809,7 @@ def get_evidence_results_by_audit_and_document(audit_request_id: str, document_i
     try:
         conn = get_db_connection()
         with conn.cursor() as cursor:
-            cursor.execute("""
-                SELECT 
-                    evidence_id,
-                    criteria,
-                    page_number,
-                    extracted_text,
-                    ai_explanation,
-                    confidence_score,
-                    review_status,
-                    risk_level,
-                    remarks
-                FROM intelliaudit_dev.evidence
-                WHERE audit_request_id = %s AND document_id = %s
-                ORDER BY created_at
-            """, (str(audit_request_id), str(document_id)))
+            execute_prepared(cursor, EVIDENCE_BY_AUDIT_DOCUMENT_SQL, (str(audit_request_id), str(document_id)))
 
             rows = cursor.fetchall()
 
@@ -643,7 +826,8 @@ def get_evidence_results_by_audit_and_document(audit_request_id: str, document_i
                     "compliance_score": float(row[5]) if row[5] is not None else 0,
                     "review_status": row[6],
                     "risk_level": row[7],   # From DB
-                    "remarks": row[8]      # From DB
+                    "remarks": row[8],     # From DB
+                    "pages": row[9] or ([row[2]] if row[2] is not None else [])
                 })
 
             return results
@@ -654,49 +838,191 @@ def get_evidence_results_by_audit_and_document(audit_request_id: str, document_i
         conn.close()
 
 
-@router.get("/audits/{audit_id}/evidence", response_model=List[Dict[str, Any]])
-async def get_audit_evidence(audit_id: UUID, db: Session = Depends(get_db)):
-    """Get all evidence for an audit request"""
+EVIDENCE_LIST_COLUMNS = [
+    "evidence_id", "audit_request_id", "document_id", "criteria", "page_number", "pages", "extracted_text",
+    "ai_explanation", "confidence_score", "annotation", "review_status", "reviewed_by", "reviewed_at",
+    "remarks", "risk_level", "created_at", "updated_at",
+]
+
+def evidence_list_sql(conditions: List[str]) -> str:
+    """Evidence listing query for the given WHERE conditions; takes a trailing LIMIT parameter"""
+    return f"""
+        SELECT {', '.join(EVIDENCE_LIST_COLUMNS)}
+        FROM intelliaudit_dev.evidence
+        WHERE {' AND '.join(conditions)}
+        ORDER BY created_at DESC, evidence_id DESC
+        LIMIT %s
+    """
+
+def _encode_evidence_cursor(created_at, evidence_id) -> str:
+    raw = json.dumps([created_at.isoformat(), str(evidence_id)])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def _decode_evidence_cursor(cursor: str):
     try:
-        result = db.execute(text("SELECT * FROM evidence WHERE audit_id = :audit_id ORDER BY created_at DESC"), {"audit_id": str(audit_id)})
-        evidence_list = []
-        columns = [desc[0] for desc in result.cursor.description]
-        for row in result:
-            evidence_list.append(row_to_dict(row, columns))
-        return evidence_list
+        created_at, evidence_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(created_at), str(UUID(evidence_id))
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+@router.get("/audits/{audit_id}/evidence", response_model=Dict[str, Any])
+async def get_audit_evidence(
+    audit_id: UUID,
+    document_id: Optional[UUID] = None,
+    review_status: Optional[str] = None,
+    risk_level: Optional[str] = None,
+    category: Optional[str] = None,
+    page: Optional[int] = Query(None, ge=1),
+    min_confidence: Optional[float] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+):
+    """
+    Get evidence for an audit request, newest first, one page at a time.
+
+    Keyset pagination on (created_at, evidence_id): pass the returned
+    next_cursor to fetch the following page. Served by the
+    evidence(audit_request_id[, document_id], created_at, evidence_id)
+    indexes, so each page costs the same regardless of its position.
+    """
+    conditions = ["audit_request_id = %s"]
+    params: List[Any] = [str(audit_id)]
+    if document_id:
+        conditions.append("document_id = %s")
+        params.append(str(document_id))
+    if review_status:
+        conditions.append("review_status = %s")
+        params.append(review_status)
+    if risk_level:
+        conditions.append("risk_level = %s")
+        params.append(risk_level)
+    if category:
+        conditions.append("criteria->>'category' = %s")
+        params.append(category)
+    if page is not None:
+        conditions.append("page_number = %s")
+        params.append(page)
+    if min_confidence is not None:
+        conditions.append("confidence_score >= %s")
+        params.append(min_confidence)
+    if cursor:
+        cursor_created_at, cursor_evidence_id = _decode_evidence_cursor(cursor)
+        conditions.append("(created_at, evidence_id) < (%s, %s)")
+        params.extend([cursor_created_at, cursor_evidence_id])
+
+    try:
+        rows = await _fetch_json_rows(evidence_list_sql(conditions), (*params, limit + 1), prepared=True)
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        next_cursor = None
+        if has_more:
+            next_cursor = _encode_evidence_cursor(rows[-1]["created_at"], rows[-1]["evidence_id"])
+
+        return ORJSONResponse({
+            "items": rows,
+            "next_cursor": next_cursor,
+            "limit": limit,
+        })
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch evidence: {str(e)}")
 
+EVIDENCE_EXPORT_BATCH_SIZE = 2000
+EVIDENCE_EXPORT_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+def evidence_export_sql(by_document: bool) -> str:
+    """Full evidence export for an audit (optionally one document), oldest first"""
+    document_filter = " AND document_id = %s" if by_document else ""
+    return f"""
+        SELECT {', '.join(EVIDENCE_LIST_COLUMNS)}
+        FROM intelliaudit_dev.evidence
+        WHERE audit_request_id = %s{document_filter}
+        ORDER BY created_at, evidence_id
+    """
+
+def _export_csv_cell(value):
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return value
+
+async def _stream_evidence_export(audit_id: UUID, document_id: Optional[UUID], export_format: str):
+    """
+    Yield the export one batch at a time from a named (server-side) cursor, so
+    memory stays bounded by EVIDENCE_EXPORT_BATCH_SIZE rows whatever the audit
+    size. The cursor lives in a single transaction, which also works through
+    the transaction-mode pooler.
+    """
+    if export_format == "csv":
+        # Header goes out before the query runs so the client sees bytes immediately
+        yield ",".join(EVIDENCE_LIST_COLUMNS) + "\r\n"
+
+    params = [str(audit_id)] + ([str(document_id)] if document_id else [])
+    cursor_name = f"evidence_export_{uuid4().hex}"
+    async with get_async_db_connection() as conn:
+        async with (json_cursor(conn, name=cursor_name) if export_format == "ndjson" else conn.cursor(name=cursor_name)) as cur:
+            cur.itersize = EVIDENCE_EXPORT_BATCH_SIZE
+            await cur.execute(evidence_export_sql(document_id is not None), params)
+            while True:
+                rows = await cur.fetchmany(EVIDENCE_EXPORT_BATCH_SIZE)
+                if not rows:
+                    break
+                if export_format == "csv":
+                    buffer = io.StringIO()
+                    writer = csv.writer(buffer)
+                    for row in rows:
+                        writer.writerow([_export_csv_cell(value) for value in row_to_dict(row, EVIDENCE_LIST_COLUMNS).values()])
+                    yield buffer.getvalue()
+                else:
+                    yield ndjson_lines(rows)
+
+@router.get("/audits/{audit_id}/evidence/export")
+async def export_audit_evidence(
+    audit_id: UUID,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    document_id: Optional[UUID] = None,
+):
+    """
+    Stream every evidence row for an audit as NDJSON (one JSON object per
+    line) or CSV, oldest first.
+    """
+    return StreamingResponse(
+        _stream_evidence_export(audit_id, document_id, format),
+        media_type=EVIDENCE_EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="evidence-{audit_id}.{format}"'},
+    )
+
 @router.post("/findings", response_model=AuditFinding)
-async def create_finding(finding: AuditFinding, db: Session = Depends(get_db)):
+async def create_finding(finding: AuditFinding):
     """Create a new audit finding"""
     try:
         finding_id = uuid4()
         now = datetime.utcnow()
         
-        query = text("""
-            INSERT INTO audit_findings (
+        query = """
+            INSERT INTO intelliaudit_dev.audit_findings (
                 id, audit_id, finding_type, description, ai_suggestion,
                 reviewed_by, resolved, created_at
             ) VALUES (
-                :id, :audit_id, :finding_type, :description, :ai_suggestion,
-                :reviewed_by, :resolved, :created_at
+                %(id)s, %(audit_id)s, %(finding_type)s, %(description)s, %(ai_suggestion)s,
+                %(reviewed_by)s, %(resolved)s, %(created_at)s
             ) RETURNING *
-        """)
-        
-        result = db.execute(query, {
-            "id": str(finding_id),
-            "audit_id": str(finding.audit_id),
-            "finding_type": finding.finding_type,
-            "description": finding.description,
-            "ai_suggestion": finding.ai_suggestion,
-            "reviewed_by": str(finding.reviewed_by) if finding.reviewed_by else None,
-            "resolved": finding.resolved,
-            "created_at": now
-        })
+        """
         
-        db.commit()
-        row = result.fetchone()
+        async with get_async_db_connection() as conn, conn.cursor(row_factory=namedtuple_row) as cursor:
+            await cursor.execute(query, {
+                "id": str(finding_id),
+                "audit_id": str(finding.audit_id),
+                "finding_type": finding.finding_type,
+                "description": finding.description,
+                "ai_suggestion": finding.ai_suggestion,
+                "reviewed_by": str(finding.reviewed_by) if finding.reviewed_by else None,
+                "resolved": finding.resolved,
+                "created_at": now
+            })
+            row = await cursor.fetchone()
+            await conn.commit()
         
         return AuditFinding(
             id=row.id,
@@ -709,49 +1035,43 @@ async def create_finding(finding: AuditFinding, db: Session = Depends(get_db)):
             created_at=row.created_at
         )
     except Exception as e:
-        db.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to create finding: {str(e)}")
 
 @router.get("/audits/{audit_id}/findings", response_model=List[Dict[str, Any]])
-async def get_audit_findings(audit_id: UUID, db: Session = Depends(get_db)):
+async def get_audit_findings(audit_id: UUID):
     """Get all findings for an audit request"""
     try:
-        result = db.execute(text("SELECT * FROM audit_findings WHERE audit_id = :audit_id ORDER BY created_at DESC"), {"audit_id": str(audit_id)})
-        findings = []
-        columns = [desc[0] for desc in result.cursor.description]
-        for row in result:
-            findings.append(row_to_dict(row, columns))
-        return findings
+        return ORJSONResponse(await _fetch_json_rows(AUDIT_FINDINGS_SQL, {"audit_id": str(audit_id)}))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch findings: {str(e)}")
 
 @router.post("/reports", response_model=Report)
-async def create_report(report: Report, db: Session = Depends(get_db)):
+async def create_report(report: Report):
     """Create a new report"""
     try:
         report_id = uuid4()
         now = datetime.utcnow()
         
-        query = text("""
-            INSERT INTO reports (
+        query = """
+            INSERT INTO intelliaudit_dev.reports (
                 id, audit_id, report_type, file_path, generated_by, references, created_at
             ) VALUES (
-                :id, :audit_id, :report_type, :file_path, :generated_by, :references, :created_at
+                %(id)s, %(audit_id)s, %(report_type)s, %(file_path)s, %(generated_by)s, %(references)s, %(created_at)s
             ) RETURNING *
-        """)
+        """
         
-        result = db.execute(query, {
-            "id": str(report_id),
-            "audit_id": str(report.audit_id),
-            "report_type": report.report_type,
-            "file_path": report.file_path,
-            "generated_by": str(report.generated_by) if report.generated_by else None,
-            "references": json.dumps(report.references) if report.references else None,
-            "created_at": now
-        })
-        
-        db.commit()
-        row = result.fetchone()
+        async with get_async_db_connection() as conn, conn.cursor(row_factory=namedtuple_row) as cursor:
+            await cursor.execute(query, {
+                "id": str(report_id),
+                "audit_id": str(report.audit_id),
+                "report_type": report.report_type,
+                "file_path": report.file_path,
+                "generated_by": str(report.generated_by) if report.generated_by else None,
+                "references": json.dumps(report.references) if report.references else None,
+                "created_at": now
+            })
+            row = await cursor.fetchone()
+            await conn.commit()
         
         return Report(
             id=row.id,
@@ -763,52 +1083,46 @@ async def create_report(report: Report, db: Session = Depends(get_db)):
             created_at=row.created_at
         )
     except Exception as e:
-        db.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to create report: {str(e)}")
 
 @router.get("/audits/{audit_id}/reports", response_model=List[Dict[str, Any]])
-async def get_audit_reports(audit_id: UUID, db: Session = Depends(get_db)):
+async def get_audit_reports(audit_id: UUID):
     """Get all reports for an audit request"""
     try:
-        result = db.execute(text("SELECT * FROM reports WHERE audit_id = :audit_id ORDER BY created_at DESC"), {"audit_id": str(audit_id)})
-        reports = []
-        columns = [desc[0] for desc in result.cursor.description]
-        for row in result:
-            reports.append(row_to_dict(row, columns))
-        return reports
+        return ORJSONResponse(await _fetch_json_rows(AUDIT_REPORTS_SQL, {"audit_id": str(audit_id)}))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch reports: {str(e)}")
 
 @router.post("/logs", response_model=AuditLog)
-async def create_audit_log(log: AuditLog, db: Session = Depends(get_db)):
+async def create_audit_log(log: AuditLog):
     """Create a new audit log entry"""
     try:
         log_id = uuid4()
         now = datetime.utcnow()
         
-        query = text("""
-            INSERT INTO audit_logs (
+        query = """
+            INSERT INTO intelliaudit_dev.audit_logs (
                 id, related_type, related_id, action, performed_by,
                 is_ai_action, ai_details, created_at
             ) VALUES (
-                :id, :related_type, :related_id, :action, :performed_by,
-                :is_ai_action, :ai_details, :created_at
+                %(id)s, %(related_type)s, %(related_id)s, %(action)s, %(performed_by)s,
+                %(is_ai_action)s, %(ai_details)s, %(created_at)s
             ) RETURNING *
-        """)
+        """
         
-        result = db.execute(query, {
-            "id": str(log_id),
-            "related_type": log.related_type,
-            "related_id": str(log.related_id),
-            "action": log.action,
-            "performed_by": str(log.performed_by) if log.performed_by else None,
-            "is_ai_action": log.is_ai_action,
-            "ai_details": json.dumps(log.ai_details) if log.ai_details else None,
-            "created_at": now
-        })
-        
-        db.commit()
-        row = result.fetchone()
+        async with get_async_db_connection() as conn, conn.cursor(row_factory=namedtuple_row) as cursor:
+            await cursor.execute(query, {
+                "id": str(log_id),
+                "related_type": log.related_type,
+                "related_id": str(log.related_id),
+                "action": log.action,
+                "performed_by": str(log.performed_by) if log.performed_by else None,
+                "is_ai_action": log.is_ai_action,
+                "ai_details": json.dumps(log.ai_details) if log.ai_details else None,
+                "created_at": now
+            })
+            row = await cursor.fetchone()
+            await conn.commit()
         
         return AuditLog(
             id=row.id,
@@ -821,58 +1135,52 @@ async def create_audit_log(log: AuditLog, db: Session = Depends(get_db)):
             created_at=row.created_at
         )
     except Exception as e:
-        db.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to create audit log: {str(e)}")
 
 @router.get("/audits/{audit_id}/logs", response_model=List[Dict[str, Any]])
-async def get_audit_logs(audit_id: UUID, db: Session = Depends(get_db)):
+async def get_audit_logs(audit_id: UUID):
     """Get all logs for an audit request"""
     try:
-        result = db.execute(text("SELECT * FROM audit_logs WHERE related_id = :audit_id ORDER BY created_at DESC"), {"audit_id": str(audit_id)})
-        logs = []
-        columns = [desc[0] for desc in result.cursor.description]
-        for row in result:
-            logs.append(row_to_dict(row, columns))
-        return logs
+        return ORJSONResponse(await _fetch_json_rows(AUDIT_LOGS_SQL, {"audit_id": str(audit_id)}))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch audit logs: {str(e)}")
 
 @router.post("/progress", response_model=AuditProgress)
-async def create_progress(progress: AuditProgress, db: Session = Depends(get_db)):
+async def create_progress(progress: AuditProgress):
     """Create or update audit progress"""
     try:
         progress_id = uuid4()
         now = datetime.utcnow()
         
-        query = text("""
-            INSERT INTO audit_progress (
+        query = """
+            INSERT INTO intelliaudit_dev.audit_progress (
                 id, audit_id, user_id, document_id, current_step, status,
                 started_at, resumed_at, completed_at, time_spent_seconds,
                 metadata, updated_at
             ) VALUES (
-                :id, :audit_id, :user_id, :document_id, :current_step, :status,
-                :started_at, :resumed_at, :completed_at, :time_spent_seconds,
-                :metadata, :updated_at
+                %(id)s, %(audit_id)s, %(user_id)s, %(document_id)s, %(current_step)s, %(status)s,
+                %(started_at)s, %(resumed_at)s, %(completed_at)s, %(time_spent_seconds)s,
+                %(metadata)s, %(updated_at)s
             ) RETURNING *
-        """)
+        """
         
-        result = db.execute(query, {
-            "id": str(progress_id),
-            "audit_id": str(progress.audit_id),
-            "user_id": str(progress.user_id),
-            "document_id": str(progress.document_id) if progress.document_id else None,
-            "current_step": progress.current_step,
-            "status": progress.status,
-            "started_at": progress.started_at or now,
-            "resumed_at": progress.resumed_at,
-            "completed_at": progress.completed_at,
-            "time_spent_seconds": progress.time_spent_seconds,
-            "metadata": json.dumps(progress.metadata) if progress.metadata else None,
-            "updated_at": now
-        })
-        
-        db.commit()
-        row = result.fetchone()
+        async with get_async_db_connection() as conn, conn.cursor(row_factory=namedtuple_row) as cursor:
+            await cursor.execute(query, {
+                "id": str(progress_id),
+                "audit_id": str(progress.audit_id),
+                "user_id": str(progress.user_id),
+                "document_id": str(progress.document_id) if progress.document_id else None,
+                "current_step": progress.current_step,
+                "status": progress.status,
+                "started_at": progress.started_at or now,
+                "resumed_at": progress.resumed_at,
+                "completed_at": progress.completed_at,
+                "time_spent_seconds": progress.time_spent_seconds,
+                "metadata": json.dumps(progress.metadata) if progress.metadata else None,
+                "updated_at": now
+            })
+            row = await cursor.fetchone()
+            await conn.commit()
         
         return AuditProgress(
             id=row.id,
@@ -889,19 +1197,13 @@ async def create_progress(progress: AuditProgress, db: Session = Depends(get_db)
             updated_at=row.updated_at
         )
     except Exception as e:
-        db.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to create progress: {str(e)}")
 
 @router.get("/audits/{audit_id}/progress", response_model=List[Dict[str, Any]])
-async def get_audit_progress(audit_id: UUID, db: Session = Depends(get_db)):
+async def get_audit_progress(audit_id: UUID):
     """Get progress for an audit request"""
     try:
-        result = db.execute(text("SELECT * FROM audit_progress WHERE audit_id = :audit_id ORDER BY updated_at DESC"), {"audit_id": str(audit_id)})
-        progress_list = []
-        columns = [desc[0] for desc in result.cursor.description]
-        for row in result:
-            progress_list.append(row_to_dict(row, columns))
-        return progress_list
+        return ORJSONResponse(await _fetch_json_rows(AUDIT_PROGRESS_SQL, {"audit_id": str(audit_id)}))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch progress: {str(e)}")
 
@@ -916,156 +1218,213 @@ class EvidenceAnnotationUpdate(BaseModel):
     evidence_id: UUID
     annotation: Dict[str, Any]
 
+# Bulk review: one item per evidence row, status and/or annotation
+class EvidenceReviewItem(BaseModel):
+    evidence_id: UUID
+    status: Optional[str] = None
+    annotation: Optional[Dict[str, Any]] = None
+
+class EvidenceBulkReview(BaseModel):
+    reviewed_by: Optional[UUID] = None
+    items: List[EvidenceReviewItem] = Field(..., min_length=1, max_length=1000)
+
 # New Pydantic model for audit request update
 class AuditRequestUpdate(BaseModel):
     audit_request_id: UUID
     status: str
     current_step: str
 
+class AuditRequestPriorityUpdate(BaseModel):
+    priority: int = Field(..., ge=1, le=10)
+
 @router.put("/evidence/{evidence_id}/status")
 async def update_evidence_status(evidence_id: UUID, status_update: EvidenceStatusUpdate):
     """Update the review status of evidence"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Validate that the evidence exists
-        cursor.execute(
-            "SELECT evidence_id FROM evidence WHERE evidence_id = %s",
-            (str(evidence_id),)
-        )
-        
-        if not cursor.fetchone():
-            conn.close()
-            raise HTTPException(status_code=404, detail="Evidence not found")
-        
-        # Update the evidence status
-        now = datetime.utcnow()
-        cursor.execute(
-            """
-            UPDATE evidence 
-            SET review_status = %s, 
-                reviewed_by = %s, 
-                reviewed_at = %s,
-                updated_at = %s
-            WHERE evidence_id = %s
-            """,
-            (
-                status_update.status,
-                str(status_update.reviewed_by) if status_update.reviewed_by else None,
-                now,
-                now,
-                str(evidence_id)
+        async with get_async_db_connection() as conn, conn.cursor() as cursor:
+            # Validate that the evidence exists
+            await cursor.execute(
+                "SELECT evidence_id FROM intelliaudit_dev.evidence WHERE evidence_id = %s",
+                (str(evidence_id),)
             )
-        )
-        
-        conn.commit()
-        conn.close()
-        
-        return {"message": "Success"}
-        
+
+            if not await cursor.fetchone():
+                raise HTTPException(status_code=404, detail="Evidence not found")
+
+            # Update the evidence status
+            now = datetime.utcnow()
+            await cursor.execute(
+                """
+                UPDATE intelliaudit_dev.evidence 
+                SET review_status = %s, 
+                    reviewed_by = %s, 
+                    reviewed_at = %s,
+                    updated_at = %s
+                WHERE evidence_id = %s
+                """,
+                (
+                    status_update.status,
+                    str(status_update.reviewed_by) if status_update.reviewed_by else None,
+                    now,
+                    now,
+                    str(evidence_id)
+                )
+            )
+
+            await conn.commit()
+
+            return {"message": "Success"}
+
     except HTTPException:
         raise
     except Exception as e:
-        if 'conn' in locals():
-            conn.rollback()
-            conn.close()
         raise HTTPException(status_code=500, detail=f"Failed to update evidence status: {str(e)}")
 
 @router.put("/audits/{audit_request_id}/status")
 async def update_audit_request_status(audit_request_id: UUID, audit_update: AuditRequestUpdate):
     """Update the status and current step of an audit request"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Validate that the audit request exists
-        cursor.execute(
-            "SELECT audit_request_id FROM audit_requests WHERE audit_request_id = %s",
-            (str(audit_request_id),)
-        )
-        
-        if not cursor.fetchone():
-            conn.close()
-            raise HTTPException(status_code=404, detail="Audit request not found")
-        
-        # Update the audit request
-        now = datetime.utcnow()
-        cursor.execute(
-            """
-            UPDATE audit_requests 
-            SET status = %s, 
-                current_step = %s, 
-                started_at = %s, 
-                last_active_at = %s, 
-                updated_at = %s
-            WHERE audit_request_id = %s
-            """,
-            (
-                audit_update.status,
-                audit_update.current_step,
-                now,
-                now,
-                now,
-                str(audit_request_id)
+        async with get_async_db_connection() as conn, conn.cursor() as cursor:
+            # Validate that the audit request exists
+            await cursor.execute(
+                "SELECT audit_request_id FROM intelliaudit_dev.audit_requests WHERE audit_request_id = %s",
+                (str(audit_request_id),)
             )
-        )
-        
-        conn.commit()
-        conn.close()
-        
-        return {"message": "Success"}
-        
+
+            if not await cursor.fetchone():
+                raise HTTPException(status_code=404, detail="Audit request not found")
+
+            # Update the audit request
+            now = datetime.utcnow()
+            await cursor.execute(
+                """
+                UPDATE intelliaudit_dev.audit_requests 
+                SET status = %s, 
+                    current_step = %s, 
+                    started_at = %s, 
+                    last_active_at = %s, 
+                    updated_at = %s
+                WHERE audit_request_id = %s
+                """,
+                (
+                    audit_update.status,
+                    audit_update.current_step,
+                    now,
+                    now,
+                    now,
+                    str(audit_request_id)
+                )
+            )
+
+            await conn.commit()
+
+            return {"message": "Success"}
+
     except HTTPException:
         raise
     except Exception as e:
-        if 'conn' in locals():
-            conn.rollback()
-            conn.close()
         raise HTTPException(status_code=500, detail=f"Failed to update audit request: {str(e)}")
 
+@router.put("/audits/{audit_request_id}/priority")
+async def update_audit_request_priority(audit_request_id: UUID, priority_update: AuditRequestPriorityUpdate):
+    """Change an audit's scheduling priority; applies to uploads started afterwards"""
+    try:
+        async with get_async_db_connection() as conn, conn.cursor() as cursor:
+            await cursor.execute(
+                "UPDATE intelliaudit_dev.audit_requests SET priority = %s, updated_at = %s WHERE audit_request_id = %s RETURNING priority",
+                (priority_update.priority, datetime.utcnow(), str(audit_request_id))
+            )
+            row = await cursor.fetchone()
+            if not row:
+                raise HTTPException(status_code=404, detail="Audit request not found")
+            await conn.commit()
+            return {"audit_request_id": str(audit_request_id), "priority": row[0]}
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to update audit priority: {str(e)}")
+
 @router.put("/evidence/{evidence_id}/annotation")
 async def update_evidence_annotation(evidence_id: UUID, annotation_update: EvidenceAnnotationUpdate):
     """Update the annotation field of evidence"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Validate that the evidence exists
-        cursor.execute(
-            "SELECT evidence_id FROM evidence WHERE evidence_id = %s",
-            (str(evidence_id),)
-        )
-        
-        if not cursor.fetchone():
-            conn.close()
-            raise HTTPException(status_code=404, detail="Evidence not found")
-        
-        # Update the evidence annotation
-        now = datetime.utcnow()
-        cursor.execute(
-            """
-            UPDATE evidence 
-            SET annotation = %s,
-                updated_at = %s
-            WHERE evidence_id = %s
-            """,
-            (
-                json.dumps(annotation_update.annotation),
-                now,
-                str(evidence_id)
+        async with get_async_db_connection() as conn, conn.cursor() as cursor:
+            # Validate that the evidence exists
+            await cursor.execute(
+                "SELECT evidence_id FROM intelliaudit_dev.evidence WHERE evidence_id = %s",
+                (str(evidence_id),)
             )
-        )
-        
-        conn.commit()
-        conn.close()
-        
-        return {"message": "Success"}
-        
+
+            if not await cursor.fetchone():
+                raise HTTPException(status_code=404, detail="Evidence not found")
+
+            # Update the evidence annotation
+            now = datetime.utcnow()
+            await cursor.execute(
+                """
+                UPDATE intelliaudit_dev.evidence 
+                SET annotation = %s,
+                    updated_at = %s
+                WHERE evidence_id = %s
+                """,
+                (
+                    json.dumps(annotation_update.annotation),
+                    now,
+                    str(evidence_id)
+                )
+            )
+
+            await conn.commit()
+
+            return {"message": "Success"}
+
     except HTTPException:
         raise
     except Exception as e:
-        if 'conn' in locals():
-            conn.rollback()
-            conn.close()
-        raise HTTPException(status_code=500, detail=f"Failed to update evidence annotation: {str(e)}") 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Failed to update evidence annotation: {str(e)}") 
+
+# One statement for the whole batch. A NULL status leaves the review fields alone; an
+# annotation is only written when the item supplied one (so it can also be cleared with null).
+EVIDENCE_BULK_REVIEW_SQL = """
+    UPDATE intelliaudit_dev.evidence e
+    SET review_status = COALESCE(r.status, e.review_status),
+        reviewed_by = CASE WHEN r.status IS NOT NULL THEN %(reviewed_by)s::uuid ELSE e.reviewed_by END,
+        reviewed_at = CASE WHEN r.status IS NOT NULL THEN %(now)s ELSE e.reviewed_at END,
+        annotation = CASE WHEN r.set_annotation THEN r.annotation ELSE e.annotation END,
+        updated_at = %(now)s
+    FROM unnest(%(evidence_ids)s::uuid[], %(statuses)s::text[], %(annotations)s::jsonb[], %(set_annotations)s::bool[])
+        AS r(evidence_id, status, annotation, set_annotation)
+    WHERE e.evidence_id = r.evidence_id
+    RETURNING e.evidence_id
+"""
+
+@router.put("/evidence/review")
+async def bulk_review_evidence(review: EvidenceBulkReview):
+    """
+    Apply review statuses and/or annotations to many evidence rows in one
+    transaction. Ids that do not exist are reported in `missing`; the rest
+    are still updated.
+    """
+    # A repeated id would join twice in UPDATE ... FROM; the last item for it wins
+    items = {item.evidence_id: item for item in review.items}
+    try:
+        async with get_async_db_connection() as conn, conn.cursor() as cursor:
+            await cursor.execute(EVIDENCE_BULK_REVIEW_SQL, {
+                "reviewed_by": str(review.reviewed_by) if review.reviewed_by else None,
+                "now": datetime.utcnow(),
+                "evidence_ids": list(items),
+                "statuses": [item.status for item in items.values()],
+                "annotations": [Jsonb(item.annotation) if item.annotation is not None else None for item in items.values()],
+                "set_annotations": ["annotation" in item.model_fields_set for item in items.values()],
+            })
+            updated = {row[0] for row in await cursor.fetchall()}
+            await conn.commit()
+
+        return {
+            "updated": len(updated),
+            "missing": [str(evidence_id) for evidence_id in items if evidence_id not in updated],
+        }
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to review evidence: {str(e)}")
@@ -1,5 +1,6 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
 from app.core.audit import load_criteria
+from app.core.cache import cached_response, CRITERIA_KEY
 from app.settings import (
     OPENAI_API_BASE, LLM_PROVIDER, HUGGINGFACE_DEFAULT_MODEL, 
     CUSTOM_LLM_ENDPOINT, CUSTOM_LLM_API_KEY
@@ -8,8 +9,8 @@ from app.settings import (
 router = APIRouter()
 
 @router.get('/criteria')
-def get_criteria():
-    return load_criteria()
+async def get_criteria(request: Request):
+    return await cached_response(request, CRITERIA_KEY, load_criteria)
 
 @router.get('/llm')
 def get_llm_config():
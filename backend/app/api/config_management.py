@@ -1,9 +1,11 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel, Field
 from typing import Optional, Dict, Any, List
 from uuid import UUID, uuid4
 from datetime import datetime
-from app.config.database_simple import get_db_connection
+from app.config.database_async import get_async_db_connection
+from app.core.cache import cached_response, FRAMEWORK_SUMMARY_KEY, METADATA_TYPES_GROUPED_KEY
+from app.core.cache_bus import commit_and_invalidate
 
 
 router = APIRouter(prefix="", tags=["configuration"])
@@ -117,6 +119,11 @@ def _now():
     return datetime.utcnow()
 
 
+async def _commit_config_change(conn):
+    """Any change to the configuration hierarchy can change a cached framework summary, in any worker"""
+    await commit_and_invalidate(conn, FRAMEWORK_SUMMARY_KEY)
+
+
 # ==========
 # Frameworks
 # ==========
@@ -124,10 +131,9 @@ def _now():
 @router.post("/config/frameworks")
 async def create_framework(payload: FrameworkCreate):
     try:
-        conn = get_db_connection()
-        with conn.cursor() as cur:
+        async with get_async_db_connection() as conn, conn.cursor() as cur:
             framework_id = uuid4()
-            cur.execute(
+            await cur.execute(
                 """
                 INSERT INTO intelliaudit_dev.config_frameworks (
                     framework_id, framework_code, framework_name, version,
@@ -150,22 +156,16 @@ async def create_framework(payload: FrameworkCreate):
                     _now(),
                 ),
             )
-            new_id = cur.fetchone()[0]
-            conn.commit()
+            new_id = (await cur.fetchone())[0]
+            await _commit_config_change(conn)
             return {"framework_id": str(new_id), "message": "Success"}
     except Exception as e:
-        if 'conn' in locals():
-            conn.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to create framework: {str(e)}")
-    finally:
-        if 'conn' in locals():
-            conn.close()
 
 
 @router.put("/config/frameworks/{framework_id}")
 async def update_framework(framework_id: UUID, payload: FrameworkUpdate):
     try:
-        conn = get_db_connection()
         fields = []
         values = []
         mapping = payload.model_dump(exclude_unset=True)
@@ -191,8 +191,8 @@ async def update_framework(framework_id: UUID, payload: FrameworkUpdate):
         values.append(_now())
         values.append(str(framework_id))
 
-        with conn.cursor() as cur:
-            cur.execute(
+        async with get_async_db_connection() as conn, conn.cursor() as cur:
+            await cur.execute(
                 f"""
                 UPDATE intelliaudit_dev.config_frameworks
                 SET {', '.join(fields)}
@@ -202,41 +202,30 @@ async def update_framework(framework_id: UUID, payload: FrameworkUpdate):
             )
             if cur.rowcount == 0:
                 raise HTTPException(status_code=404, detail="Framework not found")
-            conn.commit()
+            await _commit_config_change(conn)
             return {"message": "Success"}
     except HTTPException:
         raise
     except Exception as e:
-        if 'conn' in locals():
-            conn.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to update framework: {str(e)}")
-    finally:
-        if 'conn' in locals():
-            conn.close()
 
 
 @router.delete("/config/frameworks/{framework_id}")
 async def delete_framework(framework_id: UUID):
     try:
-        conn = get_db_connection()
-        with conn.cursor() as cur:
-            cur.execute(
+        async with get_async_db_connection() as conn, conn.cursor() as cur:
+            await cur.execute(
                 "DELETE FROM intelliaudit_dev.config_frameworks WHERE framework_id = %s",
                 (str(framework_id),),
             )
             if cur.rowcount == 0:
                 raise HTTPException(status_code=404, detail="Framework not found")
-            conn.commit()
+            await _commit_config_change(conn)
             return {"message": "Success"}
     except HTTPException:
         raise
     except Exception as e:
-        if 'conn' in locals():
-            conn.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to delete framework: {str(e)}")
-    finally:
-        if 'conn' in locals():
-            conn.close()
 
 
 # ==========
@@ -246,10 +235,9 @@ async def delete_framework(framework_id: UUID):
 @router.post("/config/process-areas")
 async def create_process_area(payload: ProcessAreaCreate):
     try:
-        conn = get_db_connection()
-        with conn.cursor() as cur:
+        async with get_async_db_connection() as conn, conn.cursor() as cur:
             process_area_id = uuid4()
-            cur.execute(
+            await cur.execute(
                 """
                 INSERT INTO intelliaudit_dev.config_process_areas (
                     process_area_id, framework_id, process_area_code, process_area_name,
@@ -274,22 +262,16 @@ async def create_process_area(payload: ProcessAreaCreate):
                     _now(),
                 ),
             )
-            new_id = cur.fetchone()[0]
-            conn.commit()
+            new_id = (await cur.fetchone())[0]
+            await _commit_config_change(conn)
             return {"process_area_id": str(new_id), "message": "Success"}
     except Exception as e:
-        if 'conn' in locals():
-            conn.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to create process area: {str(e)}")
-    finally:
-        if 'conn' in locals():
-            conn.close()
 
 
 @router.put("/config/process-areas/{process_area_id}")
 async def update_process_area(process_area_id: UUID, payload: ProcessAreaUpdate):
     try:
-        conn = get_db_connection()
         fields = []
         values = []
         mapping = payload.model_dump(exclude_unset=True)
@@ -316,8 +298,8 @@ async def update_process_area(process_area_id: UUID, payload: ProcessAreaUpdate)
         values.append(_now())
         values.append(str(process_area_id))
 
-        with conn.cursor() as cur:
-            cur.execute(
+        async with get_async_db_connection() as conn, conn.cursor() as cur:
+            await cur.execute(
                 f"""
                 UPDATE intelliaudit_dev.config_process_areas
                 SET {', '.join(fields)}
@@ -327,41 +309,30 @@ async def update_process_area(process_area_id: UUID, payload: ProcessAreaUpdate)
             )
             if cur.rowcount == 0:
                 raise HTTPException(status_code=404, detail="Process area not found")
-            conn.commit()
+            await _commit_config_change(conn)
             return {"message": "Success"}
     except HTTPException:
         raise
     except Exception as e:
-        if 'conn' in locals():
-            conn.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to update process area: {str(e)}")
-    finally:
-        if 'conn' in locals():
-            conn.close()
 
 
 @router.delete("/config/process-areas/{process_area_id}")
 async def delete_process_area(process_area_id: UUID):
     try:
-        conn = get_db_connection()
-        with conn.cursor() as cur:
-            cur.execute(
+        async with get_async_db_connection() as conn, conn.cursor() as cur:
+            await cur.execute(
                 "DELETE FROM intelliaudit_dev.config_process_areas WHERE process_area_id = %s",
                 (str(process_area_id),),
             )
             if cur.rowcount == 0:
                 raise HTTPException(status_code=404, detail="Process area not found")
-            conn.commit()
+            await _commit_config_change(conn)
             return {"message": "Success"}
     except HTTPException:
         raise
     except Exception as e:
-        if 'conn' in locals():
-            conn.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to delete process area: {str(e)}")
-    finally:
-        if 'conn' in locals():
-            conn.close()
 
 
 # ==========
@@ -371,10 +342,9 @@ async def delete_process_area(process_area_id: UUID):
 @router.post("/config/controls")
 async def create_control(payload: ControlCreate):
     try:
-        conn = get_db_connection()
-        with conn.cursor() as cur:
+        async with get_async_db_connection() as conn, conn.cursor() as cur:
             control_id = uuid4()
-            cur.execute(
+            await cur.execute(
                 """
                 INSERT INTO intelliaudit_dev.config_controls (
                     control_id, process_area_id, control_code, control_statement,
@@ -399,22 +369,16 @@ async def create_control(payload: ControlCreate):
                     _now(),
                 ),
             )
-            new_id = cur.fetchone()[0]
-            conn.commit()
+            new_id = (await cur.fetchone())[0]
+            await _commit_config_change(conn)
             return {"control_id": str(new_id), "message": "Success"}
     except Exception as e:
-        if 'conn' in locals():
-            conn.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to create control: {str(e)}")
-    finally:
-        if 'conn' in locals():
-            conn.close()
 
 
 @router.put("/config/controls/{control_id}")
 async def update_control(control_id: UUID, payload: ControlUpdate):
     try:
-        conn = get_db_connection()
         fields = []
         values = []
         mapping = payload.model_dump(exclude_unset=True)
@@ -440,8 +404,8 @@ async def update_control(control_id: UUID, payload: ControlUpdate):
         values.append(_now())
         values.append(str(control_id))
 
-        with conn.cursor() as cur:
-            cur.execute(
+        async with get_async_db_connection() as conn, conn.cursor() as cur:
+            await cur.execute(
                 f"""
                 UPDATE intelliaudit_dev.config_controls
                 SET {', '.join(fields)}
@@ -451,41 +415,30 @@ async def update_control(control_id: UUID, payload: ControlUpdate):
             )
             if cur.rowcount == 0:
                 raise HTTPException(status_code=404, detail="Control not found")
-            conn.commit()
+            await _commit_config_change(conn)
             return {"message": "Success"}
     except HTTPException:
         raise
     except Exception as e:
-        if 'conn' in locals():
-            conn.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to update control: {str(e)}")
-    finally:
-        if 'conn' in locals():
-            conn.close()
 
 
 @router.delete("/config/controls/{control_id}")
 async def delete_control(control_id: UUID):
     try:
-        conn = get_db_connection()
-        with conn.cursor() as cur:
-            cur.execute(
+        async with get_async_db_connection() as conn, conn.cursor() as cur:
+            await cur.execute(
                 "DELETE FROM intelliaudit_dev.config_controls WHERE control_id = %s",
                 (str(control_id),),
             )
             if cur.rowcount == 0:
                 raise HTTPException(status_code=404, detail="Control not found")
-            conn.commit()
+            await _commit_config_change(conn)
             return {"message": "Success"}
     except HTTPException:
         raise
     except Exception as e:
-        if 'conn' in locals():
-            conn.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to delete control: {str(e)}")
-    finally:
-        if 'conn' in locals():
-            conn.close()
 
 
 # ==========
@@ -495,10 +448,9 @@ async def delete_control(control_id: UUID):
 @router.post("/config/criteria")
 async def create_criteria(payload: CriteriaCreate):
     try:
-        conn = get_db_connection()
-        with conn.cursor() as cur:
+        async with get_async_db_connection() as conn, conn.cursor() as cur:
             criteria_id = uuid4()
-            cur.execute(
+            await cur.execute(
                 """
                 INSERT INTO intelliaudit_dev.config_criteria (
                     criteria_id, control_id, criteria_code, criteria_statement,
@@ -523,22 +475,16 @@ async def create_criteria(payload: CriteriaCreate):
                     _now(),
                 ),
             )
-            new_id = cur.fetchone()[0]
-            conn.commit()
+            new_id = (await cur.fetchone())[0]
+            await _commit_config_change(conn)
             return {"criteria_id": str(new_id), "message": "Success"}
     except Exception as e:
-        if 'conn' in locals():
-            conn.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to create criteria: {str(e)}")
-    finally:
-        if 'conn' in locals():
-            conn.close()
 
 
 @router.put("/config/criteria/{criteria_id}")
 async def update_criteria(criteria_id: UUID, payload: CriteriaUpdate):
     try:
-        conn = get_db_connection()
         fields = []
         values = []
         mapping = payload.model_dump(exclude_unset=True)
@@ -564,8 +510,8 @@ async def update_criteria(criteria_id: UUID, payload: CriteriaUpdate):
         values.append(_now())
         values.append(str(criteria_id))
 
-        with conn.cursor() as cur:
-            cur.execute(
+        async with get_async_db_connection() as conn, conn.cursor() as cur:
+            await cur.execute(
                 f"""
                 UPDATE intelliaudit_dev.config_criteria
                 SET {', '.join(fields)}
@@ -575,41 +521,30 @@ async def update_criteria(criteria_id: UUID, payload: CriteriaUpdate):
             )
             if cur.rowcount == 0:
                 raise HTTPException(status_code=404, detail="Criteria not found")
-            conn.commit()
+            await _commit_config_change(conn)
             return {"message": "Success"}
     except HTTPException:
         raise
     except Exception as e:
-        if 'conn' in locals():
-            conn.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to update criteria: {str(e)}")
-    finally:
-        if 'conn' in locals():
-            conn.close()
 
 
 @router.delete("/config/criteria/{criteria_id}")
 async def delete_criteria(criteria_id: UUID):
     try:
-        conn = get_db_connection()
-        with conn.cursor() as cur:
-            cur.execute(
+        async with get_async_db_connection() as conn, conn.cursor() as cur:
+            await cur.execute(
                 "DELETE FROM intelliaudit_dev.config_criteria WHERE criteria_id = %s",
                 (str(criteria_id),),
             )
             if cur.rowcount == 0:
                 raise HTTPException(status_code=404, detail="Criteria not found")
-            conn.commit()
+            await _commit_config_change(conn)
             return {"message": "Success"}
     except HTTPException:
         raise
     except Exception as e:
-        if 'conn' in locals():
-            conn.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to delete criteria: {str(e)}")
-    finally:
-        if 'conn' in locals():
-            conn.close()
 
 
 # ==========
@@ -619,10 +554,9 @@ async def delete_criteria(criteria_id: UUID):
 @router.post("/config/rules")
 async def create_rule(payload: RuleCreate):
     try:
-        conn = get_db_connection()
-        with conn.cursor() as cur:
+        async with get_async_db_connection() as conn, conn.cursor() as cur:
             rule_id = uuid4()
-            cur.execute(
+            await cur.execute(
                 """
                 INSERT INTO intelliaudit_dev.config_assessment_rules (
                     rule_id, criteria_id, rule_name, logic_type_id, rule_logic,
@@ -648,22 +582,16 @@ async def create_rule(payload: RuleCreate):
                     _now(),
                 ),
             )
-            new_id = cur.fetchone()[0]
-            conn.commit()
+            new_id = (await cur.fetchone())[0]
+            await _commit_config_change(conn)
             return {"rule_id": str(new_id), "message": "Success"}
     except Exception as e:
-        if 'conn' in locals():
-            conn.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to create rule: {str(e)}")
-    finally:
-        if 'conn' in locals():
-            conn.close()
 
 
 @router.put("/config/rules/{rule_id}")
 async def update_rule(rule_id: UUID, payload: RuleUpdate):
     try:
-        conn = get_db_connection()
         fields = []
         values = []
         mapping = payload.model_dump(exclude_unset=True)
@@ -690,8 +618,8 @@ async def update_rule(rule_id: UUID, payload: RuleUpdate):
         values.append(_now())
         values.append(str(rule_id))
 
-        with conn.cursor() as cur:
-            cur.execute(
+        async with get_async_db_connection() as conn, conn.cursor() as cur:
+            await cur.execute(
                 f"""
                 UPDATE intelliaudit_dev.config_assessment_rules
                 SET {', '.join(fields)}
@@ -701,231 +629,216 @@ async def update_rule(rule_id: UUID, payload: RuleUpdate):
             )
             if cur.rowcount == 0:
                 raise HTTPException(status_code=404, detail="Rule not found")
-            conn.commit()
+            await _commit_config_change(conn)
             return {"message": "Success"}
     except HTTPException:
         raise
     except Exception as e:
-        if 'conn' in locals():
-            conn.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to update rule: {str(e)}")
-    finally:
-        if 'conn' in locals():
-            conn.close()
 
 
 @router.delete("/config/rules/{rule_id}")
 async def delete_rule(rule_id: UUID):
     try:
-        conn = get_db_connection()
-        with conn.cursor() as cur:
-            cur.execute(
+        async with get_async_db_connection() as conn, conn.cursor() as cur:
+            await cur.execute(
                 "DELETE FROM intelliaudit_dev.config_assessment_rules WHERE rule_id = %s",
                 (str(rule_id),),
             )
             if cur.rowcount == 0:
                 raise HTTPException(status_code=404, detail="Rule not found")
-            conn.commit()
+            await _commit_config_change(conn)
             return {"message": "Success"}
     except HTTPException:
         raise
     except Exception as e:
-        if 'conn' in locals():
-            conn.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to delete rule: {str(e)}")
-    finally:
-        if 'conn' in locals():
-            conn.close()
 
 
 # ==========
 # Framework Summary (counts + full hierarchy)
 # ==========
 
+# Child lookups by parent foreign key; `python migrate.py explain` checks they stay index-backed
+FRAMEWORK_PROCESS_AREAS_SQL = """
+    SELECT process_area_id, process_area_code, process_area_name
+    FROM intelliaudit_dev.config_process_areas
+    WHERE framework_id = %s
+    ORDER BY process_area_code
+"""
+PROCESS_AREA_CONTROLS_SQL = """
+    SELECT control_id, control_code, control_statement
+    FROM intelliaudit_dev.config_controls
+    WHERE process_area_id = %s
+    ORDER BY control_code
+"""
+CONTROL_CRITERIA_SQL = """
+    SELECT criteria_id, criteria_code, criteria_statement
+    FROM intelliaudit_dev.config_criteria
+    WHERE control_id = %s
+    ORDER BY criteria_code
+"""
+CRITERIA_RULES_SQL = """
+    SELECT rule_id, rule_name
+    FROM intelliaudit_dev.config_assessment_rules
+    WHERE criteria_id = %s
+    ORDER BY rule_name
+"""
+
 @router.get("/config/frameworks/{framework_id}/summary")
-async def get_framework_summary(framework_id: UUID):
+async def get_framework_summary(framework_id: UUID, request: Request):
     try:
-        conn = get_db_connection()
-        with conn.cursor() as cur:
-            # Framework
-            cur.execute(
-                """
-                SELECT framework_id, framework_code, framework_name, version, description
-                FROM intelliaudit_dev.config_frameworks
-                WHERE framework_id = %s
-                """,
-                (str(framework_id),),
-            )
-            fw = cur.fetchone()
-            if not fw:
-                raise HTTPException(status_code=404, detail="Framework not found")
+        return await cached_response(
+            request, f"{FRAMEWORK_SUMMARY_KEY}{framework_id}", lambda: _load_framework_summary(framework_id)
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to build framework summary: {str(e)}")
 
-            framework_info = {
-                "framework_id": str(fw[0]),
-                "framework_code": fw[1],
-                "framework_name": fw[2],
-                "version": fw[3],
-                "description": fw[4],
-            }
 
-            # Process Areas
-            cur.execute(
-                """
-                SELECT process_area_id, process_area_code, process_area_name
-                FROM intelliaudit_dev.config_process_areas
-                WHERE framework_id = %s
-                ORDER BY process_area_code
-                """,
-                (str(framework_id),),
-            )
-            pa_rows = cur.fetchall()
-
-            process_areas: List[Dict[str, Any]] = []
-            total_controls = 0
-            total_criteria = 0
-            total_rules = 0
-
-            for pa_id, pa_code, pa_name in pa_rows:
-                # Controls for this process area
-                cur.execute(
-                    """
-                    SELECT control_id, control_code, control_statement
-                    FROM intelliaudit_dev.config_controls
-                    WHERE process_area_id = %s
-                    ORDER BY control_code
-                    """,
-                    (str(pa_id),),
-                )
-                ctrl_rows = cur.fetchall()
-
-                controls: List[Dict[str, Any]] = []
-                for control_id, control_code, control_statement in ctrl_rows:
-                    # Criteria for this control
-                    cur.execute(
-                        """
-                        SELECT criteria_id, criteria_code, criteria_statement
-                        FROM intelliaudit_dev.config_criteria
-                        WHERE control_id = %s
-                        ORDER BY criteria_code
-                        """,
-                        (str(control_id),),
-                    )
-                    crit_rows = cur.fetchall()
-
-                    criterias: List[Dict[str, Any]] = []
-                    for criteria_id, criteria_code, criteria_statement in crit_rows:
-                        # Rules for this criteria
-                        cur.execute(
-                            """
-                            SELECT rule_id, rule_name
-                            FROM intelliaudit_dev.config_assessment_rules
-                            WHERE criteria_id = %s
-                            ORDER BY rule_name
-                            """,
-                            (str(criteria_id),),
-                        )
-                        rule_rows = cur.fetchall()
-
-                        rules_list = [
-                            {"rule_id": str(rid), "rule_name": rname}
-                            for (rid, rname) in rule_rows
-                        ]
-
-                        criterias.append(
-                            {
-                                "criteria_id": str(criteria_id),
-                                "criteria_code": criteria_code,
-                                "criteria_name": criteria_statement,
-                                "rules": rules_list,
-                            }
-                        )
-                        total_rules += len(rule_rows)
-
-                    controls.append(
+async def _load_framework_summary(framework_id: UUID):
+    async with get_async_db_connection() as conn, conn.cursor() as cur:
+        # Framework
+        await cur.execute(
+            """
+            SELECT framework_id, framework_code, framework_name, version, description
+            FROM intelliaudit_dev.config_frameworks
+            WHERE framework_id = %s
+            """,
+            (str(framework_id),),
+        )
+        fw = await cur.fetchone()
+        if not fw:
+            raise HTTPException(status_code=404, detail="Framework not found")
+
+        framework_info = {
+            "framework_id": str(fw[0]),
+            "framework_code": fw[1],
+            "framework_name": fw[2],
+            "version": fw[3],
+            "description": fw[4],
+        }
+
+        # Process Areas
+        await cur.execute(FRAMEWORK_PROCESS_AREAS_SQL, (str(framework_id),))
+        pa_rows = await cur.fetchall()
+
+        process_areas: List[Dict[str, Any]] = []
+        total_controls = 0
+        total_criteria = 0
+        total_rules = 0
+
+        for pa_id, pa_code, pa_name in pa_rows:
+            # Controls for this process area
+            await cur.execute(PROCESS_AREA_CONTROLS_SQL, (str(pa_id),))
+            ctrl_rows = await cur.fetchall()
+
+            controls: List[Dict[str, Any]] = []
+            for control_id, control_code, control_statement in ctrl_rows:
+                # Criteria for this control
+                await cur.execute(CONTROL_CRITERIA_SQL, (str(control_id),))
+                crit_rows = await cur.fetchall()
+
+                criterias: List[Dict[str, Any]] = []
+                for criteria_id, criteria_code, criteria_statement in crit_rows:
+                    # Rules for this criteria
+                    await cur.execute(CRITERIA_RULES_SQL, (str(criteria_id),))
+                    rule_rows = await cur.fetchall()
+
+                    rules_list = [
+                        {"rule_id": str(rid), "rule_name": rname}
+                        for (rid, rname) in rule_rows
+                    ]
+
+                    criterias.append(
                         {
-                            "control_id": str(control_id),
-                            "control_code": control_code,
-                            "control_name": control_statement,
-                            "criteria": criterias,
+                            "criteria_id": str(criteria_id),
+                            "criteria_code": criteria_code,
+                            "criteria_name": criteria_statement,
+                            "rules": rules_list,
                         }
                     )
-                    total_criteria += len(crit_rows)
+                    total_rules += len(rule_rows)
 
-                process_areas.append(
+                controls.append(
                     {
-                        "process_area_id": str(pa_id),
-                        "process_area_code": pa_code,
-                        "process_area_name": pa_name,
-                        "controls": controls,
+                        "control_id": str(control_id),
+                        "control_code": control_code,
+                        "control_name": control_statement,
+                        "criteria": criterias,
                     }
                 )
-                total_controls += len(ctrl_rows)
-
-            summary = {
-                "framework": framework_info,
-                "counts": {
-                    "process_areas": len(pa_rows),
-                    "controls": total_controls,
-                    "criteria": total_criteria,
-                    "rules": total_rules,
-                },
-                "hierarchy": {
-                    "process_areas": process_areas
-                },
-            }
+                total_criteria += len(crit_rows)
+
+            process_areas.append(
+                {
+                    "process_area_id": str(pa_id),
+                    "process_area_code": pa_code,
+                    "process_area_name": pa_name,
+                    "controls": controls,
+                }
+            )
+            total_controls += len(ctrl_rows)
 
-            return summary
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to build framework summary: {str(e)}")
-    finally:
-        if 'conn' in locals():
-            conn.close()
+        summary = {
+            "framework": framework_info,
+            "counts": {
+                "process_areas": len(pa_rows),
+                "controls": total_controls,
+                "criteria": total_criteria,
+                "rules": total_rules,
+            },
+            "hierarchy": {
+                "process_areas": process_areas
+            },
+        }
+
+        return summary
 
 
 
 
 @router.get("/config/metadata-types/grouped")
-async def list_active_metadata_types_grouped():
+async def list_active_metadata_types_grouped(request: Request):
     """Return active metadata types grouped by type_category as a nested array."""
     try:
-        conn = get_db_connection()
-        with conn.cursor() as cur:
-            cur.execute(
-                """
-                SELECT metadata_type_id, type_category, type_value, type_code,
-                       display_order, description
-                FROM intelliaudit_dev.config_metadata_types
-                WHERE is_active = TRUE
-                ORDER BY type_category, display_order, type_value
-                """
-            )
-            rows = cur.fetchall()
-            grouped: Dict[str, List[Dict[str, Any]]] = {}
-            for r in rows:
-                cat = r[1]
-                item = {
-                    "metadata_type_id": str(r[0]),
-                    "type_value": r[2],
-                    "type_code": r[3],
-                    "display_order": r[4],
-                    "description": r[5],
-                }
-                grouped.setdefault(cat, []).append(item)
-
-            # Convert to nested array format
-            result = [
-                {"type_category": cat, "values": items}
-                for cat, items in grouped.items()
-            ]
-            # Optional: stable sort categories alphabetically
-            result.sort(key=lambda x: x["type_category"]) 
-            return result
+        return await cached_response(request, METADATA_TYPES_GROUPED_KEY, _load_metadata_types_grouped)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch grouped metadata types: {str(e)}")
-    finally:
-        if 'conn' in locals():
-            conn.close()
+
+
+async def _load_metadata_types_grouped():
+    async with get_async_db_connection() as conn, conn.cursor() as cur:
+        await cur.execute(
+            """
+            SELECT metadata_type_id, type_category, type_value, type_code,
+                   display_order, description
+            FROM intelliaudit_dev.config_metadata_types
+            WHERE is_active = TRUE
+            ORDER BY type_category, display_order, type_value
+            """
+        )
+        rows = await cur.fetchall()
+        grouped: Dict[str, List[Dict[str, Any]]] = {}
+        for r in rows:
+            cat = r[1]
+            item = {
+                "metadata_type_id": str(r[0]),
+                "type_value": r[2],
+                "type_code": r[3],
+                "display_order": r[4],
+                "description": r[5],
+            }
+            grouped.setdefault(cat, []).append(item)
+
+        # Convert to nested array format
+        result = [
+            {"type_category": cat, "values": items}
+            for cat, items in grouped.items()
+        ]
+        # Optional: stable sort categories alphabetically
+        result.sort(key=lambda x: x["type_category"]) 
+        return result
 
 
@@ -3,7 +3,7 @@ from pydantic import BaseModel, Field
 from typing import Optional, List, Dict, Any
 from uuid import UUID, uuid4
 from datetime import datetime, date
-from app.config.database_simple import get_db_connection
+from app.config.database_async import get_async_db_connection
 
 router = APIRouter(prefix="/project-management", tags=["Project Management"])
 
@@ -72,31 +72,30 @@ def _calculate_duration_days(start_dt: date, end_dt: date) -> int:
 async def create_project(project_data: ProjectCreate):
     """Create a new project with framework and user assignments"""
     try:
-        conn = get_db_connection()
-        with conn.cursor() as cur:
+        async with get_async_db_connection() as conn, conn.cursor() as cur:
             # Validate frameworks exist
             framework_placeholders = ','.join(['%s'] * len(project_data.framework_ids))
-            cur.execute(
+            await cur.execute(
                 f"SELECT framework_id FROM intelliaudit_dev.config_frameworks WHERE framework_id IN ({framework_placeholders})",
                 [str(fw_id) for fw_id in project_data.framework_ids]
             )
-            valid_frameworks = cur.fetchall()
+            valid_frameworks = await cur.fetchall()
             if len(valid_frameworks) != len(project_data.framework_ids):
                 raise HTTPException(status_code=400, detail="One or more framework IDs are invalid")
 
             # Validate users exist
             user_placeholders = ','.join(['%s'] * len(project_data.user_ids))
-            cur.execute(
+            await cur.execute(
                 f"SELECT user_uid FROM intelliaudit_dev.app_user WHERE user_uid IN ({user_placeholders})",
                 [str(user_id) for user_id in project_data.user_ids]
             )
-            valid_users = cur.fetchall()
+            valid_users = await cur.fetchall()
             if len(valid_users) != len(project_data.user_ids):
                 raise HTTPException(status_code=400, detail="One or more user IDs are invalid")
 
             # Create project
             project_id = uuid4()
-            cur.execute(
+            await cur.execute(
                 """
                 INSERT INTO intelliaudit_dev.projects (
                     project_id, project_name, project_desc, status, start_dt, end_dt,
@@ -118,11 +117,11 @@ async def create_project(project_data: ProjectCreate):
                 ),
             )
             
-            new_project_id = cur.fetchone()[0]
+            new_project_id = (await cur.fetchone())[0]
 
             # Assign frameworks to project
             for framework_id in project_data.framework_ids:
-                cur.execute(
+                await cur.execute(
                     """
                     INSERT INTO intelliaudit_dev.projects_audit_frameworks (
                         project_id, aud_frmwk_id, created_at, updated_at
@@ -140,7 +139,7 @@ async def create_project(project_data: ProjectCreate):
 
             # Assign users to project
             for user_id in project_data.user_ids:
-                cur.execute(
+                await cur.execute(
                     """
                     INSERT INTO intelliaudit_dev.projects_users (
                         project_id, user_uid, created_at, updated_at
@@ -156,7 +155,7 @@ async def create_project(project_data: ProjectCreate):
                     ),
                 )
             
-            conn.commit()
+            await conn.commit()
             
             return {
                 "project_id": str(new_project_id),
@@ -166,21 +165,15 @@ async def create_project(project_data: ProjectCreate):
     except HTTPException:
         raise
     except Exception as e:
-        if 'conn' in locals():
-            conn.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to create project: {str(e)}")
-    finally:
-        if 'conn' in locals():
-            conn.close()
 
 @router.get("/projects", response_model=List[ProjectSummaryResponse])
 async def get_all_projects():
     """Get all projects with comprehensive information"""
     try:
-        conn = get_db_connection()
-        with conn.cursor() as cur:
+        async with get_async_db_connection() as conn, conn.cursor() as cur:
             # Get all projects
-            cur.execute(
+            await cur.execute(
                 """
                 SELECT 
                     p.project_id, p.project_name, p.project_desc, p.status,
@@ -191,11 +184,11 @@ async def get_all_projects():
             )
             
             projects = []
-            for row in cur.fetchall():
+            for row in await cur.fetchall():
                 project_id, project_name, project_desc, status, start_dt, end_dt, created_at, updated_at = row
                 
                 # Get frameworks for this project
-                cur.execute(
+                await cur.execute(
                     """
                     SELECT f.framework_id, f.framework_name
                     FROM intelliaudit_dev.projects_audit_frameworks paf
@@ -206,11 +199,11 @@ async def get_all_projects():
                 )
                 frameworks = [
                     {"framework_id": str(fw[0]), "framework_name": fw[1]}
-                    for fw in cur.fetchall()
+                    for fw in await cur.fetchall()
                 ]
 
                 # Get users for this project
-                cur.execute(
+                await cur.execute(
                     """
                     SELECT u.user_uid, u.first_name, u.last_name, r.role_name
                     FROM intelliaudit_dev.projects_users pu
@@ -227,7 +220,7 @@ async def get_all_projects():
                         "last_name": user[2],
                         "role": user[3] or "Unknown"
                     }
-                    for user in cur.fetchall()
+                    for user in await cur.fetchall()
                 ]
 
                 # Calculate timeline and stats
@@ -260,18 +253,14 @@ async def get_all_projects():
             
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch projects: {str(e)}")
-    finally:
-        if 'conn' in locals():
-            conn.close()
 
 @router.get("/projects/{project_id}", response_model=ProjectResponse)
 async def get_project_by_id(project_id: UUID):
     """Get project details by project_id"""
     try:
-        conn = get_db_connection()
-        with conn.cursor() as cur:
+        async with get_async_db_connection() as conn, conn.cursor() as cur:
             # Get project details
-            cur.execute(
+            await cur.execute(
                 """
                 SELECT 
                     p.project_id, p.project_name, p.project_desc, p.status,
@@ -282,14 +271,14 @@ async def get_project_by_id(project_id: UUID):
                 (str(project_id),)
             )
             
-            row = cur.fetchone()
+            row = await cur.fetchone()
             if not row:
                 raise HTTPException(status_code=404, detail="Project not found")
             
             project_id, project_name, project_desc, status, start_dt, end_dt, created_at, updated_at = row
             
             # Get frameworks for this project
-            cur.execute(
+            await cur.execute(
                 """
                 SELECT f.framework_id, f.framework_name
                 FROM intelliaudit_dev.projects_audit_frameworks paf
@@ -300,11 +289,11 @@ async def get_project_by_id(project_id: UUID):
             )
             frameworks = [
                 {"framework_id": str(fw[0]), "framework_name": fw[1]}
-                for fw in cur.fetchall()
+                for fw in await cur.fetchall()
             ]
 
             # Get users for this project
-            cur.execute(
+            await cur.execute(
                 """
                 SELECT u.user_uid, u.first_name, u.last_name, r.role_name
                 FROM intelliaudit_dev.projects_users pu
@@ -321,7 +310,7 @@ async def get_project_by_id(project_id: UUID):
                     "last_name": user[2],
                     "role": user[3] or "Unknown"
                 }
-                for user in cur.fetchall()
+                for user in await cur.fetchall()
             ]
 
             # Calculate timeline and stats
@@ -356,22 +345,18 @@ async def get_project_by_id(project_id: UUID):
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch project: {str(e)}")
-    finally:
-        if 'conn' in locals():
-            conn.close()
 
 @router.put("/projects/{project_id}")
 async def update_project(project_id: UUID, project_data: ProjectUpdate):
     """Update project information"""
     try:
-        conn = get_db_connection()
-        with conn.cursor() as cur:
+        async with get_async_db_connection() as conn, conn.cursor() as cur:
             # Check if project exists
-            cur.execute(
+            await cur.execute(
                 "SELECT project_id FROM intelliaudit_dev.projects WHERE project_id = %s",
                 (str(project_id),)
             )
-            if not cur.fetchone():
+            if not await cur.fetchone():
                 raise HTTPException(status_code=404, detail="Project not found")
 
             # Build update query for basic project fields
@@ -396,7 +381,7 @@ async def update_project(project_id: UUID, project_data: ProjectUpdate):
                 basic_values.append(_now())
                 basic_values.append(str(project_id))
 
-                cur.execute(
+                await cur.execute(
                     f"""
                     UPDATE intelliaudit_dev.projects
                     SET {', '.join(basic_fields)}
@@ -409,23 +394,23 @@ async def update_project(project_id: UUID, project_data: ProjectUpdate):
             if project_data.framework_ids is not None:
                 # Validate frameworks exist
                 framework_placeholders = ','.join(['%s'] * len(project_data.framework_ids))
-                cur.execute(
+                await cur.execute(
                     f"SELECT framework_id FROM intelliaudit_dev.config_frameworks WHERE framework_id IN ({framework_placeholders})",
                     [str(fw_id) for fw_id in project_data.framework_ids]
                 )
-                valid_frameworks = cur.fetchall()
+                valid_frameworks = await cur.fetchall()
                 if len(valid_frameworks) != len(project_data.framework_ids):
                     raise HTTPException(status_code=400, detail="One or more framework IDs are invalid")
 
                 # Delete existing framework assignments
-                cur.execute(
+                await cur.execute(
                     "DELETE FROM intelliaudit_dev.projects_audit_frameworks WHERE project_id = %s",
                     (str(project_id),)
                 )
 
                 # Insert new framework assignments
                 for framework_id in project_data.framework_ids:
-                    cur.execute(
+                    await cur.execute(
                         """
                         INSERT INTO intelliaudit_dev.projects_audit_frameworks (
                             project_id, aud_frmwk_id, created_at, updated_at
@@ -445,23 +430,23 @@ async def update_project(project_id: UUID, project_data: ProjectUpdate):
             if project_data.user_ids is not None:
                 # Validate users exist
                 user_placeholders = ','.join(['%s'] * len(project_data.user_ids))
-                cur.execute(
+                await cur.execute(
                     f"SELECT user_uid FROM intelliaudit_dev.app_user WHERE user_uid IN ({user_placeholders})",
                     [str(user_id) for user_id in project_data.user_ids]
                 )
-                valid_users = cur.fetchall()
+                valid_users = await cur.fetchall()
                 if len(valid_users) != len(project_data.user_ids):
                     raise HTTPException(status_code=400, detail="One or more user IDs are invalid")
 
                 # Delete existing user assignments
-                cur.execute(
+                await cur.execute(
                     "DELETE FROM intelliaudit_dev.projects_users WHERE project_id = %s",
                     (str(project_id),)
                 )
 
                 # Insert new user assignments
                 for user_id in project_data.user_ids:
-                    cur.execute(
+                    await cur.execute(
                         """
                         INSERT INTO intelliaudit_dev.projects_users (
                             project_id, user_uid, created_at, updated_at
@@ -477,48 +462,37 @@ async def update_project(project_id: UUID, project_data: ProjectUpdate):
                         ),
                     )
             
-            conn.commit()
+            await conn.commit()
             return {"message": "Project updated successfully"}
             
     except HTTPException:
         raise
     except Exception as e:
-        if 'conn' in locals():
-            conn.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to update project: {str(e)}")
-    finally:
-        if 'conn' in locals():
-            conn.close()
 
 @router.delete("/projects/{project_id}")
 async def delete_project(project_id: UUID):
     """Delete a project and all its associations"""
     try:
-        conn = get_db_connection()
-        with conn.cursor() as cur:
+        async with get_async_db_connection() as conn, conn.cursor() as cur:
             # Check if project exists
-            cur.execute(
+            await cur.execute(
                 "SELECT project_id FROM intelliaudit_dev.projects WHERE project_id = %s",
                 (str(project_id),)
             )
-            if not cur.fetchone():
+            if not await cur.fetchone():
                 raise HTTPException(status_code=404, detail="Project not found")
 
             # Delete project (cascade will handle related records)
-            cur.execute(
+            await cur.execute(
                 "DELETE FROM intelliaudit_dev.projects WHERE project_id = %s",
                 (str(project_id),)
             )
             
-            conn.commit()
+            await conn.commit()
             return {"message": "Project deleted successfully"}
             
     except HTTPException:
         raise
     except Exception as e:
-        if 'conn' in locals():
-            conn.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to delete project: {str(e)}")
-    finally:
-        if 'conn' in locals():
-            conn.close()
@@ -1,9 +1,10 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel, Field, EmailStr
 from typing import Optional, List, Dict, Any
 from uuid import UUID, uuid4
 from datetime import datetime, date
-from app.config.database_simple import get_db_connection
+from app.config.database_async import get_async_db_connection
+from app.core.cache import cached_response, ROLES_KEY
 
 router = APIRouter(prefix="/user-management", tags=["User Management"])
 
@@ -68,27 +69,26 @@ def _calculate_duration_days(start_dt: date, end_dt: date) -> int:
 async def create_user(user_data: UserCreate):
     """Create a new user"""
     try:
-        conn = get_db_connection()
-        with conn.cursor() as cur:
+        async with get_async_db_connection() as conn, conn.cursor() as cur:
             # Validate role exists
-            cur.execute(
+            await cur.execute(
                 "SELECT role_id FROM intelliaudit_dev.user_role_lkup WHERE role_id = %s AND is_active = TRUE",
                 (str(user_data.role_id),)
             )
-            if not cur.fetchone():
+            if not await cur.fetchone():
                 raise HTTPException(status_code=400, detail="Invalid or inactive role_id")
 
             # Check if email already exists
-            cur.execute(
+            await cur.execute(
                 "SELECT user_uid FROM intelliaudit_dev.app_user WHERE email = %s",
                 (user_data.email,)
             )
-            if cur.fetchone():
+            if await cur.fetchone():
                 raise HTTPException(status_code=400, detail="Email already exists")
 
             # Create user
             user_uid = uuid4()
-            cur.execute(
+            await cur.execute(
                 """
                 INSERT INTO intelliaudit_dev.app_user (
                     user_uid, first_name, last_name, email, role, department,
@@ -112,8 +112,8 @@ async def create_user(user_data: UserCreate):
                 ),
             )
             
-            new_user_id = cur.fetchone()[0]
-            conn.commit()
+            new_user_id = (await cur.fetchone())[0]
+            await conn.commit()
             
             return {
                 "user_uid": str(new_user_id),
@@ -123,20 +123,14 @@ async def create_user(user_data: UserCreate):
     except HTTPException:
         raise
     except Exception as e:
-        if 'conn' in locals():
-            conn.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to create user: {str(e)}")
-    finally:
-        if 'conn' in locals():
-            conn.close()
 
 @router.get("/users", response_model=List[UserResponse])
 async def get_all_users():
     """Get all users with role information"""
     try:
-        conn = get_db_connection()
-        with conn.cursor() as cur:
-            cur.execute(
+        async with get_async_db_connection() as conn, conn.cursor() as cur:
+            await cur.execute(
                 """
                 SELECT 
                     u.user_uid, u.first_name, u.last_name, u.email, u.role,
@@ -149,7 +143,7 @@ async def get_all_users():
             )
             
             users = []
-            for row in cur.fetchall():
+            for row in await cur.fetchall():
                 users.append({
                     "user_uid": row[0],
                     "first_name": row[1],
@@ -169,17 +163,13 @@ async def get_all_users():
             
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch users: {str(e)}")
-    finally:
-        if 'conn' in locals():
-            conn.close()
 
 @router.get("/users/{user_uid}", response_model=UserResponse)
 async def get_user_by_id(user_uid: UUID):
     """Get user details by user_uid"""
     try:
-        conn = get_db_connection()
-        with conn.cursor() as cur:
-            cur.execute(
+        async with get_async_db_connection() as conn, conn.cursor() as cur:
+            await cur.execute(
                 """
                 SELECT 
                     u.user_uid, u.first_name, u.last_name, u.email, u.role,
@@ -192,7 +182,7 @@ async def get_user_by_id(user_uid: UUID):
                 (str(user_uid),)
             )
             
-            row = cur.fetchone()
+            row = await cur.fetchone()
             if not row:
                 raise HTTPException(status_code=404, detail="User not found")
             
@@ -215,40 +205,36 @@ async def get_user_by_id(user_uid: UUID):
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch user: {str(e)}")
-    finally:
-        if 'conn' in locals():
-            conn.close()
 
 @router.put("/users/{user_uid}")
 async def update_user(user_uid: UUID, user_data: UserUpdate):
     """Update user information"""
     try:
-        conn = get_db_connection()
-        with conn.cursor() as cur:
+        async with get_async_db_connection() as conn, conn.cursor() as cur:
             # Check if user exists
-            cur.execute(
+            await cur.execute(
                 "SELECT user_uid FROM intelliaudit_dev.app_user WHERE user_uid = %s",
                 (str(user_uid),)
             )
-            if not cur.fetchone():
+            if not await cur.fetchone():
                 raise HTTPException(status_code=404, detail="User not found")
 
             # Validate role if being updated
             if user_data.role_id:
-                cur.execute(
+                await cur.execute(
                     "SELECT role_id FROM intelliaudit_dev.user_role_lkup WHERE role_id = %s AND is_active = TRUE",
                     (str(user_data.role_id),)
                 )
-                if not cur.fetchone():
+                if not await cur.fetchone():
                     raise HTTPException(status_code=400, detail="Invalid or inactive role_id")
 
             # Check email uniqueness if being updated
             if user_data.email:
-                cur.execute(
+                await cur.execute(
                     "SELECT user_uid FROM intelliaudit_dev.app_user WHERE email = %s AND user_uid != %s",
                     (user_data.email, str(user_uid))
                 )
-                if cur.fetchone():
+                if await cur.fetchone():
                     raise HTTPException(status_code=400, detail="Email already exists")
 
             # Build update query
@@ -279,7 +265,7 @@ async def update_user(user_uid: UUID, user_data: UserUpdate):
             values.append(_now())
             values.append(str(user_uid))
 
-            cur.execute(
+            await cur.execute(
                 f"""
                 UPDATE intelliaudit_dev.app_user
                 SET {', '.join(fields)}
@@ -288,82 +274,70 @@ async def update_user(user_uid: UUID, user_data: UserUpdate):
                 tuple(values),
             )
             
-            conn.commit()
+            await conn.commit()
             return {"message": "User updated successfully"}
             
     except HTTPException:
         raise
     except Exception as e:
-        if 'conn' in locals():
-            conn.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to update user: {str(e)}")
-    finally:
-        if 'conn' in locals():
-            conn.close()
 
 @router.delete("/users/{user_uid}")
 async def delete_user(user_uid: UUID):
     """Delete a user"""
     try:
-        conn = get_db_connection()
-        with conn.cursor() as cur:
+        async with get_async_db_connection() as conn, conn.cursor() as cur:
             # Check if user exists
-            cur.execute(
+            await cur.execute(
                 "SELECT user_uid FROM intelliaudit_dev.app_user WHERE user_uid = %s",
                 (str(user_uid),)
             )
-            if not cur.fetchone():
+            if not await cur.fetchone():
                 raise HTTPException(status_code=404, detail="User not found")
 
             # Delete user
-            cur.execute(
+            await cur.execute(
                 "DELETE FROM intelliaudit_dev.app_user WHERE user_uid = %s",
                 (str(user_uid),)
             )
             
-            conn.commit()
+            await conn.commit()
             return {"message": "User deleted successfully"}
             
     except HTTPException:
         raise
     except Exception as e:
-        if 'conn' in locals():
-            conn.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to delete user: {str(e)}")
-    finally:
-        if 'conn' in locals():
-            conn.close()
 
 # ==========
 # Role Management
 # ==========
 
 @router.get("/roles", response_model=List[RoleResponse])
-async def get_active_roles():
+async def get_active_roles(request: Request):
     """Get all active roles"""
     try:
-        conn = get_db_connection()
-        with conn.cursor() as cur:
-            cur.execute(
-                """
-                SELECT role_id, role_name
-                FROM intelliaudit_dev.user_role_lkup
-                WHERE is_active = TRUE
-                ORDER BY role_name
-                """
-            )
-            
-            roles = []
-            for row in cur.fetchall():
-                roles.append({
-                    "role_id": row[0],
-                    "role_name": row[1],
-                })
-            
-            return roles
-            
+        return await cached_response(request, ROLES_KEY, _load_active_roles)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch roles: {str(e)}")
-    finally:
-        if 'conn' in locals():
-            conn.close()
+
+
+async def _load_active_roles():
+    async with get_async_db_connection() as conn, conn.cursor() as cur:
+        await cur.execute(
+            """
+            SELECT role_id, role_name
+            FROM intelliaudit_dev.user_role_lkup
+            WHERE is_active = TRUE
+            ORDER BY role_name
+            """
+        )
+
+        roles = []
+        for row in await cur.fetchall():
+            roles.append({
+                "role_id": row[0],
+                "role_name": row[1],
+            })
+
+        return roles
@@ -1,8 +1,12 @@
 import os
+import psycopg
+from psycopg.pq import TransactionStatus
 from urllib.parse import quote_plus
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, Session
 from dotenv import load_dotenv
+from app.core.metrics import stage_timer, DB_STATEMENTS_TOTAL
+from app.core.tracing import sql_span
 
 load_dotenv()
 
@@ -20,15 +24,94 @@ encoded_password = quote_plus(password)
 DATABASE_URL = f"postgresql://{username}:{encoded_password}@{host}:{port}/{database}"
 DB_SCHEMA = schema
 
-# Create engine
-engine = create_engine(DATABASE_URL, pool_pre_ping=True)
+# LISTEN needs a session connection: the Supabase transaction pooler (6543) never delivers
+# notifications, so listen through the session pooler (5432) on the same host by default
+listen_port = os.getenv("DB_LISTEN_PORT", "5432" if port == "6543" else port)
+LISTEN_DATABASE_URL = f"postgresql://{username}:{encoded_password}@{host}:{listen_port}/{database}"
+
+# One connection budget per worker. psycopg sync and async connections cannot be shared, so the
+# sync pool below (SQLAlchemy sessions, raw psycopg, pipeline threads) and the async pool in
+# database_async.py (API routers) split DB_POOL_MAX_SIZE between them rather than each taking it
+POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "1"))
+POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+ASYNC_POOL_MAX_SIZE = max(POOL_MAX_SIZE // 2, 1)
+SYNC_POOL_MAX_SIZE = max(POOL_MAX_SIZE - ASYNC_POOL_MAX_SIZE, 1)
+ASYNC_POOL_MIN_SIZE = min(POOL_MIN_SIZE, ASYNC_POOL_MAX_SIZE)
+SYNC_POOL_MIN_SIZE = min(POOL_MIN_SIZE, SYNC_POOL_MAX_SIZE)
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# Server-side limit per statement, applied at the start of every transaction; 0 disables it
+STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "60000"))
+
+# How hot queries are prepared (see app/core/prepared.py). "named" works through the transaction
+# pooler (6543); "session" uses psycopg's prepared statements and needs a direct or session-pooled
+# connection; "off" disables preparation
+PREPARE_MODE = os.getenv("DB_PREPARE_MODE", "named" if port == "6543" else "session")
+# psycopg's automatic preparation (after 5 executions of a query) is only safe on session connections
+PREPARE_THRESHOLD = 5 if PREPARE_MODE == "session" else None
+
+# Behind the transaction pooler (6543) consecutive transactions can run on different server backends,
+# so session-level SETs do not stick. The instrumented cursors send this as the first statement of
+# every transaction instead; SET LOCAL only lasts until that transaction ends
+TRANSACTION_SETUP_SQL = f"SET LOCAL search_path TO {DB_SCHEMA}; SET LOCAL statement_timeout = {STATEMENT_TIMEOUT_MS}"
+
+def _begin_transaction(cursor):
+    """Apply search_path and statement_timeout when the cursor's statement is about to open a transaction"""
+    conn = cursor.connection
+    if conn.autocommit or conn.info.transaction_status != TransactionStatus.IDLE:
+        return
+    DB_STATEMENTS_TOTAL.inc()
+    # A plain cursor, so the setup does not recurse through the instrumented execute
+    with psycopg.Cursor(conn) as setup:
+        setup.execute(TRANSACTION_SETUP_SQL, prepare=False)
+
+class InstrumentedCursor(psycopg.Cursor):
+    """Cursor that counts statements and records a tracing span per SQL statement"""
+
+    def execute(self, query, params=None, **kwargs):
+        _begin_transaction(self)
+        DB_STATEMENTS_TOTAL.inc()
+        with sql_span(query):
+            return super().execute(query, params, **kwargs)
+
+    def executemany(self, query, params_seq, **kwargs):
+        _begin_transaction(self)
+        DB_STATEMENTS_TOTAL.inc()
+        with sql_span(query):
+            return super().executemany(query, params_seq, **kwargs)
+
+class InstrumentedServerCursor(psycopg.ServerCursor):
+    """Named (server-side) cursor with the same transaction setup"""
+
+    def execute(self, query, params=None, **kwargs):
+        _begin_transaction(self)
+        DB_STATEMENTS_TOTAL.inc()
+        with sql_span(query):
+            return super().execute(query, params, **kwargs)
+
+# The sync pool. SQLAlchemy drives psycopg 3 with the instrumented cursor, so sessions and
+# get_db_connection() callers share connections, counters and spans.
+engine = create_engine(
+    f"postgresql+psycopg://{username}:{encoded_password}@{host}:{port}/{database}",
+    pool_size=SYNC_POOL_MIN_SIZE,
+    max_overflow=SYNC_POOL_MAX_SIZE - SYNC_POOL_MIN_SIZE,
+    pool_timeout=POOL_TIMEOUT,
+    pool_pre_ping=True,
+    connect_args={"cursor_factory": InstrumentedCursor, "prepare_threshold": PREPARE_THRESHOLD},
+)
+
+@event.listens_for(engine, "connect")
+def _configure_connection(dbapi_connection, connection_record):
+    # Session state is set per transaction, see TRANSACTION_SETUP_SQL
+    dbapi_connection.server_cursor_factory = InstrumentedServerCursor
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 def get_db():
     db = SessionLocal()
     try:
-        # Set search path to intelliaudit_dev schema on each connection
-        db.execute(text(f'SET search_path TO {DB_SCHEMA}'))
+        # Checking out the connection is the pool wait
+        with stage_timer("db_pool_wait"):
+            db.connection()
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
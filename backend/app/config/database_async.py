@@ -0,0 +1,67 @@
+from contextlib import asynccontextmanager
+import psycopg
+from psycopg.pq import TransactionStatus
+from psycopg_pool import AsyncConnectionPool
+from app.config.database import DATABASE_URL, TRANSACTION_SETUP_SQL, ASYNC_POOL_MIN_SIZE, ASYNC_POOL_MAX_SIZE, POOL_TIMEOUT, PREPARE_THRESHOLD
+from app.core.metrics import stage_timer, DB_STATEMENTS_TOTAL
+from app.core.tracing import sql_span
+
+async def _begin_transaction(cursor):
+    """Apply search_path and statement_timeout when the cursor's statement is about to open a transaction"""
+    conn = cursor.connection
+    if conn.autocommit or conn.info.transaction_status != TransactionStatus.IDLE:
+        return
+    DB_STATEMENTS_TOTAL.inc()
+    # A plain cursor, so the setup does not recurse through the instrumented execute
+    async with psycopg.AsyncCursor(conn) as setup:
+        await setup.execute(TRANSACTION_SETUP_SQL, prepare=False)
+
+class InstrumentedAsyncCursor(psycopg.AsyncCursor):
+    """Async cursor that counts statements and records a tracing span per SQL statement"""
+
+    async def execute(self, query, params=None, **kwargs):
+        await _begin_transaction(self)
+        DB_STATEMENTS_TOTAL.inc()
+        with sql_span(query):
+            return await super().execute(query, params, **kwargs)
+
+    async def executemany(self, query, params_seq, **kwargs):
+        await _begin_transaction(self)
+        DB_STATEMENTS_TOTAL.inc()
+        with sql_span(query):
+            return await super().executemany(query, params_seq, **kwargs)
+
+class InstrumentedAsyncServerCursor(psycopg.AsyncServerCursor):
+    """Named (server-side) cursor with the same transaction setup, e.g. for the evidence export"""
+
+    async def execute(self, query, params=None, **kwargs):
+        await _begin_transaction(self)
+        DB_STATEMENTS_TOTAL.inc()
+        with sql_span(query):
+            return await super().execute(query, params, **kwargs)
+
+async def _configure(conn):
+    # Runs once per new pooled connection; session state is set per transaction, see TRANSACTION_SETUP_SQL
+    conn.server_cursor_factory = InstrumentedAsyncServerCursor
+
+async_pool = AsyncConnectionPool(
+    DATABASE_URL,
+    min_size=ASYNC_POOL_MIN_SIZE,
+    max_size=ASYNC_POOL_MAX_SIZE,
+    timeout=POOL_TIMEOUT,
+    kwargs={"cursor_factory": InstrumentedAsyncCursor, "prepare_threshold": PREPARE_THRESHOLD},
+    configure=_configure,
+    open=False,
+)
+
+@asynccontextmanager
+async def get_async_db_connection():
+    """Borrow a pooled async connection. Commit explicitly; anything uncommitted is rolled back on return."""
+    with stage_timer("db_pool_wait"):
+        conn = await async_pool.getconn()
+    try:
+        yield conn
+    finally:
+        if conn.info.transaction_status in (TransactionStatus.INTRANS, TransactionStatus.INERROR):
+            await conn.rollback()
+        await async_pool.putconn(conn)
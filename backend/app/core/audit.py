@@ -1,7 +1,13 @@
+import asyncio
 import json
 import re
-from app.settings import CRITERIA_PATH
+import threading
+from app.settings import CRITERIA_PATH, LLM_STRUCTURED_OUTPUT
 from app.core.llm import query_llm
+from app.core.tracing import span
+from app.core.scheduler import audit_scheduler
+from app.core.dedup import dedupe_evidence
+from app.core.metrics import AUDIT_EVALUATIONS_SKIPPED_TOTAL, AUDIT_EVALUATIONS_RESUMED_TOTAL, AUDIT_RESPONSE_PARSE_TOTAL
 
 def load_criteria():
     # Try to load NCQA criteria first, fallback to original criteria
@@ -19,17 +25,24 @@ def extract_json_from_response(response: str):
     response = re.sub(r'```json\s*', '', response)
     response = re.sub(r'```\s*$', '', response)
     response = response.strip()
+    if not response:
+        AUDIT_RESPONSE_PARSE_TOTAL.labels(outcome="empty").inc()
+        return None
     
     # Try to find JSON object in the response
     try:
         # First, try to parse the entire response as JSON
-        return json.loads(response)
+        parsed = json.loads(response)
+        AUDIT_RESPONSE_PARSE_TOTAL.labels(outcome="json").inc()
+        return parsed
     except json.JSONDecodeError:
         # If that fails, try to extract JSON object using regex
         json_match = re.search(r'\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}', response)
         if json_match:
             try:
-                return json.loads(json_match.group())
+                parsed = json.loads(json_match.group())
+                AUDIT_RESPONSE_PARSE_TOTAL.labels(outcome="extracted").inc()
+                return parsed
             except json.JSONDecodeError:
                 pass
         
@@ -44,6 +57,7 @@ def extract_json_from_response(response: str):
             risk_level_match = re.search(r'"risk_level":\s*"([^"]*)"', response)
             
             if found_match:
+                AUDIT_RESPONSE_PARSE_TOTAL.labels(outcome="salvaged").inc()
                 return {
                     "found": found_match.group(1).lower() == "true",
                     "evidence": evidence_match.group(1) if evidence_match else "",
@@ -55,11 +69,34 @@ def extract_json_from_response(response: str):
         except Exception:
             pass
     
+    AUDIT_RESPONSE_PARSE_TOTAL.labels(outcome="failed").inc()
     return None
 
-def create_ncqa_audit_prompt(criteria_item, text):
-    """Create a comprehensive NCQA audit prompt for healthcare compliance"""
-    
+def _answer_instructions(structured: bool, indent: str):
+    """
+    (respond, no_evidence, found, closing) prompt lines for an evidence answer. A
+    schema-bound answer (EVIDENCE_SCHEMA) must always carry every field, so no
+    evidence is reported as found: false rather than by not responding.
+    """
+    if structured:
+        return (
+            "1. Report evidence ONLY if you find specific evidence supporting this criterion\n",
+            "2. If no evidence is found, respond with \"found\": false, empty strings for the text fields, "
+            "a compliance_score of 0 and a risk_level of \"Low\"\n",
+            f"{indent}\"found\": true,\n",
+            "CRITICAL: If no evidence exists, do not explain why no evidence was found.",
+        )
+    # Token-efficient prompt: LLM only responds if evidence is found
+    return (
+        "1. ONLY respond if you find specific evidence supporting this criterion\n",
+        "2. If no evidence is found, DO NOT respond at all (save tokens)\n",
+        "",
+        "CRITICAL: If no evidence exists, return nothing. Do not explain why no evidence was found.",
+    )
+
+def create_ncqa_audit_prompt(criteria_item, text, structured: bool = LLM_STRUCTURED_OUTPUT != "off"):
+    """Create a comprehensive NCQA audit prompt for healthcare compliance; structured as in build_page_prompt()"""
+    respond, no_evidence, found, closing = _answer_instructions(structured, "    ")
     prompt = f"""
 You are a healthcare compliance auditor specializing in NCQA standards. Audit this document against the specific criterion.
 
@@ -74,19 +111,17 @@ DOCUMENT TO AUDIT:
 {text}
 
 INSTRUCTIONS:
-1. ONLY respond if you find specific evidence supporting this criterion
-2. If no evidence is found, DO NOT respond at all (save tokens)
-3. If evidence is found, respond with ONLY this JSON:
+{respond}{no_evidence}3. If evidence is found, respond with ONLY this JSON:
 
 {{
-    "evidence": "[specific text or evidence found]",
+{found}    "evidence": "[specific text or evidence found]",
     "explanation": "[how this evidence demonstrates compliance]",
     "remarks": "[additional observations or recommendations]",
     "compliance_score": [0-100],
     "risk_level": "Low|Medium|High|Critical"
 }}
 
-CRITICAL: If no evidence exists, return nothing. Do not explain why no evidence was found.
+{closing}
 """
     return prompt
 
@@ -97,7 +132,7 @@ def run_audit_on_text(text: str, model: str = None, provider: str = None):
     for c in criteria:
         # Use NCQA-specific prompt if available, otherwise use generic prompt
         if 'compliance_requirements' in c:
-            prompt = create_ncqa_audit_prompt(c, text)
+            prompt = create_ncqa_audit_prompt(c, text, structured=False)
         else:
             # Fallback to original prompt format
             prompt = (
@@ -110,7 +145,7 @@ def run_audit_on_text(text: str, model: str = None, provider: str = None):
             )
         
         try:
-            llm_response = query_llm(prompt, model, 0.1, provider)  # Lower temperature for more consistent results
+            llm_response = query_llm(prompt, model, 0.1, provider, trace_attributes={"audit.criterion": c["criteria"]})  # Lower temperature for more consistent results
             
             # Use the improved JSON extraction function
             parsed = extract_json_from_response(llm_response)
@@ -150,64 +185,237 @@ def run_audit_on_text(text: str, model: str = None, provider: str = None):
         })
     return results 
 
-def run_audit_on_text_by_page(pages: list[dict[str, str]], model: str = None, provider: str = None):
+class StopPolicy:
+    """Early termination per criterion, from an optional "stop_policy" in the criteria JSON:
+
+        "stop_policy": {"findings": 1, "min_compliance_score": 80}
+
+    Once a criterion has `findings` results scoring at least `min_compliance_score` (default 0),
+    its remaining pages are not sent to the LLM. Criteria without a stop_policy are audited on
+    every page. Thread-safe, so scheduled evaluations can record results as they complete.
+    """
+
+    def __init__(self, criteria: list):
+        self._needed = {}
+        for c in criteria:
+            policy = c.get("stop_policy")
+            if policy:
+                self._needed[c["criteria"]] = (int(policy.get("findings", 1)), float(policy.get("min_compliance_score", 0)))
+        self._found = {name: 0 for name in self._needed}
+        self._lock = threading.Lock()
+
+    def satisfied(self, c: dict) -> bool:
+        name = c["criteria"]
+        if name not in self._needed:
+            return False
+        with self._lock:
+            return self._found[name] >= self._needed[name][0]
+
+    def record(self, c: dict, result):
+        name = c["criteria"]
+        if result is None or name not in self._needed:
+            return
+        try:
+            score = float(result.get("compliance_score") or 0)
+        except (TypeError, ValueError):
+            score = 0
+        if score >= self._needed[name][1]:
+            with self._lock:
+                self._found[name] += 1
+
+    def skip(self, c: dict) -> bool:
+        """True, and counted, when c's evaluation can be skipped"""
+        if self.satisfied(c):
+            AUDIT_EVALUATIONS_SKIPPED_TOTAL.inc()
+            return True
+        return False
+
+def evaluate_page_criterion(page_number, page_text: str, c: dict, model: str = None, provider: str = None):
+    """One LLM evaluation of a page against a criterion; returns the evidence result, or None"""
+    try:
+        return _evaluate(page_number, page_text, c, model, provider)
+    except Exception as e:
+        # Log error and continue with next
+        print(f"Error processing criteria '{c['criteria']}': {str(e)}")
+        return None
+
+def build_page_prompt(page_number, page_text: str, c: dict, structured: bool = LLM_STRUCTURED_OUTPUT != "off") -> str:
+    """
+    The prompt asking whether page_text has evidence for criterion c. structured
+    is whether the answer is held to EVIDENCE_SCHEMA, and switches how no
+    evidence is reported (see _answer_instructions).
+    """
+    if 'compliance_requirements' in c:
+        return create_ncqa_audit_prompt(c, page_text, structured)
+    respond, no_evidence, found, closing = _answer_instructions(structured, "  ")
+    return (
+        f"Audit this document page against the criterion: '{c['criteria']}'\n"
+        f"Category: {c['category']}\n"
+        f"Description: {c['description']}\n\n"
+        f"Document (Page {page_number}):\n{page_text}\n\n"
+        f"INSTRUCTIONS:\n"
+        f"{respond}"
+        f"{no_evidence}"
+        f"3. If evidence is found, respond with ONLY this JSON:\n"
+        f"{{\n"
+        f"{found}"
+        f"  \"evidence\": \"[specific text or description of evidence]\",\n"
+        f"  \"explanation\": \"[how this evidence supports the criterion]\",\n"
+        f"  \"remarks\": \"[additional notes]\",\n"
+        f"  \"compliance_score\": [0-100],\n"
+        f"  \"risk_level\": \"Low|Medium|High|Critical\"\n"
+        f"}}\n\n"
+        f"{closing}"
+    )
+
+# The answer build_page_prompt() asks for. Providers with structured output are held to it
+# (query_llm's response_schema), so their answers parse on extract_json_from_response's first try.
+# Strict-mode compatible: every field required, no additional properties
+EVIDENCE_SCHEMA = {
+    "title": "evidence",
+    "type": "object",
+    "properties": {
+        "found": {"type": "boolean", "description": "Whether the page has specific evidence for the criterion"},
+        "evidence": {"type": "string", "description": "Specific text or evidence found; empty when found is false"},
+        "explanation": {"type": "string", "description": "How this evidence demonstrates compliance"},
+        "remarks": {"type": "string", "description": "Additional observations or recommendations"},
+        "compliance_score": {"type": "integer", "description": "0-100"},
+        "risk_level": {"type": "string", "enum": ["Low", "Medium", "High", "Critical"]},
+    },
+    "required": ["found", "evidence", "explanation", "remarks", "compliance_score", "risk_level"],
+    "additionalProperties": False,
+}
+
+def parse_page_response(llm_response: str, page_number, c: dict):
+    """The evidence result in an LLM answer to build_page_prompt(), or None when it reports none"""
+    parsed = extract_json_from_response(llm_response)
+    # print(f"llm_response: {llm_response}")
+
+    # Structured answers always carry the fields, and say found: false when there is no evidence
+    if isinstance(parsed, dict) and parsed.get("found") is False:
+        return None
+    # Since LLM only responds when evidence is found, simple validation is sufficient
+    if parsed and isinstance(parsed, dict) and parsed.get("evidence"):
+        evidence = parsed.get("evidence", "")
+        if evidence.strip():  # Basic check for non-empty evidence
+            return {
+                "criteria": c["criteria"],
+                "category": c["category"],
+                "factor": c.get("factor", ""),
+                "evidence": evidence,
+                "explanation": parsed.get("explanation", ""),
+                "remarks": parsed.get("remarks", ""),
+                "compliance_score": parsed.get("compliance_score", 0),
+                "risk_level": parsed.get("risk_level", "Unknown"),
+                "page": page_number
+            }
+    return None
+
+def _evaluate(page_number, page_text: str, c: dict, model: str = None, provider: str = None):
+    """evaluate_page_criterion() without the error handling; LLM errors propagate"""
+    llm_response = query_llm(
+        build_page_prompt(page_number, page_text, c), model, 0.1, provider,
+        trace_attributes={"audit.criterion": c["criteria"], "audit.page": page_number},
+        response_schema=EVIDENCE_SCHEMA
+    )
+    return parse_page_response(llm_response, page_number, c)
+
+def _evaluate_and_record(page: dict, c: dict, model, provider, stop_policy, checkpoint):
+    """evaluate_page_criterion() that also feeds the stop policy and the checkpoint; failed calls are not checkpointed"""
+    try:
+        result = _evaluate(page["page"], page["text"], c, model, provider)
+    except Exception as e:
+        print(f"Error processing criteria '{c['criteria']}': {str(e)}")
+        return None
+    stop_policy.record(c, result)
+    if checkpoint is not None:
+        checkpoint.record(page, c, result)
+    return result
+
+def _resumed(page: dict, c: dict, stop_policy, checkpoint):
+    """True when checkpoint already holds (page, c); its result then counts towards the stop policy"""
+    if checkpoint is None or not checkpoint.done(page, c):
+        return False
+    stop_policy.record(c, checkpoint.result(page, c))
+    AUDIT_EVALUATIONS_RESUMED_TOTAL.inc()
+    return True
+
+@span("run_audit_on_text_by_page")
+def run_audit_on_text_by_page(pages: list[dict[str, str]], model: str = None, provider: str = None, progress=None,
+                              checkpoint=None):
+    """progress: optional app.core.progress.ProgressTracker, advanced once per (page, criterion).
+    checkpoint: optional app.core.checkpoint.AuditCheckpoint; pairs it already holds are not sent to the LLM.
+    Near-duplicate evidence of the same criterion is folded by app.core.dedup.dedupe_evidence"""
     criteria = load_criteria()
+    stop_policy = StopPolicy(criteria)
     results = []
+    if checkpoint is not None:
+        checkpoint.load(pages)
+    if progress is not None:
+        progress.start(len(pages) * len(criteria))
 
     for page in pages:
-        page_number = page["page"]
-        page_text = page["text"]
-
         for c in criteria:
-            if 'compliance_requirements' in c:
-                prompt = create_ncqa_audit_prompt(c, page_text)
+            if _resumed(page, c, stop_policy, checkpoint):
+                result = checkpoint.result(page, c)
+            elif stop_policy.skip(c):
+                result = None
             else:
-                # Token-efficient prompt: LLM only responds if evidence is found
-                prompt = (
-                    f"Audit this document page against the criterion: '{c['criteria']}'\n"
-                    f"Category: {c['category']}\n"
-                    f"Description: {c['description']}\n\n"
-                    f"Document (Page {page_number}):\n{page_text}\n\n"
-                    f"INSTRUCTIONS:\n"
-                    f"1. ONLY respond if you find specific evidence supporting this criterion\n"
-                    f"2. If no evidence is found, DO NOT respond at all (save tokens)\n"
-                    f"3. If evidence is found, respond with ONLY this JSON:\n"
-                    f"{{\n"
-                    f"  \"evidence\": \"[specific text or description of evidence]\",\n"
-                    f"  \"explanation\": \"[how this evidence supports the criterion]\",\n"
-                    f"  \"remarks\": \"[additional notes]\",\n"
-                    f"  \"compliance_score\": [0-100],\n"
-                    f"  \"risk_level\": \"Low|Medium|High\"\n"
-                    f"}}\n\n"
-                    f"CRITICAL: If no evidence exists, return nothing. Do not explain why no evidence was found."
-                )
+                result = _evaluate_and_record(page, c, model, provider, stop_policy, checkpoint)
+            if result is not None:
+                results.append(result)
+            if progress is not None:
+                progress.advance()
 
-            try:
-                llm_response = query_llm(prompt, model, 0.1, provider)
-                parsed = extract_json_from_response(llm_response)
-                # print(f"llm_response: {llm_response}")
-
-                # Since LLM only responds when evidence is found, simple validation is sufficient
-                if parsed and isinstance(parsed, dict) and parsed.get("evidence"):
-                    evidence = parsed.get("evidence", "")
-                    if evidence.strip():  # Basic check for non-empty evidence
-                        results.append({
-                            "criteria": c["criteria"],
-                            "category": c["category"],
-                            "factor": c.get("factor", ""),
-                            "evidence": evidence,
-                            "explanation": parsed.get("explanation", ""),
-                            "remarks": parsed.get("remarks", ""),
-                            "compliance_score": parsed.get("compliance_score", 0),
-                            "risk_level": parsed.get("risk_level", "Unknown"),
-                            "page": page_number
-                        })
-
-            except Exception as e:
-                # Log error and continue with next
-                print(f"Error processing criteria '{c['criteria']}': {str(e)}")
-                continue
+    if checkpoint is not None:
+        checkpoint.flush()
+    return dedupe_evidence(results)
+
+async def run_audit_on_pages_scheduled(pages: list[dict[str, str]], model: str = None, provider: str = None, progress=None,
+                                      flow: str = None, weight: float = 1.0, checkpoint=None):
+    """run_audit_on_text_by_page() through the shared scheduler: every (page, criterion) evaluation is
+    queued at once and shares provider throughput with every other audit in flight by flow and weight"""
+    criteria = load_criteria()
+    stop_policy = StopPolicy(criteria)
+    if checkpoint is not None:
+        await asyncio.to_thread(checkpoint.load, pages)
+    if progress is not None:
+        await asyncio.to_thread(progress.start, len(pages) * len(criteria))
+    writes = set()
 
-    return results
+    def advanced(evaluation: asyncio.Future):
+        # On the event loop, not a scheduler worker: a progress write must not hold an LLM_MAX_CONCURRENCY slot
+        if evaluation.cancelled():
+            return
+        snapshot = progress.advance_snapshot()
+        if snapshot is not None:
+            write = asyncio.ensure_future(asyncio.to_thread(progress.write, snapshot))
+            writes.add(write)
+            write.add_done_callback(writes.discard)
 
+    # Per (page, criterion), in order: the checkpointed result, or the future of its evaluation
+    ordered = []
+    resumed = 0
+    for page in pages:
+        for c in criteria:
+            if _resumed(page, c, stop_policy, checkpoint):
+                ordered.append(checkpoint.result(page, c))
+                resumed += 1
+                continue
+            # Queued pages of a criterion whose stop_policy is met by the time they reach a worker are dropped
+            future = asyncio.wrap_future(audit_scheduler.submit_llm(
+                _evaluate_and_record, page, c, model, provider, stop_policy, checkpoint,
+                flow=flow, weight=weight, skip_if=lambda c=c: stop_policy.skip(c)
+            ))
+            if progress is not None:
+                future.add_done_callback(advanced)
+            ordered.append(future)
+    if progress is not None and resumed:
+        await asyncio.to_thread(progress.advance, resumed)
 
+    await asyncio.gather(*(item for item in ordered if isinstance(item, asyncio.Future)))
+    await asyncio.gather(*writes)
+    if checkpoint is not None:
+        await asyncio.to_thread(checkpoint.flush)
+    results = [item.result() if isinstance(item, asyncio.Future) else item for item in ordered]
+    return dedupe_evidence([result for result in results if result is not None])
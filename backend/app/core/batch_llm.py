@@ -0,0 +1,223 @@
+"""
+Provider batch APIs for bulk, non-urgent audits.
+
+A batch is a JSONL file with one request per line. Each line carries an id
+(custom_id for OpenAI, key for Gemini) that comes back unchanged on the
+matching output line. Providers run batches asynchronously, within 24 hours,
+at a lower price per token than real-time calls.
+
+Backends share one interface: submit(input_path, model) returns a provider
+job id; status(job_id) returns "running", "completed" or "failed"; and
+download(job_id, output_path) writes the output JSONL.
+
+  openai  Files + Batches API (/v1/chat/completions requests)
+  gemini  Gemini API batch mode (batchGenerateContent over an uploaded file)
+  local   file-based stand-in for offline runs: status() answers every line
+          through query_llm with BATCH_LOCAL_PROVIDER and writes output in
+          the requested provider format. Point the custom provider at
+          benchmarks/fake_llm_server.py for a run with no network access.
+"""
+import json
+import os
+import shutil
+import uuid
+
+import openai
+import requests
+
+from app.core.llm import query_llm, openai_response_format, gemini_response_config
+from app.settings import GEMINI_API_KEY, BATCH_LOCAL_PROVIDER
+
+BATCH_TEMPERATURE = 0.1
+BATCH_MAX_TOKENS = 512
+
+GEMINI_API_ROOT = "https://generativelanguage.googleapis.com"
+
+
+def openai_request(custom_id: str, prompt: str, model: str, response_schema: dict = None) -> dict:
+    body = {
+        "model": model,
+        "messages": [{"role": "user", "content": prompt}],
+        "temperature": BATCH_TEMPERATURE,
+        "max_tokens": BATCH_MAX_TOKENS,
+    }
+    response_format = openai_response_format(response_schema)
+    if response_format:
+        body["response_format"] = response_format
+    return {"custom_id": custom_id, "method": "POST", "url": "/v1/chat/completions", "body": body}
+
+
+def gemini_request(key: str, prompt: str, model: str, response_schema: dict = None) -> dict:
+    return {
+        "key": key,
+        "request": {
+            "contents": [{"role": "user", "parts": [{"text": prompt}]}],
+            "generation_config": {
+                "temperature": BATCH_TEMPERATURE,
+                "max_output_tokens": BATCH_MAX_TOKENS,
+                **gemini_response_config(response_schema),
+            },
+        },
+    }
+
+
+REQUEST_BUILDERS = {"openai": openai_request, "gemini": gemini_request}
+
+
+def parse_output_line(line: dict, batch_format: str):
+    """(request id, response text or None, error or None) for one output line"""
+    if batch_format == "openai":
+        request_id = line.get("custom_id")
+        response = line.get("response") or {}
+        if line.get("error") or response.get("status_code") != 200:
+            return request_id, None, line.get("error") or response.get("body")
+        choices = response["body"].get("choices") or []
+        return request_id, (choices[0]["message"].get("content") or "") if choices else "", None
+
+    request_id = line.get("key")
+    if line.get("error"):
+        return request_id, None, line["error"]
+    candidates = (line.get("response") or {}).get("candidates") or []
+    parts = candidates[0].get("content", {}).get("parts", []) if candidates else []
+    return request_id, "".join(part.get("text", "") for part in parts), None
+
+
+class OpenAIBatchBackend:
+    format = "openai"
+
+    def submit(self, input_path: str, model: str) -> str:
+        with open(input_path, "rb") as f:
+            uploaded = openai.files.create(file=f, purpose="batch")
+        batch = openai.batches.create(input_file_id=uploaded.id, endpoint="/v1/chat/completions", completion_window="24h")
+        return batch.id
+
+    def status(self, job_id: str) -> str:
+        batch = openai.batches.retrieve(job_id)
+        if batch.status == "completed":
+            return "completed"
+        if batch.status in ("failed", "expired", "cancelled"):
+            return "failed"
+        return "running"
+
+    def download(self, job_id: str, output_path: str):
+        batch = openai.batches.retrieve(job_id)
+        # Every request failed when there is no output file; missing lines are reported at ingest
+        content = openai.files.content(batch.output_file_id).content if batch.output_file_id else b""
+        with open(output_path, "wb") as f:
+            f.write(content)
+
+
+class GeminiBatchBackend:
+    format = "gemini"
+
+    def _call(self, method: str, url: str, params: dict = None, **kwargs):
+        response = requests.request(method, url, params={**(params or {}), "key": GEMINI_API_KEY}, timeout=300, **kwargs)
+        if response.status_code != 200:
+            raise Exception(f"Gemini batch API error: HTTP {response.status_code} - {response.text}")
+        return response
+
+    def submit(self, input_path: str, model: str) -> str:
+        size = os.path.getsize(input_path)
+        start = self._call("POST", f"{GEMINI_API_ROOT}/upload/v1beta/files", headers={
+            "X-Goog-Upload-Protocol": "resumable",
+            "X-Goog-Upload-Command": "start",
+            "X-Goog-Upload-Header-Content-Length": str(size),
+            "X-Goog-Upload-Header-Content-Type": "application/jsonl",
+        }, json={"file": {"display_name": os.path.basename(input_path)}})
+        with open(input_path, "rb") as f:
+            uploaded = self._call("POST", start.headers["X-Goog-Upload-URL"], headers={
+                "X-Goog-Upload-Offset": "0",
+                "X-Goog-Upload-Command": "upload, finalize",
+            }, data=f).json()
+        batch = self._call("POST", f"{GEMINI_API_ROOT}/v1beta/models/{model}:batchGenerateContent", json={
+            "batch": {"display_name": os.path.basename(input_path), "input_config": {"file_name": uploaded["file"]["name"]}},
+        }).json()
+        return batch["name"]
+
+    def _batch(self, job_id: str) -> dict:
+        return self._call("GET", f"{GEMINI_API_ROOT}/v1beta/{job_id}").json()
+
+    def status(self, job_id: str) -> str:
+        state = self._batch(job_id).get("metadata", {}).get("state")
+        if state == "BATCH_STATE_SUCCEEDED":
+            return "completed"
+        if state in ("BATCH_STATE_FAILED", "BATCH_STATE_CANCELLED", "BATCH_STATE_EXPIRED"):
+            return "failed"
+        return "running"
+
+    def download(self, job_id: str, output_path: str):
+        batch = self._batch(job_id)
+        responses_file = (batch.get("response") or {}).get("responsesFile") \
+            or batch.get("metadata", {}).get("output", {}).get("responsesFile")
+        content = self._call("GET", f"{GEMINI_API_ROOT}/download/v1beta/{responses_file}:download",
+                             params={"alt": "media"}).content if responses_file else b""
+        with open(output_path, "wb") as f:
+            f.write(content)
+
+
+class LocalBatchBackend:
+    """Offline stand-in; jobs are directories under work_dir"""
+
+    def __init__(self, work_dir: str, batch_format: str = "openai", provider: str = BATCH_LOCAL_PROVIDER):
+        self.work_dir = work_dir
+        self.format = batch_format
+        self.provider = provider
+
+    def submit(self, input_path: str, model: str) -> str:
+        job_id = f"local-{uuid.uuid4().hex[:12]}"
+        job_dir = os.path.join(self.work_dir, job_id)
+        os.makedirs(job_dir)
+        shutil.copyfile(input_path, os.path.join(job_dir, "input.jsonl"))
+        with open(os.path.join(job_dir, "model"), "w") as f:
+            f.write(model or "")
+        return job_id
+
+    def status(self, job_id: str) -> str:
+        job_dir = os.path.join(self.work_dir, job_id)
+        output_path = os.path.join(job_dir, "output.jsonl")
+        if not os.path.exists(output_path):
+            self._run(job_dir, output_path)
+        return "completed"
+
+    def download(self, job_id: str, output_path: str):
+        shutil.copyfile(os.path.join(self.work_dir, job_id, "output.jsonl"), output_path)
+
+    def _run(self, job_dir: str, output_path: str):
+        with open(os.path.join(job_dir, "model")) as f:
+            model = f.read() or None
+        partial = output_path + ".partial"
+        with open(os.path.join(job_dir, "input.jsonl")) as requests_file, open(partial, "w") as out:
+            for raw in requests_file:
+                line = json.loads(raw)
+                if self.format == "openai":
+                    request_id, prompt = line["custom_id"], line["body"]["messages"][0]["content"]
+                else:
+                    request_id, prompt = line["key"], line["request"]["contents"][0]["parts"][0]["text"]
+                try:
+                    text, error = query_llm(prompt, model, BATCH_TEMPERATURE, self.provider), None
+                except Exception as e:
+                    text, error = None, str(e)
+                out.write(json.dumps(self._output_line(request_id, text, error)) + "\n")
+        os.replace(partial, output_path)
+
+    def _output_line(self, request_id: str, text, error) -> dict:
+        if self.format == "openai":
+            if error is not None:
+                return {"custom_id": request_id, "response": None, "error": {"message": error}}
+            return {"custom_id": request_id, "error": None, "response": {
+                "status_code": 200, "body": {"choices": [{"index": 0, "message": {"role": "assistant", "content": text}}]},
+            }}
+        if error is not None:
+            return {"key": request_id, "error": {"message": error}}
+        return {"key": request_id, "response": {"candidates": [{"content": {"role": "model", "parts": [{"text": text}]}}]}}
+
+
+def get_batch_backend(name: str, work_dir: str, batch_format: str = None):
+    """Backend by name; batch_format only applies to the local backend"""
+    if name == "openai":
+        return OpenAIBatchBackend()
+    if name == "gemini":
+        return GeminiBatchBackend()
+    if name == "local":
+        return LocalBatchBackend(os.path.join(work_dir, "local-backend"), batch_format or "openai")
+    raise ValueError(f"Unsupported batch backend: {name}")
@@ -0,0 +1,79 @@
+"""
+In-process read-through cache for near-static reference data.
+
+Entries hold the already-serialized JSON body and its ETag, so a hit costs
+no database round-trip and no re-encoding, and a matching If-None-Match is
+answered with 304. Write handlers call reference_cache.invalidate() with a
+key prefix after they commit.
+"""
+import hashlib
+import inspect
+import threading
+from typing import Callable, NamedTuple
+
+import orjson
+from cachetools import TTLCache
+from fastapi import Request, Response
+
+from app.core.metrics import REFERENCE_CACHE_TOTAL
+from app.settings import REFERENCE_CACHE_TTL_SECONDS
+
+# Cache keys; invalidate() matches on prefix
+WORKFLOW_FRAMEWORKS_KEY = "workflow:frameworks"
+METADATA_TYPES_GROUPED_KEY = "config:metadata-types:grouped"
+ROLES_KEY = "users:roles"
+CRITERIA_KEY = "config:criteria"
+FRAMEWORK_SUMMARY_KEY = "config:framework-summary:"
+
+
+class CacheEntry(NamedTuple):
+    body: bytes
+    etag: str
+
+
+class ReferenceCache:
+    def __init__(self, ttl: float, maxsize: int = 1024):
+        self._entries = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        self._generation = 0
+
+    async def get_or_load(self, key: str, loader: Callable[[], object]) -> CacheEntry:
+        """Return the cached entry for key, calling loader (sync or async) on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            generation = self._generation
+        if entry is not None:
+            REFERENCE_CACHE_TOTAL.labels(outcome="hit").inc()
+            return entry
+
+        REFERENCE_CACHE_TOTAL.labels(outcome="miss").inc()
+        value = loader()
+        if inspect.isawaitable(value):
+            value = await value
+        body = orjson.dumps(value)
+        entry = CacheEntry(body, '"' + hashlib.sha1(body).hexdigest() + '"')
+        with self._lock:
+            # Don't store a value loaded before an invalidation that raced with it
+            if generation == self._generation:
+                self._entries[key] = entry
+        return entry
+
+    def invalidate(self, prefix: str = ""):
+        with self._lock:
+            self._generation += 1
+            for key in [k for k in self._entries if k.startswith(prefix)]:
+                del self._entries[key]
+
+
+reference_cache = ReferenceCache(REFERENCE_CACHE_TTL_SECONDS)
+
+
+async def cached_response(request: Request, key: str, loader: Callable[[], object]) -> Response:
+    """Serve key from the reference cache, answering 304 when the client's ETag still matches"""
+    entry = await reference_cache.get_or_load(key, loader)
+    # no-cache: browsers keep the body but revalidate every time, so edits show up immediately
+    headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if entry.etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+    return Response(entry.body, media_type="application/json", headers=headers)
@@ -0,0 +1,61 @@
+"""
+Cross-worker invalidation for the reference cache over Postgres LISTEN/NOTIFY.
+
+A write handler commits through commit_and_invalidate(): it NOTIFYs the
+channel inside the write's own transaction, commits, then evicts the key
+prefix locally. Postgres delivers a notification only when its transaction
+commits and drops it on rollback, so other workers hear about exactly the
+writes that became visible, and never before they are. Every worker (on
+every node) runs an InvalidationListener that evicts the same prefix when
+the notification arrives, so TTLs only bound staleness if a notification is
+lost, e.g. while a listener is reconnecting.
+"""
+import threading
+
+import psycopg
+
+from app.core.cache import reference_cache
+
+INVALIDATION_CHANNEL = "intelliaudit_cache_invalidation"
+
+
+async def commit_and_invalidate(conn, prefix: str):
+    """Commit the write open on the async connection and evict prefix here and in every other worker"""
+    async with conn.cursor() as cur:
+        await cur.execute("SELECT pg_notify(%s, %s)", (INVALIDATION_CHANNEL, prefix))
+    await conn.commit()
+    # Evicted after the commit, so a concurrent read cannot refill the entry from the old rows
+    reference_cache.invalidate(prefix)
+
+
+class InvalidationListener:
+    """Background thread holding a LISTEN connection and evicting notified prefixes"""
+
+    def __init__(self, database_url: str, reconnect_delay: float = 5.0):
+        self.database_url = database_url
+        self.reconnect_delay = reconnect_delay
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="cache-invalidation-listener", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                with psycopg.connect(self.database_url, autocommit=True) as conn:
+                    conn.execute(f"LISTEN {INVALIDATION_CHANNEL}")
+                    # Anything sent while we were disconnected is lost, so start from an empty cache
+                    reference_cache.invalidate()
+                    while not self._stop.is_set():
+                        for notify in conn.notifies(timeout=1.0):
+                            reference_cache.invalidate(notify.payload)
+            except Exception as e:
+                print(f"Cache invalidation listener error, reconnecting: {str(e)}")
+                self._stop.wait(self.reconnect_delay)
@@ -0,0 +1,140 @@
+"""
+Checkpoints for long audits.
+
+Every completed (page, criterion) evaluation, with or without evidence, is
+buffered and written to audit_checkpoints in batches of CHECKPOINT_BATCH_SIZE
+(or after CHECKPOINT_INTERVAL_SECONDS). If the worker dies mid-audit, uploading
+the same document again resumes: pairs already checkpointed for the same page
+text, model and provider are answered from the table instead of the LLM. The
+rows are removed once the document's evidence has been persisted, so they
+only ever describe unfinished runs.
+"""
+import hashlib
+import threading
+import time
+
+from psycopg.types.json import Jsonb
+
+from app.config.database_simple import get_db_connection
+from app.core.metrics import stage_timer
+from app.settings import CHECKPOINT_BATCH_SIZE, CHECKPOINT_INTERVAL_SECONDS
+
+LOAD_CHECKPOINTS_SQL = """
+    SELECT page_number, criteria, page_hash, result
+    FROM intelliaudit_dev.audit_checkpoints
+    WHERE audit_request_id = %s AND document_id = %s
+      AND model IS NOT DISTINCT FROM %s AND provider IS NOT DISTINCT FROM %s
+"""
+
+UPSERT_CHECKPOINTS_SQL = """
+    INSERT INTO intelliaudit_dev.audit_checkpoints (
+        audit_request_id, document_id, page_number, criteria, page_hash, model, provider, result, created_at
+    )
+    SELECT %s, %s, c.page_number, c.criteria, c.page_hash, %s, %s, c.result, now()
+    FROM unnest(%s::int[], %s::text[], %s::text[], %s::jsonb[]) AS c(page_number, criteria, page_hash, result)
+    ON CONFLICT (audit_request_id, document_id, page_number, criteria) DO UPDATE
+    SET page_hash = EXCLUDED.page_hash, model = EXCLUDED.model, provider = EXCLUDED.provider,
+        result = EXCLUDED.result, created_at = EXCLUDED.created_at
+"""
+
+DELETE_CHECKPOINTS_SQL = """
+    DELETE FROM intelliaudit_dev.audit_checkpoints WHERE audit_request_id = %s AND document_id = %s
+"""
+
+
+def page_hash(page_text: str) -> str:
+    return hashlib.md5((page_text or "").encode("utf-8")).hexdigest()
+
+
+class AuditCheckpoint:
+    """Checkpointed (page, criterion) results for one document run; record() is thread-safe"""
+
+    def __init__(self, audit_request_id: str, document_id: str, model: str = None, provider: str = None,
+                 batch_size: int = CHECKPOINT_BATCH_SIZE, interval: float = CHECKPOINT_INTERVAL_SECONDS):
+        self.audit_request_id = str(audit_request_id)
+        self.document_id = str(document_id)
+        self.model = model
+        self.provider = provider
+        self.batch_size = batch_size
+        self.interval = interval
+        self._done = {}
+        self._pending = []
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+
+    def load(self, pages: list):
+        """Read the checkpoints that still apply to these pages; returns how many pairs are done"""
+        hashes = {page["page"]: page_hash(page["text"]) for page in pages}
+        conn = get_db_connection()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(LOAD_CHECKPOINTS_SQL, (self.audit_request_id, self.document_id, self.model, self.provider))
+                rows = cursor.fetchall()
+            conn.commit()
+        finally:
+            conn.close()
+        # A page whose text changed since the checkpoint was written is evaluated again
+        self._done = {
+            (page_number, criteria): result
+            for page_number, criteria, stored_hash, result in rows
+            if hashes.get(page_number) == stored_hash
+        }
+        return len(self._done)
+
+    def done(self, page: dict, c: dict) -> bool:
+        return (page["page"], c["criteria"]) in self._done
+
+    def result(self, page: dict, c: dict):
+        """The checkpointed result for a done pair (None when the page had no evidence)"""
+        return self._done[(page["page"], c["criteria"])]
+
+    def record(self, page: dict, c: dict, result):
+        """Buffer one completed evaluation; flushes when the batch is full or the interval has passed"""
+        with self._lock:
+            self._pending.append((page["page"], c["criteria"], page_hash(page["text"]), result))
+            if len(self._pending) < self.batch_size and time.monotonic() - self._last_flush < self.interval:
+                return
+        self.flush()
+
+    def flush(self):
+        """Write buffered evaluations. Best effort: on failure they stay buffered for the next flush"""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+                self._last_flush = time.monotonic()
+            if not batch:
+                return
+            try:
+                self._write(batch)
+            except Exception as e:
+                print(f"Failed to write audit checkpoint: {str(e)}")
+                with self._lock:
+                    self._pending = batch + self._pending
+
+    def clear(self):
+        """Forget this document's checkpoints (the run finished, or a fresh run was requested)"""
+        with self._lock:
+            self._pending = []
+        self._done = {}
+        conn = get_db_connection()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(DELETE_CHECKPOINTS_SQL, (self.audit_request_id, self.document_id))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _write(self, batch: list):
+        page_numbers, criteria, hashes, results = zip(*batch)
+        conn = get_db_connection()
+        try:
+            with conn.cursor() as cursor, stage_timer("db_write"):
+                cursor.execute(UPSERT_CHECKPOINTS_SQL, (
+                    self.audit_request_id, self.document_id, self.model, self.provider,
+                    list(page_numbers), list(criteria), list(hashes),
+                    [Jsonb(result) if result is not None else None for result in results],
+                ))
+            conn.commit()
+        finally:
+            conn.close()
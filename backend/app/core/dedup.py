@@ -0,0 +1,142 @@
+"""
+Near-duplicate evidence clustering.
+
+Boilerplate that repeats on every page (running headers, policy statements,
+signature blocks) makes the LLM report the same finding once per page. After
+evaluation, results are grouped per criterion and near-duplicates are folded
+into one representative that lists every page the evidence was found on.
+
+Similarity is Jaccard over word shingles, estimated with MinHash and indexed
+with LSH banding, so each result is hashed once and only compared with the
+results it shares a band bucket with: near-linear in the number of findings
+rather than quadratic. Candidates are confirmed with the exact Jaccard of
+their shingle sets before they are merged.
+"""
+import hashlib
+import re
+from array import array
+from collections import defaultdict
+
+from app.core.metrics import EVIDENCE_DEDUPLICATED_TOTAL, stage_timer
+from app.settings import EVIDENCE_DEDUP, EVIDENCE_DEDUP_THRESHOLD, EVIDENCE_DEDUP_NUM_PERM, EVIDENCE_DEDUP_BANDS
+
+SHINGLE_SIZE = 3
+_HASHES_PER_DIGEST = 64 // array("I").itemsize
+_WORD = re.compile(r"\w+")
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> frozenset:
+    """Word n-grams of the lowercased text; text shorter than size is one shingle"""
+    words = _WORD.findall((text or "").lower())
+    if len(words) <= size:
+        return frozenset([" ".join(words)])
+    return frozenset(" ".join(words[i:i + size]) for i in range(len(words) - size + 1))
+
+
+def jaccard(a: frozenset, b: frozenset) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class MinHasher:
+    """
+    MinHash signatures of num_perm 32-bit hash functions. Every salted 64-byte
+    BLAKE2b digest of a shingle yields 16 of them at once, and the per-function
+    minimum over the shingles is taken in C through zip / min.
+    """
+
+    def __init__(self, num_perm: int = EVIDENCE_DEDUP_NUM_PERM):
+        self.num_perm = num_perm
+        self._salts = [i.to_bytes(8, "big") for i in range(-(-num_perm // _HASHES_PER_DIGEST))]
+
+    def _hashes(self, shingle: str) -> array:
+        data = shingle.encode()
+        values = array("I")
+        for salt in self._salts:
+            values.frombytes(hashlib.blake2b(data, digest_size=64, salt=salt).digest())
+        return values
+
+    def signature(self, shingle_set: frozenset) -> tuple:
+        return tuple(map(min, zip(*(self._hashes(shingle) for shingle in shingle_set))))[:self.num_perm]
+
+
+class _DisjointSet:
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+
+    def find(self, i: int) -> int:
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, i: int, j: int):
+        i, j = self.find(i), self.find(j)
+        if i != j:
+            # The smaller index stays the root, so a cluster is represented by its first result
+            self.parent[max(i, j)] = min(i, j)
+
+
+def cluster(texts: list, threshold: float = EVIDENCE_DEDUP_THRESHOLD, hasher: MinHasher = None,
+            bands: int = EVIDENCE_DEDUP_BANDS) -> list:
+    """Root index per text; texts whose shingle Jaccard is at least threshold share a root"""
+    hasher = hasher or MinHasher()
+    sets = [shingles(text) for text in texts]
+    groups = _DisjointSet(len(texts))
+
+    # Identical shingle sets (the common boilerplate case) are merged without hashing
+    unique = {}
+    for i, shingle_set in enumerate(sets):
+        groups.union(unique.setdefault(shingle_set, i), i)
+
+    rows = max(hasher.num_perm // bands, 1)
+    buckets = defaultdict(list)
+    for shingle_set, i in unique.items():
+        signature = hasher.signature(shingle_set)
+        for band in range(bands):
+            key = (band, signature[band * rows:(band + 1) * rows])
+            members = buckets[key]
+            # Compared with the bucket's first member only, which keeps each bucket linear
+            if members and groups.find(members[0]) != groups.find(i) and jaccard(sets[members[0]], shingle_set) >= threshold:
+                groups.union(members[0], i)
+            members.append(i)
+    return [groups.find(i) for i in range(len(texts))]
+
+
+@stage_timer("dedup")
+def dedupe_evidence(results: list, threshold: float = EVIDENCE_DEDUP_THRESHOLD, enabled: bool = EVIDENCE_DEDUP) -> list:
+    """
+    Fold near-duplicate evidence per criterion. Each cluster keeps its first
+    result (results arrive in page order, so the earliest page) with a
+    "pages" list of every page in the cluster. With dedup disabled every
+    result is kept and still gets its "pages".
+    """
+    by_criterion = defaultdict(list)
+    for i, result in enumerate(results):
+        by_criterion[result.get("criteria")].append(i)
+
+    keep = {}
+    if enabled:
+        hasher = MinHasher()
+        for indexes in by_criterion.values():
+            roots = cluster([results[i].get("evidence") for i in indexes], threshold, hasher)
+            for position, root in enumerate(roots):
+                keep.setdefault(indexes[root], []).append(results[indexes[position]].get("page"))
+    else:
+        keep = {i: [result.get("page")] for i, result in enumerate(results)}
+
+    deduped = []
+    for i, pages in sorted(keep.items()):
+        result = dict(results[i])
+        result["pages"] = sorted({page for page in pages if page is not None}, key=_page_order)
+        deduped.append(result)
+    EVIDENCE_DEDUPLICATED_TOTAL.inc(len(results) - len(deduped))
+    return deduped
+
+
+def _page_order(page):
+    try:
+        return (0, int(page))
+    except (TypeError, ValueError):
+        return (1, str(page))
@@ -3,8 +3,11 @@ import requests
 import google.generativeai as genai
 from app.settings import (
     OPENAI_API_KEY, OPENAI_API_BASE, HUGGINGFACE_API_KEY, GEMINI_API_KEY, 
-    LLM_PROVIDER, HUGGINGFACE_DEFAULT_MODEL, CUSTOM_LLM_ENDPOINT, CUSTOM_LLM_API_KEY
+    LLM_PROVIDER, HUGGINGFACE_DEFAULT_MODEL, CUSTOM_LLM_ENDPOINT, CUSTOM_LLM_API_KEY,
+    LLM_STRUCTURED_OUTPUT, CUSTOM_LLM_SCHEMA_FIELD
 )
+from app.core.metrics import stage_timer, LLM_REQUESTS_TOTAL
+from app.core.tracing import span
 
 openai.api_key = OPENAI_API_KEY
 openai.base_url = OPENAI_API_BASE
@@ -15,10 +18,61 @@ if GEMINI_API_KEY:
 
 HUGGINGFACE_API_URL = "https://api-inference.huggingface.co/models/"  # Model will be appended
 
-def query_llm(prompt: str, model: str = None, temperature: float = 0.2, provider: str = None) -> str:
+# OpenAI models that rejected a json_schema response_format; they get plain JSON mode instead
+_JSON_SCHEMA_UNSUPPORTED = set()
+# Schema keywords the Gemini API rejects
+_GEMINI_UNSUPPORTED_KEYS = {"title", "additionalProperties", "minimum", "maximum", "$schema"}
+
+def openai_response_format(schema: dict):
+    """OpenAI response_format for a JSON Schema under LLM_STRUCTURED_OUTPUT, or None"""
+    if not schema or LLM_STRUCTURED_OUTPUT == "off":
+        return None
+    if LLM_STRUCTURED_OUTPUT == "json":
+        return {"type": "json_object"}
+    return {"type": "json_schema", "json_schema": {"name": schema.get("title", "response"), "strict": True, "schema": schema}}
+
+def gemini_schema(schema: dict) -> dict:
+    """A JSON Schema in the OpenAPI subset Gemini accepts (upper-case types, no unsupported keywords)"""
+    converted = {}
+    for key, value in schema.items():
+        if key in _GEMINI_UNSUPPORTED_KEYS:
+            continue
+        if key == "type":
+            value = value.upper()
+        elif key == "properties":
+            value = {name: gemini_schema(prop) for name, prop in value.items()}
+        elif key == "items":
+            value = gemini_schema(value)
+        converted[key] = value
+    return converted
+
+def gemini_response_config(schema: dict) -> dict:
+    """Gemini generation config entries for a JSON Schema under LLM_STRUCTURED_OUTPUT"""
+    if not schema or LLM_STRUCTURED_OUTPUT == "off":
+        return {}
+    if LLM_STRUCTURED_OUTPUT == "json":
+        return {"response_mime_type": "application/json"}
+    return {"response_mime_type": "application/json", "response_schema": gemini_schema(schema)}
+
+def query_llm(prompt: str, model: str = None, temperature: float = 0.2, provider: str = None, trace_attributes: dict = None,
+              response_schema: dict = None) -> str:
+    """response_schema: optional JSON Schema the answer must follow, enforced through the provider's
+    structured output support (see LLM_STRUCTURED_OUTPUT); providers without it ignore it"""
     # Use provided provider or fallback to environment setting
     current_provider = provider or LLM_PROVIDER
-    
+
+    attributes = {"llm.provider": current_provider, "llm.model": model or "", "llm.prompt_chars": len(prompt)}
+    attributes.update(trace_attributes or {})
+    with span("query_llm", **attributes), stage_timer("llm"):
+        try:
+            response = _query_provider(prompt, model, temperature, current_provider, response_schema)
+        except Exception:
+            LLM_REQUESTS_TOTAL.labels(provider=current_provider, outcome="error").inc()
+            raise
+    LLM_REQUESTS_TOTAL.labels(provider=current_provider, outcome="success").inc()
+    return response
+
+def _query_provider(prompt: str, model: str, temperature: float, current_provider: str, response_schema: dict = None) -> str:
     if current_provider == 'custom':
         # Use the custom LLM endpoint
         print(f"Custom LLM endpoint: {CUSTOM_LLM_ENDPOINT}")  # Debug
@@ -39,6 +93,10 @@ def query_llm(prompt: str, model: str = None, temperature: float = 0.2, provider
             # Add model parameter if provided
             if model:
                 payload["model"] = model
+
+            # Grammar-constrained decoding (e.g. vLLM guided_json, llama.cpp json_schema)
+            if response_schema and LLM_STRUCTURED_OUTPUT != "off" and CUSTOM_LLM_SCHEMA_FIELD:
+                payload[CUSTOM_LLM_SCHEMA_FIELD] = response_schema if LLM_STRUCTURED_OUTPUT == "schema" else {"type": "object"}
             
             response = requests.post(
                 CUSTOM_LLM_ENDPOINT,
@@ -80,13 +138,31 @@ def query_llm(prompt: str, model: str = None, temperature: float = 0.2, provider
     elif current_provider == 'openai':
         model = model or "gpt-3.5-turbo"
         print(f"OpenAI base_url: {openai.base_url}, model: {model}")  # Debug
-        response = openai.chat.completions.create(
-            model=model,
-            messages=[{"role": "user", "content": prompt}],
-            temperature=temperature,
-            max_tokens=512
-        )
-        return response.choices[0].message.content.strip()
+        response_format = openai_response_format(response_schema)
+        if response_format and response_format["type"] == "json_schema" and model in _JSON_SCHEMA_UNSUPPORTED:
+            response_format = {"type": "json_object"}
+        request = {"response_format": response_format} if response_format else {}
+        try:
+            response = openai.chat.completions.create(
+                model=model,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=temperature,
+                max_tokens=512,
+                **request
+            )
+        except openai.BadRequestError as e:
+            # Older models only support JSON mode; remember that and retry once
+            if not response_format or response_format["type"] != "json_schema" or "response_format" not in str(e):
+                raise
+            _JSON_SCHEMA_UNSUPPORTED.add(model)
+            response = openai.chat.completions.create(
+                model=model,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=temperature,
+                max_tokens=512,
+                response_format={"type": "json_object"}
+            )
+        return (response.choices[0].message.content or "").strip()
     elif current_provider == 'gemini':
         model = model or "gemini-1.5-flash"
         print(f"Gemini model: {model}")  # Debug
@@ -100,7 +176,8 @@ def query_llm(prompt: str, model: str = None, temperature: float = 0.2, provider
                 temperature=temperature,
                 max_output_tokens=512,
                 top_p=0.8,
-                top_k=40
+                top_k=40,
+                **gemini_response_config(response_schema)
             )
             
             response = gemini_model.generate_content(
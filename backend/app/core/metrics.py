@@ -0,0 +1,144 @@
+import time
+from contextlib import contextmanager
+from prometheus_client import Counter, Gauge, Histogram, CONTENT_TYPE_LATEST, generate_latest
+from starlette.routing import Match
+
+# HTTP-level metrics, labelled by route template (not raw path) to keep cardinality bounded
+HTTP_REQUEST_DURATION = Histogram(
+    "intelliaudit_http_request_duration_seconds",
+    "HTTP request latency by route",
+    ["method", "route"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300),
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "intelliaudit_http_requests_in_flight",
+    "HTTP requests currently being served",
+    ["method", "route"],
+)
+HTTP_REQUESTS_TOTAL = Counter(
+    "intelliaudit_http_requests_total",
+    "HTTP requests by route and status code",
+    ["method", "route", "status"],
+)
+HTTP_REQUEST_ERRORS = Counter(
+    "intelliaudit_http_request_errors_total",
+    "HTTP requests that raised or returned a 5xx",
+    ["method", "route"],
+)
+
+# Internal pipeline stages: extraction, llm, db_write, db_pool_wait
+STAGE_DURATION = Histogram(
+    "intelliaudit_stage_duration_seconds",
+    "Time spent in internal audit pipeline stages",
+    ["stage"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120),
+)
+DB_STATEMENTS_TOTAL = Counter(
+    "intelliaudit_db_statements_total",
+    "SQL statements sent to Postgres (database round-trips)",
+)
+DB_PREPARED_STATEMENTS_TOTAL = Counter(
+    "intelliaudit_db_prepared_statements_total",
+    "Named prepared statement executions: executed (already prepared on the backend) or prepared (first run on it)",
+    ["outcome"],
+)
+LLM_REQUESTS_TOTAL = Counter(
+    "intelliaudit_llm_requests_total",
+    "LLM provider calls by provider and outcome",
+    ["provider", "outcome"],
+)
+AUDIT_RESPONSE_PARSE_TOTAL = Counter(
+    "intelliaudit_audit_response_parse_total",
+    "LLM answers by how they parsed: json (as is), extracted (JSON found inside text), salvaged (fields "
+    "recovered by pattern), empty or failed",
+    ["outcome"],
+)
+AUDIT_EVALUATIONS_SKIPPED_TOTAL = Counter(
+    "intelliaudit_audit_evaluations_skipped_total",
+    "(page, criterion) evaluations not sent to the LLM because the criterion's stop_policy was already met",
+)
+AUDIT_EVALUATIONS_RESUMED_TOTAL = Counter(
+    "intelliaudit_audit_evaluations_resumed_total",
+    "(page, criterion) evaluations answered from an interrupted run's checkpoint instead of the LLM",
+)
+
+EXTRACTION_TOKENS_REMOVED_TOTAL = Counter(
+    "intelliaudit_extraction_tokens_removed_total",
+    "Estimated prompt tokens removed from extracted pages as repeated headers, footers, page numbers and whitespace",
+)
+EVIDENCE_DEDUPLICATED_TOTAL = Counter(
+    "intelliaudit_evidence_deduplicated_total",
+    "Evidence results folded into a near-duplicate representative for the same criterion",
+)
+
+REFERENCE_CACHE_TOTAL = Counter(
+    "intelliaudit_reference_cache_requests_total",
+    "Reference data cache lookups by outcome (hit or miss)",
+    ["outcome"],
+)
+
+UNMATCHED_ROUTE = "unmatched"
+
+
+@contextmanager
+def stage_timer(stage: str):
+    """Time a pipeline stage. Usable as a context manager or a decorator."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_DURATION.labels(stage=stage).observe(time.perf_counter() - start)
+
+
+def render_metrics():
+    """Return the Prometheus exposition payload and its content type"""
+    return generate_latest(), CONTENT_TYPE_LATEST
+
+
+def _route_template(app, scope) -> str:
+    for route in app.router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(route, "path", UNMATCHED_ROUTE)
+    return UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording per-route latency, in-flight requests and errors.
+
+    Implemented as raw ASGI (rather than BaseHTTPMiddleware) so streaming
+    responses are timed until the last body chunk is sent.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = _route_template(scope["app"], scope) if "app" in scope else UNMATCHED_ROUTE
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_flight = HTTP_REQUESTS_IN_FLIGHT.labels(method=method, route=route)
+        in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception:
+            status_code = 500
+            raise
+        finally:
+            in_flight.dec()
+            HTTP_REQUEST_DURATION.labels(method=method, route=route).observe(time.perf_counter() - start)
+            HTTP_REQUESTS_TOTAL.labels(method=method, route=route, status=str(status_code)).inc()
+            if status_code >= 500:
+                HTTP_REQUEST_ERRORS.labels(method=method, route=route).inc()
@@ -0,0 +1,82 @@
+"""
+Page text normalization before audit prompts.
+
+PDF page text repeats the same running headers, footers, page numbers and
+confidentiality banners on every page, and every (page, criterion) prompt
+pays for them again. A line near the top or bottom of a page (within
+BOILERPLATE_EDGE_LINES) is treated as boilerplate when the same line, with
+digits ignored so "Page 3 of 40" matches "Page 4 of 40", sits at a page edge
+on at least BOILERPLATE_MIN_PAGE_FRACTION of the pages. Those lines and bare
+page numbers are removed, and runs of spaces and blank lines are collapsed.
+Lines in the body of a page are never removed.
+"""
+import re
+from collections import Counter
+
+from app.settings import BOILERPLATE_EDGE_LINES, BOILERPLATE_MIN_PAGE_FRACTION, BOILERPLATE_MIN_PAGES
+
+# Rough token estimate for reporting; the providers' tokenizers average about four characters per token
+CHARS_PER_TOKEN = 4
+
+_DIGITS = re.compile(r"\d+")
+_SPACES = re.compile(r"[ \t\f\v\u00a0]+")
+_BLANK_LINES = re.compile(r"\n{3,}")
+_PAGE_NUMBER = re.compile(r"^(page\s*)?[-–(\[]?\s*#\s*[-–)\]]?(\s*(of|/)\s*#)?$")
+
+
+def estimate_tokens(text: str) -> int:
+    return -(-len(text or "") // CHARS_PER_TOKEN)
+
+
+def _line_key(line: str) -> str:
+    return _DIGITS.sub("#", _SPACES.sub(" ", line).strip().lower())
+
+
+def _edge_lines(lines: list, edge: int) -> list:
+    """Indexes of the first and last edge non-blank lines, at most half the page from each side"""
+    filled = [i for i, line in enumerate(lines) if line.strip()]
+    # A short page keeps its middle line(s); on a page of one line nothing is an edge
+    edge = min(edge, len(filled) // 2)
+    return filled[:edge] + filled[-edge:] if edge > 0 else []
+
+
+def collapse_whitespace(text: str) -> str:
+    lines = [_SPACES.sub(" ", line).strip() for line in (text or "").splitlines()]
+    return _BLANK_LINES.sub("\n\n", "\n".join(lines)).strip()
+
+
+def strip_boilerplate(pages: list, edge: int = BOILERPLATE_EDGE_LINES,
+                      min_fraction: float = BOILERPLATE_MIN_PAGE_FRACTION, min_pages: int = BOILERPLATE_MIN_PAGES):
+    """
+    Pages with repeated edge lines removed and whitespace collapsed; an edge
+    of 0 only collapses whitespace. Returns (pages, report). report has lines_removed, tokens_before, tokens_after and
+    tokens_removed (estimated) for the document.
+    """
+    split = [(page["text"] or "").splitlines() for page in pages]
+    edges = [_edge_lines(lines, edge) for lines in split]
+
+    repeated = set()
+    if len(pages) >= min_pages:
+        # Counted once per page, so a line repeated within one page does not count as repeated across pages
+        counts = Counter(key for lines, indexes in zip(split, edges) for key in {_line_key(lines[i]) for i in indexes})
+        repeated = {key for key, count in counts.items() if count >= max(min_fraction * len(pages), 2)}
+
+    normalized, lines_removed = [], 0
+    for page, lines, indexes in zip(pages, split, edges):
+        drop = set()
+        for i in indexes:
+            key = _line_key(lines[i])
+            if key in repeated or _PAGE_NUMBER.match(key):
+                drop.add(i)
+        lines_removed += len(drop)
+        text = collapse_whitespace("\n".join(line for i, line in enumerate(lines) if i not in drop))
+        normalized.append({**page, "text": text})
+
+    tokens_before = sum(estimate_tokens(page["text"]) for page in pages)
+    tokens_after = sum(estimate_tokens(page["text"]) for page in normalized)
+    return normalized, {
+        "lines_removed": lines_removed,
+        "tokens_before": tokens_before,
+        "tokens_after": tokens_after,
+        "tokens_removed": tokens_before - tokens_after,
+    }
@@ -0,0 +1,135 @@
+"""
+Prepared execution for hot queries, safe behind the Supabase transaction pooler.
+
+DB_PREPARE_MODE (app/config/database.py) picks the strategy:
+
+  named    SQL-level PREPARE / EXECUTE under a name derived from the query
+           text. Through a transaction pooler each transaction can land on a
+           different backend, so EXECUTE is tried first; when that backend has
+           not seen the statement yet, the transaction is rolled back and a
+           new one, pinned to whichever backend it lands on, checks
+           pg_prepared_statements there, prepares (or re-prepares a stale
+           statement) only as that backend needs, and executes. Every backend
+           parses and plans each hot query once.
+  session  psycopg's own prepared statements (prepare=True). Only safe on
+           direct or session-pooled connections.
+  off      plain execution.
+
+Named execution needs to start its own transaction, so on a connection that
+is already inside one the query simply runs unprepared.
+"""
+import hashlib
+import re
+
+from psycopg import errors, sql
+from psycopg.pq import TransactionStatus
+
+from app.config.database import PREPARE_MODE
+from app.core.metrics import DB_PREPARED_STATEMENTS_TOTAL
+
+_PLACEHOLDER = re.compile(r"%\((\w+)\)s|%s|%%")
+# Unknown name on this backend, or the table changed shape since it was prepared
+_REPREPARE_ERRORS = (errors.InvalidSqlStatementName, errors.FeatureNotSupported)
+
+
+def statement_name(query: str) -> str:
+    """Stable per query text, so different code versions never share a name"""
+    return "ia_" + hashlib.sha1(query.encode()).hexdigest()[:16]
+
+
+def _numbered(query: str, params):
+    """Rewrite psycopg placeholders (%s or %(name)s) as $n; returns the query and the values in $n order"""
+    values, positions = [], {}
+    positional = iter(params or ())
+
+    def replace(match):
+        token = match.group(0)
+        if token == "%%":
+            return "%"
+        if token == "%s":
+            values.append(next(positional))
+            return f"${len(values)}"
+        name = match.group(1)
+        if name not in positions:
+            values.append(params[name])
+            positions[name] = len(values)
+        return f"${positions[name]}"
+
+    return _PLACEHOLDER.sub(replace, query), values
+
+
+def _statements(query: str, params):
+    name = statement_name(query)
+    identifier = sql.Identifier(name)
+    text, values = _numbered(query, params)
+    prepare = sql.SQL("PREPARE {} AS {}").format(identifier, sql.SQL(text))
+    if values:
+        execute = sql.SQL("EXECUTE {}({})").format(identifier, sql.SQL(", ").join(sql.Literal(v) for v in values))
+    else:
+        execute = sql.SQL("EXECUTE {}").format(identifier)
+    return name, prepare, execute
+
+
+PREPARED_ON_BACKEND_SQL = "SELECT 1 FROM pg_prepared_statements WHERE name = %s"
+
+
+def _reprepare(name: str, prepare, error, exists: bool) -> list:
+    """
+    Statements to run before EXECUTE after it failed with error. The retry
+    transaction can land on a different backend than the one that failed, so
+    this is decided from whether the statement exists on the retry's backend:
+    a stale one is deallocated, a missing one prepared, a current one reused.
+    """
+    statements = []
+    if exists and isinstance(error, errors.FeatureNotSupported):
+        statements.append(sql.SQL("DEALLOCATE {}").format(sql.Identifier(name)))
+        exists = False
+    if not exists:
+        statements.append(prepare)
+    return statements
+
+
+def execute_prepared(cursor, query: str, params=None):
+    """cursor.execute() for a hot query, skipping parse and plan after the first run on each backend"""
+    conn = cursor.connection
+    if PREPARE_MODE == "session":
+        return cursor.execute(query, params, prepare=True)
+    if PREPARE_MODE != "named" or conn.info.transaction_status != TransactionStatus.IDLE:
+        return cursor.execute(query, params)
+
+    name, prepare, execute = _statements(query, params)
+    try:
+        cursor.execute(execute)
+        DB_PREPARED_STATEMENTS_TOTAL.labels(outcome="executed").inc()
+    except _REPREPARE_ERRORS as e:
+        conn.rollback()
+        # One transaction from here on, so the check, PREPARE and EXECUTE all run on the same backend
+        cursor.execute(PREPARED_ON_BACKEND_SQL, (name,))
+        for statement in _reprepare(name, prepare, e, cursor.fetchone() is not None):
+            cursor.execute(statement)
+        cursor.execute(execute)
+        DB_PREPARED_STATEMENTS_TOTAL.labels(outcome="prepared").inc()
+    return cursor
+
+
+async def execute_prepared_async(cursor, query: str, params=None):
+    """Async variant of execute_prepared()"""
+    conn = cursor.connection
+    if PREPARE_MODE == "session":
+        return await cursor.execute(query, params, prepare=True)
+    if PREPARE_MODE != "named" or conn.info.transaction_status != TransactionStatus.IDLE:
+        return await cursor.execute(query, params)
+
+    name, prepare, execute = _statements(query, params)
+    try:
+        await cursor.execute(execute)
+        DB_PREPARED_STATEMENTS_TOTAL.labels(outcome="executed").inc()
+    except _REPREPARE_ERRORS as e:
+        await conn.rollback()
+        # One transaction from here on, so the check, PREPARE and EXECUTE all run on the same backend
+        await cursor.execute(PREPARED_ON_BACKEND_SQL, (name,))
+        for statement in _reprepare(name, prepare, e, await cursor.fetchone() is not None):
+            await cursor.execute(statement)
+        await cursor.execute(execute)
+        DB_PREPARED_STATEMENTS_TOTAL.labels(outcome="prepared").inc()
+    return cursor
@@ -0,0 +1,169 @@
+"""
+Live progress for a running audit.
+
+The pipeline calls ProgressTracker.advance() after every (page, criterion)
+evaluation. The tracker keeps one audit_progress row per document run and
+mirrors the latest step onto audit_requests, but only writes when the run
+has moved on by PROGRESS_MIN_FRACTION or PROGRESS_MIN_INTERVAL_SECONDS has
+passed since the last write, so a long audit costs a bounded number of
+updates however many evaluations it makes. The scheduled pipeline counts on
+the event loop with advance_snapshot() and hands the rare write to a thread.
+"""
+import threading
+import time
+from datetime import datetime
+from uuid import uuid4
+
+from psycopg.types.json import Jsonb
+
+from app.config.database_simple import get_db_connection
+from app.settings import PROGRESS_MIN_INTERVAL_SECONDS, PROGRESS_MIN_FRACTION
+
+INSERT_PROGRESS_SQL = """
+    INSERT INTO intelliaudit_dev.audit_progress (
+        audit_progress_id, audit_request_id, document_id, current_step, status,
+        started_at, time_spent_seconds, metadata, created_at, updated_at
+    ) VALUES (%s, %s, %s, %s, %s, %s, 0, %s, %s, %s)
+"""
+
+UPDATE_PROGRESS_SQL = """
+    UPDATE intelliaudit_dev.audit_progress
+    SET current_step = %s, status = %s, time_spent_seconds = %s, metadata = %s,
+        completed_at = %s, updated_at = %s
+    WHERE audit_progress_id = %s
+"""
+
+TOUCH_AUDIT_REQUEST_SQL = """
+    UPDATE intelliaudit_dev.audit_requests
+    SET current_step = %s, last_active_at = %s, updated_at = %s
+    WHERE audit_request_id = %s
+"""
+
+
+class ProgressTracker:
+    """Counts completed evaluations for one document of an audit; thread-safe"""
+
+    def __init__(self, audit_request_id: str, document_id: str = None, step: str = "LLM Audit",
+                 min_interval: float = PROGRESS_MIN_INTERVAL_SECONDS, min_fraction: float = PROGRESS_MIN_FRACTION):
+        self.audit_request_id = str(audit_request_id)
+        self.document_id = str(document_id) if document_id else None
+        self.step = step
+        self.min_interval = min_interval
+        self.min_fraction = min_fraction
+        self.progress_id = None
+        self.total = 0
+        self.completed = 0
+        self._started = None
+        self._last_write = 0.0
+        self._last_fraction = 0.0
+        self._lock = threading.Lock()
+        # Writes happen outside _lock; the sequence keeps a slow older write from landing last
+        self._write_lock = threading.Lock()
+        self._sequence = 0
+        self._written_sequence = -1
+
+    def start(self, total: int):
+        """Begin a run of total evaluations and record it immediately"""
+        with self._lock:
+            self.total = total
+            self.completed = 0
+            self._started = time.monotonic()
+            self.progress_id = uuid4()
+            snapshot = self._snapshot("in_progress")
+            self._last_write, self._last_fraction = self._started, 0.0
+        self.write(snapshot, insert=True)
+
+    def advance(self, count: int = 1):
+        """Record count more completed evaluations; writes only when the throttle allows"""
+        snapshot = self.advance_snapshot(count)
+        if snapshot is not None:
+            self.write(snapshot)
+
+    def advance_snapshot(self, count: int = 1):
+        """
+        advance() without the write: returns the snapshot to pass to write() when
+        the throttle allows, else None. Never touches the database, so it is safe
+        to call on the event loop.
+        """
+        with self._lock:
+            self.completed = min(self.completed + count, self.total)
+            now = time.monotonic()
+            fraction = self.fraction
+            if now - self._last_write < self.min_interval and fraction - self._last_fraction < self.min_fraction:
+                return None
+            snapshot = self._snapshot("in_progress")
+            self._last_write, self._last_fraction = now, fraction
+        return snapshot
+
+    def finish(self, status: str = "completed"):
+        """Final write, whatever the throttle says"""
+        with self._lock:
+            if self.progress_id is None:
+                return
+            snapshot = self._snapshot(status)
+        self.write(snapshot)
+
+    @property
+    def fraction(self) -> float:
+        return self.completed / self.total if self.total else 1.0
+
+    @property
+    def elapsed_seconds(self) -> float:
+        return time.monotonic() - self._started if self._started else 0.0
+
+    @property
+    def eta_seconds(self):
+        """Remaining time at the average rate so far; None until the first evaluation completes"""
+        if not self.completed:
+            return None
+        return self.elapsed_seconds / self.completed * (self.total - self.completed)
+
+    def _snapshot(self, status: str) -> dict:
+        eta = self.eta_seconds
+        percent = round(self.fraction * 100, 1)
+        self._sequence += 1
+        return {
+            "sequence": self._sequence,
+            "status": status,
+            "current_step": f"{self.step} ({percent}%)" if status == "in_progress" else f"{self.step} {status}",
+            "time_spent_seconds": int(self.elapsed_seconds),
+            "metadata": {
+                "completed": self.completed,
+                "total": self.total,
+                "percent": percent,
+                "eta_seconds": round(eta) if eta is not None else None,
+            },
+        }
+
+    def write(self, snapshot: dict, insert: bool = False):
+        # Progress is best effort: a failed write must never fail the audit itself
+        with self._write_lock:
+            if snapshot["sequence"] < self._written_sequence:
+                return
+            self._written_sequence = snapshot["sequence"]
+            self._write_snapshot(snapshot, insert)
+
+    def _write_snapshot(self, snapshot: dict, insert: bool):
+        now = datetime.utcnow()
+        try:
+            conn = get_db_connection()
+            try:
+                with conn.cursor() as cursor:
+                    if insert:
+                        cursor.execute(INSERT_PROGRESS_SQL, (
+                            str(self.progress_id), self.audit_request_id, self.document_id,
+                            snapshot["current_step"], snapshot["status"], now,
+                            Jsonb(snapshot["metadata"]), now, now,
+                        ))
+                    else:
+                        cursor.execute(UPDATE_PROGRESS_SQL, (
+                            snapshot["current_step"], snapshot["status"], snapshot["time_spent_seconds"],
+                            Jsonb(snapshot["metadata"]), now if snapshot["status"] != "in_progress" else None,
+                            now, str(self.progress_id),
+                        ))
+                    cursor.execute(TOUCH_AUDIT_REQUEST_SQL, (snapshot["current_step"], now, now, self.audit_request_id))
+                conn.commit()
+            finally:
+                conn.close()
+        except Exception as e:
+            print(f"Failed to record audit progress: {str(e)}")
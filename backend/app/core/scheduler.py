@@ -0,0 +1,154 @@
+"""
+Process-wide scheduler for audit work.
+
+Every audit submits its extraction and (page, criterion) LLM evaluations to
+one shared worker pool, and every LLM evaluation first takes a token from one
+shared rate limiter. However many documents or requests are in flight, the
+worker sends at most LLM_REQUESTS_PER_SECOND provider calls and runs at most
+LLM_MAX_CONCURRENCY of them at once, so total audit time is bounded by
+provider throughput rather than by client round-trips.
+
+Queued LLM work is served by weighted fair queuing rather than first come,
+first served. Each submission names a flow (an audit request or its owner,
+see AUDIT_FAIR_SHARE_BY) and a weight (the audit's priority). Every call is
+stamped with a virtual finish time, the flow's previous finish (or the
+current virtual time, whichever is later) plus 1 / weight, and workers always
+take the smallest. A flow with a thousand queued pages only gets its weighted
+share while others are waiting, so a small audit started behind it finishes
+in about the time its own calls take.
+"""
+import contextvars
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import Future
+
+from app.core.metrics import STAGE_DURATION
+from app.settings import LLM_MAX_CONCURRENCY, LLM_REQUESTS_PER_SECOND
+
+
+class RateLimiter:
+    """Thread-safe token bucket; a rate of 0 or less disables limiting"""
+
+    def __init__(self, rate_per_second: float, burst: int = 1):
+        self.rate = rate_per_second
+        self.capacity = max(burst, 1)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available"""
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class _Flow:
+    __slots__ = ("finish", "queued")
+
+    def __init__(self, finish: float):
+        self.finish = finish
+        self.queued = 0
+
+
+class AuditScheduler:
+    """Shared worker pool with weighted fair queuing; submit_llm() work also passes through the rate limiter"""
+
+    def __init__(self, max_workers: int, requests_per_second: float):
+        self.max_workers = max_workers
+        self.rate_limiter = RateLimiter(requests_per_second, burst=max_workers)
+        self._queue = []
+        self._flows = {}
+        self._virtual_time = 0.0
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._workers = []
+        self._shutdown = False
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        """Submit work that makes no LLM call (e.g. extraction); it goes ahead of queued LLM calls"""
+        return self._enqueue(None, 1.0, fn, args, kwargs)
+
+    def submit_llm(self, fn, *args, flow: str = None, weight: float = 1.0, skip_if=None, **kwargs) -> Future:
+        """Submit work that makes one LLM provider call on behalf of flow. skip_if is checked when the
+        work reaches a worker, before it takes a rate limit token; if it returns True the work resolves to None"""
+        return self._enqueue(flow or "default", weight, self._rate_limited, (fn, skip_if) + args, kwargs)
+
+    def _rate_limited(self, fn, skip_if, *args, **kwargs):
+        if skip_if is not None and skip_if():
+            return None
+        self.rate_limiter.acquire()
+        return fn(*args, **kwargs)
+
+    def _enqueue(self, flow, weight, fn, args, kwargs) -> Future:
+        future = Future()
+        # Run in a copy of the caller's context so tracing spans attach to the caller's trace
+        context = contextvars.copy_context()
+        with self._condition:
+            if self._shutdown:
+                raise RuntimeError("Audit scheduler is shut down")
+            if flow is None:
+                finish = self._virtual_time
+            else:
+                state = self._flows.get(flow)
+                if state is None:
+                    state = self._flows[flow] = _Flow(self._virtual_time)
+                state.finish = max(state.finish, self._virtual_time) + 1.0 / max(weight, 0.001)
+                state.queued += 1
+                finish = state.finish
+            heapq.heappush(self._queue, (finish, next(self._sequence), flow, time.monotonic(), future, context, fn, args, kwargs))
+            self._start_workers()
+            self._condition.notify()
+        return future
+
+    def _start_workers(self):
+        while len(self._workers) < self.max_workers:
+            worker = threading.Thread(target=self._work, name=f"audit-worker-{len(self._workers)}", daemon=True)
+            self._workers.append(worker)
+            worker.start()
+
+    def _work(self):
+        while True:
+            with self._condition:
+                while not self._queue and not self._shutdown:
+                    self._condition.wait()
+                if self._shutdown:
+                    return
+                finish, _, flow, queued_at, future, context, fn, args, kwargs = heapq.heappop(self._queue)
+                if flow is not None:
+                    # Self-clocked: virtual time is the finish tag of the call last taken into service
+                    self._virtual_time = max(self._virtual_time, finish)
+                    state = self._flows[flow]
+                    state.queued -= 1
+                    if not state.queued:
+                        del self._flows[flow]
+            if flow is not None:
+                STAGE_DURATION.labels(stage="llm_queue_wait").observe(time.monotonic() - queued_at)
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(context.run(fn, *args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+
+    def shutdown(self):
+        with self._condition:
+            self._shutdown = True
+            queued, self._queue = self._queue, []
+            self._condition.notify_all()
+        for entry in queued:
+            entry[4].cancel()
+
+
+audit_scheduler = AuditScheduler(LLM_MAX_CONCURRENCY, LLM_REQUESTS_PER_SECOND)
@@ -0,0 +1,25 @@
+"""
+Fast JSON path for list endpoints.
+
+Rows come out of psycopg as dicts of types orjson encodes natively (UUID,
+datetime, dict/list, float), and are returned as a fastapi ORJSONResponse. Handing
+FastAPI a Response skips jsonable_encoder and response_model validation, so
+each row is touched once, by orjson, on the way out.
+"""
+import orjson
+from psycopg.rows import dict_row
+from psycopg.types.json import set_json_loads
+from psycopg.types.numeric import FloatLoader
+
+
+def json_cursor(conn, **kwargs):
+    """Cursor returning JSON-ready dict rows: NUMERIC loads as float, JSON/JSONB through orjson"""
+    cursor = conn.cursor(row_factory=dict_row, **kwargs)
+    cursor.adapters.register_loader("numeric", FloatLoader)
+    set_json_loads(orjson.loads, cursor)
+    return cursor
+
+
+def ndjson_lines(rows) -> bytes:
+    """Encode rows as newline-delimited JSON"""
+    return b"".join(orjson.dumps(row) + b"\n" for row in rows)
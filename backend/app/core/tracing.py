@@ -0,0 +1,255 @@
+import abc
+import contextvars
+import json
+import queue
+import re
+import secrets
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+import requests
+from app.settings import TRACE_EXPORTER, TRACE_FILE, OTLP_ENDPOINT, OTEL_SERVICE_NAME
+
+# Lightweight OpenTelemetry-style tracing. Spans are only recorded inside a
+# trace started with start_trace(); everywhere else span() is a cheap no-op,
+# so instrumented code paths cost nothing when tracing is disabled.
+
+_current_span = contextvars.ContextVar("intelliaudit_current_span", default=None)
+
+MAX_STATEMENT_LENGTH = 1000
+
+
+class Span:
+    __slots__ = ("trace", "span_id", "parent_id", "name", "attributes", "start_ns", "end_ns", "error")
+
+    def __init__(self, trace, name, parent_id=None, attributes=None):
+        self.trace = trace
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.name = name
+        self.attributes = dict(attributes or {})
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.error = None
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def end(self, error: BaseException = None):
+        self.end_ns = time.time_ns()
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+        self.trace.finish_span(self)
+
+    def to_dict(self):
+        return {
+            "trace_id": self.trace.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_id,
+            "name": self.name,
+            "start_time_unix_nano": self.start_ns,
+            "end_time_unix_nano": self.end_ns,
+            "duration_ms": round((self.end_ns - self.start_ns) / 1e6, 3),
+            "attributes": self.attributes,
+            "status": "error" if self.error else "ok",
+            "error": self.error,
+        }
+
+
+class Trace:
+    """Collects finished spans and hands them to the exporter when the root span ends"""
+
+    def __init__(self):
+        self.trace_id = secrets.token_hex(16)
+        self.spans = []
+        self._lock = threading.Lock()
+        self.root = None
+
+    def finish_span(self, span):
+        with self._lock:
+            self.spans.append(span)
+        if span is self.root:
+            _exporter.export(self)
+
+
+def current_span():
+    return _current_span.get()
+
+
+def _start(name, attributes, root=False):
+    parent = _current_span.get()
+    if root:
+        trace = Trace()
+        new_span = Span(trace, name, attributes=attributes)
+        trace.root = new_span
+        return new_span
+    if parent is None:
+        return None
+    return Span(parent.trace, name, parent_id=parent.span_id, attributes=attributes)
+
+
+@contextmanager
+def _activate(new_span):
+    if new_span is None:
+        yield None
+        return
+    token = _current_span.set(new_span)
+    try:
+        yield new_span
+    except BaseException as e:
+        _current_span.reset(token)
+        new_span.end(error=e)
+        raise
+    else:
+        _current_span.reset(token)
+        new_span.end()
+
+
+@contextmanager
+def start_trace(name: str, **attributes):
+    """Start a new trace rooted at this span. No-op when tracing is disabled."""
+    if not _exporter.enabled:
+        yield None
+        return
+    with _activate(_start(name, attributes, root=True)) as s:
+        yield s
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """Record a child span of the active span. Usable as a context manager or a decorator."""
+    with _activate(_start(name, attributes)) as s:
+        yield s
+
+
+def _statement_text(statement):
+    if isinstance(statement, bytes):
+        text = statement.decode(errors="replace")
+    elif isinstance(statement, str):
+        text = statement
+    else:
+        # psycopg.sql.Composed and friends
+        try:
+            text = statement.as_string(None)
+        except Exception:
+            text = str(statement)
+    return re.sub(r"\s+", " ", text).strip()[:MAX_STATEMENT_LENGTH]
+
+
+def sql_span(statement):
+    """Span for a single SQL statement, tagged with the normalized statement text"""
+    if _current_span.get() is None:
+        return nullcontext()
+    return span("sql", **{"db.system": "postgresql", "db.statement": _statement_text(statement)})
+
+
+# ==========
+# Exporters
+# ==========
+
+class _NoopExporter:
+    enabled = False
+
+    def export(self, trace):
+        pass
+
+
+class _BackgroundExporter(abc.ABC):
+    """Exports finished traces from a daemon thread so requests never wait on I/O"""
+    enabled = True
+
+    def __init__(self):
+        self._queue = queue.Queue(maxsize=1000)
+        self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+        self._thread.start()
+
+    def export(self, trace):
+        try:
+            self._queue.put_nowait(trace)
+        except queue.Full:
+            print("Trace export queue full, dropping trace")
+
+    def _run(self):
+        while True:
+            trace = self._queue.get()
+            try:
+                self._write(trace)
+            except Exception as e:
+                print(f"Trace export failed: {str(e)}")
+
+    @abc.abstractmethod
+    def _write(self, trace):
+        """Send one finished trace; runs on the exporter thread"""
+
+
+class JsonFileExporter(_BackgroundExporter):
+    """Appends one JSON line per trace to a local file"""
+
+    def __init__(self, path):
+        self.path = path
+        super().__init__()
+
+    def _write(self, trace):
+        record = {
+            "trace_id": trace.trace_id,
+            "service": OTEL_SERVICE_NAME,
+            "spans": [s.to_dict() for s in sorted(trace.spans, key=lambda s: s.start_ns)],
+        }
+        with open(self.path, "a") as f:
+            f.write(json.dumps(record, default=str) + "\n")
+
+
+def _otlp_value(value):
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class OtlpHttpExporter(_BackgroundExporter):
+    """Sends traces to an OTLP/HTTP collector using the JSON encoding"""
+
+    def __init__(self, endpoint):
+        self.url = endpoint.rstrip("/") + "/v1/traces"
+        super().__init__()
+
+    def _write(self, trace):
+        spans = []
+        for s in trace.spans:
+            otlp_span = {
+                "traceId": trace.trace_id,
+                "spanId": s.span_id,
+                "name": s.name,
+                "kind": 1,
+                "startTimeUnixNano": str(s.start_ns),
+                "endTimeUnixNano": str(s.end_ns),
+                "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in s.attributes.items()],
+                "status": {"code": 2, "message": s.error} if s.error else {"code": 1},
+            }
+            if s.parent_id:
+                otlp_span["parentSpanId"] = s.parent_id
+            spans.append(otlp_span)
+
+        payload = {
+            "resourceSpans": [{
+                "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": OTEL_SERVICE_NAME}}]},
+                "scopeSpans": [{"scope": {"name": "intelliaudit"}, "spans": spans}],
+            }]
+        }
+        response = requests.post(self.url, json=payload, timeout=10)
+        if response.status_code >= 300:
+            raise Exception(f"OTLP collector returned HTTP {response.status_code} - {response.text}")
+
+
+def _build_exporter():
+    if TRACE_EXPORTER == "json":
+        return JsonFileExporter(TRACE_FILE)
+    if TRACE_EXPORTER == "otlp":
+        return OtlpHttpExporter(OTLP_ENDPOINT)
+    return _NoopExporter()
+
+
+_exporter = _build_exporter()
@@ -1,8 +1,28 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from app.core.metrics import MetricsMiddleware, render_metrics
+from app.core.cache_bus import InvalidationListener
+from app.config.database import LISTEN_DATABASE_URL
+from app.config.database_async import async_pool
+from app.core.scheduler import audit_scheduler
+from app.settings import CACHE_INVALIDATION_LISTEN
 from app.api import audit, llm, config, audit_workflow, config_management, user_management, project_management
 
-app = FastAPI(title="IntelliAudit API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await async_pool.open()
+    # One LISTEN connection per worker keeps its reference cache in step with writes made elsewhere
+    listener = InvalidationListener(LISTEN_DATABASE_URL) if CACHE_INVALIDATION_LISTEN else None
+    if listener:
+        listener.start()
+    yield
+    if listener:
+        listener.stop()
+    audit_scheduler.shutdown()
+    await async_pool.close()
+
+app = FastAPI(title="IntelliAudit API", lifespan=lifespan)
 
 # Add CORS middleware
 app.add_middleware(
@@ -13,6 +33,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-route latency, in-flight and error metrics (exposed on /metrics)
+app.add_middleware(MetricsMiddleware)
+
 @app.get("/")
 def root():
     return {"status": "ok", "service": "IntelliAudit API"}
@@ -21,6 +44,11 @@ def root():
 def healthz():
     return {"ok": True}
 
+@app.get("/metrics")
+def metrics():
+    payload, content_type = render_metrics()
+    return Response(content=payload, media_type=content_type)
+
 app.include_router(audit.router, prefix="/api/audit")
 app.include_router(llm.router, prefix="/api/llm")
 app.include_router(config.router, prefix="/api/config")
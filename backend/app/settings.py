@@ -15,4 +15,66 @@ CUSTOM_LLM_API_KEY = os.getenv('CUSTOM_LLM_API_KEY', None)  # Optional API key
 # Default to custom LLM endpoint
 LLM_PROVIDER = os.getenv('LLM_PROVIDER', 'custom')  # Default to custom now
 HUGGINGFACE_DEFAULT_MODEL = os.getenv('HUGGINGFACE_DEFAULT_MODEL', 'HuggingFaceH4/zephyr-7b-beta')
-CRITERIA_PATH = os.path.join(os.path.dirname(__file__), 'models/audit_criteria.json') 
\ No newline at end of file
+
+# Structured output for calls that pass a response schema: 'schema' (provider-enforced JSON Schema),
+# 'json' (JSON mode only) or 'off'. The custom endpoint receives the schema in CUSTOM_LLM_SCHEMA_FIELD
+# (vLLM: guided_json, llama.cpp: json_schema; empty to never send it)
+LLM_STRUCTURED_OUTPUT = os.getenv('LLM_STRUCTURED_OUTPUT', 'schema').lower()
+CUSTOM_LLM_SCHEMA_FIELD = os.getenv('CUSTOM_LLM_SCHEMA_FIELD', 'guided_json')
+
+# Tracing: 'none' (default), 'json' (append traces to TRACE_FILE) or 'otlp' (OTLP/HTTP collector)
+TRACE_EXPORTER = os.getenv('TRACE_EXPORTER', 'none').lower()
+TRACE_FILE = os.getenv('TRACE_FILE', os.path.join(os.path.dirname(__file__), '../traces.jsonl'))
+OTLP_ENDPOINT = os.getenv('OTEL_EXPORTER_OTLP_ENDPOINT', 'http://localhost:4318')
+OTEL_SERVICE_NAME = os.getenv('OTEL_SERVICE_NAME', 'intelliaudit-api')
+
+# Reference data cache (frameworks, metadata types, roles, criteria)
+REFERENCE_CACHE_TTL_SECONDS = float(os.getenv('REFERENCE_CACHE_TTL_SECONDS', '300'))
+# Evict cache entries in every worker via Postgres LISTEN/NOTIFY when reference data changes
+CACHE_INVALIDATION_LISTEN = os.getenv('CACHE_INVALIDATION_LISTEN', 'true').lower() == 'true'
+
+# Audit progress writes (audit_progress / audit_requests): at most one per interval, unless
+# the run has advanced by at least the given fraction since the last write
+PROGRESS_MIN_INTERVAL_SECONDS = float(os.getenv('PROGRESS_MIN_INTERVAL_SECONDS', '1.0'))
+PROGRESS_MIN_FRACTION = float(os.getenv('PROGRESS_MIN_FRACTION', '0.05'))
+
+# Shared audit scheduler: worker threads for extraction and LLM calls, and the
+# provider call rate across all of them; LLM_REQUESTS_PER_SECOND=0 disables rate limiting
+LLM_MAX_CONCURRENCY = int(os.getenv('LLM_MAX_CONCURRENCY', '8'))
+LLM_REQUESTS_PER_SECOND = float(os.getenv('LLM_REQUESTS_PER_SECOND', '5'))
+# Fair-share unit for queued LLM calls: 'audit' (each audit request) or 'user' (the audit's created_by)
+AUDIT_FAIR_SHARE_BY = os.getenv('AUDIT_FAIR_SHARE_BY', 'audit').lower()
+
+# Audit checkpoints (audit_checkpoints): completed evaluations are written in batches of this size,
+# or at least once per interval, so an interrupted audit can resume where it stopped
+CHECKPOINT_BATCH_SIZE = int(os.getenv('CHECKPOINT_BATCH_SIZE', '25'))
+CHECKPOINT_INTERVAL_SECONDS = float(os.getenv('CHECKPOINT_INTERVAL_SECONDS', '10'))
+
+# Bulk audits through provider batch APIs (bulk_audit.py): job directory, requests per batch file
+# (the OpenAI limit is 50,000) and the provider the offline 'local' backend answers with
+BATCH_WORK_DIR = os.getenv('BATCH_WORK_DIR', os.path.join(os.path.dirname(__file__), '../batch_jobs'))
+BATCH_MAX_REQUESTS_PER_FILE = int(os.getenv('BATCH_MAX_REQUESTS_PER_FILE', '50000'))
+BATCH_LOCAL_PROVIDER = os.getenv('BATCH_LOCAL_PROVIDER', 'custom')
+
+# DOCX pseudo-pages (app/core/docx_pages.py) are cut at the next paragraph or table row past this many characters
+DOCX_MAX_PAGE_CHARS = int(os.getenv('DOCX_MAX_PAGE_CHARS', '8000'))
+
+# Extraction normalization (app/core/normalize.py): lines within BOILERPLATE_EDGE_LINES of the top or bottom
+# of a page that repeat at a page edge on at least BOILERPLATE_MIN_PAGE_FRACTION of the pages are stripped
+BOILERPLATE_STRIP = os.getenv('BOILERPLATE_STRIP', 'true').lower() == 'true'
+BOILERPLATE_EDGE_LINES = int(os.getenv('BOILERPLATE_EDGE_LINES', '4'))
+BOILERPLATE_MIN_PAGE_FRACTION = float(os.getenv('BOILERPLATE_MIN_PAGE_FRACTION', '0.5'))
+BOILERPLATE_MIN_PAGES = int(os.getenv('BOILERPLATE_MIN_PAGES', '3'))
+
+# Near-duplicate evidence folding (app/core/dedup.py): results of the same criterion whose word-shingle
+# Jaccard similarity is at least the threshold become one evidence row listing all their pages
+EVIDENCE_DEDUP = os.getenv('EVIDENCE_DEDUP', 'true').lower() == 'true'
+EVIDENCE_DEDUP_THRESHOLD = float(os.getenv('EVIDENCE_DEDUP_THRESHOLD', '0.8'))
+EVIDENCE_DEDUP_NUM_PERM = int(os.getenv('EVIDENCE_DEDUP_NUM_PERM', '64'))
+EVIDENCE_DEDUP_BANDS = int(os.getenv('EVIDENCE_DEDUP_BANDS', '16'))
+
+# How the pipeline persists evidence on re-audit: 'merge' (upsert by natural key, keeps review
+# status and annotations) or 'replace' (delete the document's evidence and insert it again)
+EVIDENCE_WRITE_MODE = os.getenv('EVIDENCE_WRITE_MODE', 'merge').lower()
+
+CRITERIA_PATH = os.path.join(os.path.dirname(__file__), 'models/audit_criteria.json') 
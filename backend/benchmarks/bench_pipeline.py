@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark for the page-by-page audit pipeline.
+
+Starts the deterministic fake LLM endpoint, points the 'custom' provider at
+it and drives run_audit_on_text_by_page over the bundled
+sample_ncqa_healthcare_document plus generated large documents. Reports
+throughput, document and per-call latency percentiles and LLM calls per
+document, and writes everything to a JSON file for regression comparison.
+
+Usage (from backend/):
+    python -m benchmarks.bench_pipeline
+    python -m benchmarks.bench_pipeline --latency lognormal:-2.5,0.6 --failure-rate 0.02 \\
+        --large-pages 50 200 --output benchmarks/results/pipeline.json \\
+        --compare benchmarks/results/pipeline-baseline.json
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+from benchmarks.common import latency_summary, run_metadata, save_results, compare_results
+from benchmarks.fake_llm_server import FakeLLMConfig, FakeLLMServer, LATENCY_HELP
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+SAMPLE_DOCUMENT = os.path.join(REPO_ROOT, "sample_ncqa_healthcare_document.md")
+
+COMPARE_KEYS = [
+    "summary.pages_per_second",
+    "summary.llm_calls_per_second",
+    "summary.document_latency.p50_ms",
+    "summary.document_latency.p95_ms",
+    "summary.llm_call_latency.p50_ms",
+    "summary.llm_call_latency.p99_ms",
+    "summary.llm_calls_per_document",
+]
+
+
+def load_sample_pages():
+    """Split the sample markdown into one page per top-level section"""
+    with open(SAMPLE_DOCUMENT) as f:
+        content = f.read()
+    sections = [s.strip() for s in re.split(r"(?m)^(?=## )", content) if s.strip()]
+    return [{"page": i + 1, "text": text} for i, text in enumerate(sections)]
+
+
+def generate_document(num_pages, sample_pages, seed):
+    """Deterministic large document built from shuffled sample paragraphs"""
+    rng = random.Random(seed + num_pages)
+    paragraphs = [p for page in sample_pages for p in page["text"].split("\n\n") if p.strip()]
+    pages = []
+    for page_number in range(1, num_pages + 1):
+        body = "\n\n".join(rng.sample(paragraphs, min(6, len(paragraphs))))
+        pages.append({"page": page_number, "text": f"Policy Manual - Page {page_number}\n\n{body}"})
+    return pages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", default="constant:0.02", help=LATENCY_HELP)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--evidence-rate", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--large-pages", type=int, nargs="*", default=[25],
+                        help="Page counts of generated documents to audit in addition to the sample")
+    parser.add_argument("--repeat", type=int, default=1, help="Audit every document this many times")
+    parser.add_argument("--output", default=os.path.join(os.path.dirname(__file__), "results", "pipeline.json"))
+    parser.add_argument("--compare", help="Previous result file to compare against")
+    args = parser.parse_args()
+
+    config = FakeLLMConfig(args.latency, args.failure_rate, args.evidence_rate, args.seed)
+    with FakeLLMServer(config) as server:
+        # Settings are read at import time, so configure the provider before importing the pipeline
+        os.environ["LLM_PROVIDER"] = "custom"
+        os.environ["CUSTOM_LLM_ENDPOINT"] = server.url
+        os.environ.pop("CUSTOM_LLM_API_KEY", None)
+        from app.core import audit
+
+        # Time every provider call as the pipeline makes it
+        call_latencies = []
+        original_query_llm = audit.query_llm
+
+        def timed_query_llm(*a, **kw):
+            start = time.perf_counter()
+            try:
+                return original_query_llm(*a, **kw)
+            finally:
+                call_latencies.append(time.perf_counter() - start)
+
+        audit.query_llm = timed_query_llm
+
+        sample_pages = load_sample_pages()
+        documents = [("sample_ncqa_healthcare_document", sample_pages)]
+        documents += [(f"generated_{n}_pages", generate_document(n, sample_pages, args.seed)) for n in args.large_pages]
+
+        per_document = []
+        document_latencies = []
+        total_pages = 0
+        total_calls = 0
+        bench_start = time.perf_counter()
+        for name, pages in documents:
+            for run in range(args.repeat):
+                calls_before = server.stats.snapshot()
+                first_call = len(call_latencies)
+                start = time.perf_counter()
+                results = audit.run_audit_on_text_by_page(pages, provider="custom")
+                elapsed = time.perf_counter() - start
+                calls_after = server.stats.snapshot()
+
+                calls = calls_after["calls"] - calls_before["calls"]
+                document_latencies.append(elapsed)
+                total_pages += len(pages)
+                total_calls += calls
+                per_document.append({
+                    "document": name,
+                    "run": run + 1,
+                    "pages": len(pages),
+                    "seconds": round(elapsed, 4),
+                    "llm_calls": calls,
+                    "llm_failures": calls_after["failures"] - calls_before["failures"],
+                    "findings": len(results),
+                    "llm_call_latency": latency_summary(call_latencies[first_call:]),
+                })
+                print(f"{name} run {run + 1}: {len(pages)} pages, {calls} calls, "
+                      f"{len(results)} findings in {elapsed:.2f}s", file=sys.stderr)
+        wall = time.perf_counter() - bench_start
+
+    summary = {
+        "documents": len(per_document),
+        "pages": total_pages,
+        "llm_calls": total_calls,
+        "wall_seconds": round(wall, 4),
+        "documents_per_second": round(len(per_document) / wall, 4),
+        "pages_per_second": round(total_pages / wall, 4),
+        "llm_calls_per_second": round(total_calls / wall, 4),
+        "llm_calls_per_document": round(total_calls / len(per_document), 2),
+        "document_latency": latency_summary(document_latencies),
+        "llm_call_latency": latency_summary(call_latencies),
+    }
+    results = {
+        "benchmark": "pipeline",
+        "metadata": run_metadata(),
+        "config": {
+            "latency": args.latency,
+            "failure_rate": args.failure_rate,
+            "evidence_rate": args.evidence_rate,
+            "seed": args.seed,
+            "large_pages": args.large_pages,
+            "repeat": args.repeat,
+        },
+        "summary": summary,
+        "documents": per_document,
+    }
+    save_results(args.output, results)
+    print(f"Throughput: {summary['pages_per_second']} pages/s, {summary['llm_calls_per_second']} calls/s; "
+          f"document p50/p95/p99: {summary['document_latency']['p50_ms']}/"
+          f"{summary['document_latency']['p95_ms']}/{summary['document_latency']['p99_ms']} ms")
+    if args.compare:
+        compare_results(args.compare, results, COMPARE_KEYS)
+
+
+if __name__ == "__main__":
+    main()
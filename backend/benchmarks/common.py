@@ -0,0 +1,83 @@
+"""Shared helpers for the offline benchmark and load-test harnesses"""
+import json
+import math
+import os
+import platform
+import subprocess
+from datetime import datetime, timezone
+
+
+def percentile(values, pct):
+    """Linear-interpolated percentile (pct in 0-100); None for an empty sample"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    if len(ordered) == 1:
+        return ordered[0]
+    rank = (pct / 100) * (len(ordered) - 1)
+    low = math.floor(rank)
+    high = math.ceil(rank)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def latency_summary(samples_seconds):
+    """p50/p95/p99/mean/max in milliseconds for a list of durations in seconds"""
+    ms = [s * 1000 for s in samples_seconds]
+    return {
+        "count": len(ms),
+        "mean_ms": round(sum(ms) / len(ms), 3) if ms else None,
+        "p50_ms": _round(percentile(ms, 50)),
+        "p95_ms": _round(percentile(ms, 95)),
+        "p99_ms": _round(percentile(ms, 99)),
+        "max_ms": _round(max(ms)) if ms else None,
+    }
+
+
+def _round(value):
+    return round(value, 3) if value is not None else None
+
+
+def run_metadata():
+    """Environment details stored with every result file so runs can be compared"""
+    try:
+        commit = subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except Exception:
+        commit = None
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def save_results(path, results):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {path}")
+
+
+def compare_results(baseline_path, current, keys):
+    """Print relative change for selected (dotted) metric keys against a previous result file"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+
+    def lookup(data, dotted):
+        for part in dotted.split("."):
+            if not isinstance(data, dict) or part not in data:
+                return None
+            data = data[part]
+        return data
+
+    print(f"\nComparison against {baseline_path} ({baseline.get('metadata', {}).get('git_commit')}):")
+    for key in keys:
+        before, after = lookup(baseline, key), lookup(current, key)
+        if isinstance(before, (int, float)) and isinstance(after, (int, float)) and before:
+            change = (after - before) / before * 100
+            print(f"  {key}: {before} -> {after} ({change:+.1f}%)")
+        else:
+            print(f"  {key}: {before} -> {after}")
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Deterministic stand-in for the CUSTOM_LLM_ENDPOINT provider.
+
+Accepts the same request body query_llm sends to the custom endpoint
+({"prompt", "temperature", "max_tokens", "model"}) and answers with
+{"response": "..."}. Latency, failures and whether evidence is "found" are
+derived from a hash of (seed, prompt), so the same document always produces
+the same calls, outcomes and results regardless of request ordering.
+
+Run standalone:
+    python -m benchmarks.fake_llm_server --port 8765 --latency lognormal:-2.5,0.6 --failure-rate 0.02
+"""
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+LATENCY_HELP = (
+    "constant:S | uniform:LOW,HIGH | normal:MEAN,STDDEV | lognormal:MU,SIGMA | exponential:MEAN "
+    "(all in seconds; lognormal parameters are of the underlying normal)"
+)
+
+
+def parse_latency(spec: str):
+    """Turn a latency spec into a function rng -> seconds"""
+    kind, _, raw = spec.partition(":")
+    params = [float(p) for p in raw.split(",")] if raw else []
+    if kind == "constant":
+        return lambda rng: params[0]
+    if kind == "uniform":
+        return lambda rng: rng.uniform(params[0], params[1])
+    if kind == "normal":
+        return lambda rng: max(0.0, rng.gauss(params[0], params[1]))
+    if kind == "lognormal":
+        return lambda rng: rng.lognormvariate(params[0], params[1])
+    if kind == "exponential":
+        return lambda rng: rng.expovariate(1 / params[0])
+    raise ValueError(f"Unsupported latency distribution '{spec}'. Expected {LATENCY_HELP}")
+
+
+class FakeLLMConfig:
+    def __init__(self, latency="constant:0.05", failure_rate=0.0, evidence_rate=0.3, seed=42):
+        self.latency_spec = latency
+        self.latency = parse_latency(latency)
+        self.failure_rate = failure_rate
+        self.evidence_rate = evidence_rate
+        self.seed = seed
+
+
+class FakeLLMStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.failures = 0
+        self.evidence = 0
+
+    def record(self, failed=False, evidence=False):
+        with self._lock:
+            self.calls += 1
+            self.failures += int(failed)
+            self.evidence += int(evidence)
+
+    def snapshot(self):
+        with self._lock:
+            return {"calls": self.calls, "failures": self.failures, "evidence": self.evidence}
+
+
+def _rng_for(seed, prompt):
+    digest = hashlib.sha256(f"{seed}:{prompt}".encode()).digest()
+    return random.Random(int.from_bytes(digest[:8], "big"))
+
+
+def _evidence_response(rng, prompt):
+    # Quote a line of the audited text back so evidence looks like the real thing
+    lines = [l.strip() for l in prompt.splitlines() if len(l.strip()) > 40]
+    quote = lines[rng.randrange(len(lines))] if lines else "Policy statement found in document"
+    return json.dumps({
+        "evidence": quote[:300],
+        "explanation": "The document states this requirement explicitly.",
+        "remarks": "Synthetic response from the benchmark stub.",
+        "compliance_score": rng.randint(50, 100),
+        "risk_level": rng.choice(["Low", "Medium", "High"]),
+    })
+
+
+def make_handler(config: FakeLLMConfig, stats: FakeLLMStats):
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            try:
+                payload = json.loads(self.rfile.read(length) or b"{}")
+            except json.JSONDecodeError:
+                self._send(400, {"error": "invalid JSON"})
+                return
+
+            prompt = payload.get("prompt", "")
+            rng = _rng_for(config.seed, prompt)
+            time.sleep(config.latency(rng))
+
+            if rng.random() < config.failure_rate:
+                stats.record(failed=True)
+                self._send(500, {"error": "simulated provider failure"})
+                return
+
+            found = rng.random() < config.evidence_rate
+            stats.record(evidence=found)
+            # Mirrors the prompt contract: no evidence -> empty response
+            self._send(200, {"response": _evidence_response(rng, prompt) if found else ""})
+
+        def do_GET(self):
+            if self.path == "/stats":
+                self._send(200, stats.snapshot())
+            else:
+                self._send(404, {"error": "not found"})
+
+        def _send(self, status, body):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+class FakeLLMServer:
+    """Runs the stub on a background thread; use as a context manager"""
+
+    def __init__(self, config: FakeLLMConfig, host="127.0.0.1", port=0):
+        self.config = config
+        self.stats = FakeLLMStats()
+        self.httpd = ThreadingHTTPServer((host, port), make_handler(config, self.stats))
+        self.httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/generate"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", default="constant:0.05", help=LATENCY_HELP)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--evidence-rate", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    config = FakeLLMConfig(args.latency, args.failure_rate, args.evidence_rate, args.seed)
+    server = FakeLLMServer(config, args.host, args.port)
+    print(f"Fake LLM endpoint listening on {server.url} (latency={args.latency}, failure_rate={args.failure_rate})")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Bulk audits through provider batch APIs (see app/core/batch_llm.py).
+
+For overnight re-audits of many documents: every (page, criterion) prompt is
+written to JSONL batch files, submitted to the provider's batch API, and the
+answers are ingested through the same parsing and evidence persistence as
+/api/audit/uploadandaudit. Batch pricing is well below real-time calls, in
+exchange for results within the provider's 24 hour window.
+
+The documents file is a CSV with a header row: audit_request_id,document_id,path
+(the audit request and document rows must exist, as for an upload).
+
+Usage (from backend/):
+    python bulk_audit.py submit library.csv --backend openai --job nightly
+    python bulk_audit.py status nightly
+    python bulk_audit.py ingest nightly              # polls until every part is done, then persists evidence
+
+--backend local answers the batch offline through query_llm with
+BATCH_LOCAL_PROVIDER, writing output in the --format of the chosen provider.
+Job state lives in BATCH_WORK_DIR/<job>/job.json, so status and ingest can run
+from a different process (or days later) than submit.
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import re
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime
+
+from starlette.datastructures import UploadFile
+
+from app.core.audit import load_criteria, build_page_prompt, parse_page_response, EVIDENCE_SCHEMA
+from app.core.dedup import dedupe_evidence
+from app.core.batch_llm import REQUEST_BUILDERS, get_batch_backend, parse_output_line
+from app.core.extractor import extract_text_from_file
+from app.api.audit_workflow import insert_evidence_from_audit_results, update_audit_request
+from app.settings import BATCH_WORK_DIR, BATCH_MAX_REQUESTS_PER_FILE
+
+# Batch requests use structured output (LLM_STRUCTURED_OUTPUT=schema), which gpt-3.5-turbo does not support
+DEFAULT_MODELS = {"openai": "gpt-4o-mini", "gemini": "gemini-1.5-flash"}
+REQUEST_ID = re.compile(r"^d(\d+)-p(\d+)-c(\d+)$")
+
+
+def _job_dir(job: str) -> str:
+    return job if os.path.isdir(job) else os.path.join(BATCH_WORK_DIR, job)
+
+
+def _load_job(job_dir: str) -> dict:
+    with open(os.path.join(job_dir, "job.json")) as f:
+        return json.load(f)
+
+
+def _save_job(job_dir: str, job: dict):
+    path = os.path.join(job_dir, "job.json")
+    with open(path + ".tmp", "w") as f:
+        json.dump(job, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def _read_documents(path: str) -> list:
+    with open(path, newline="") as f:
+        documents = [
+            {"audit_request_id": row["audit_request_id"].strip(), "document_id": row["document_id"].strip(),
+             "path": row["path"].strip()}
+            for row in csv.DictReader(f)
+        ]
+    if not documents:
+        sys.exit(f"No documents in {path}")
+    return documents
+
+
+def _extract_pages(path: str) -> list:
+    with open(path, "rb") as f:
+        _, pages = extract_text_from_file(UploadFile(io.BytesIO(f.read()), filename=os.path.basename(path)))
+    return pages
+
+
+def submit(documents_path: str, backend_name: str, job_name: str, model: str = None, batch_format: str = None):
+    """Extract every document, write the batch files and submit them; returns the job directory"""
+    batch_format = batch_format or (backend_name if backend_name in REQUEST_BUILDERS else "openai")
+    model = model or DEFAULT_MODELS[batch_format]
+    job_dir = _job_dir(job_name)
+    if os.path.exists(os.path.join(job_dir, "job.json")):
+        sys.exit(f"Job {job_name} already exists in {job_dir}")
+    os.makedirs(job_dir, exist_ok=True)
+
+    criteria = load_criteria()
+    documents = _read_documents(documents_path)
+    build_request = REQUEST_BUILDERS[batch_format]
+    parts, lines = [], []
+
+    def write_part():
+        name = f"input-{len(parts):03d}.jsonl"
+        with open(os.path.join(job_dir, name), "w") as f:
+            f.writelines(lines)
+        parts.append({"input": name, "requests": len(lines), "job_id": None, "status": "pending"})
+        lines.clear()
+
+    for d, document in enumerate(documents):
+        pages = _extract_pages(document["path"])
+        document["requests"] = len(pages) * len(criteria)
+        for page in pages:
+            for i, c in enumerate(criteria):
+                prompt = build_page_prompt(page["page"], page["text"], c)
+                lines.append(json.dumps(build_request(f"d{d}-p{page['page']}-c{i}", prompt, model, EVIDENCE_SCHEMA)) + "\n")
+                if len(lines) >= BATCH_MAX_REQUESTS_PER_FILE:
+                    write_part()
+        print(f"{document['path']}: {len(pages)} pages, {document['requests']} requests")
+    if lines:
+        write_part()
+
+    job = {
+        "backend": backend_name, "format": batch_format, "model": model,
+        "created_at": datetime.utcnow().isoformat(), "ingested_at": None,
+        # Kept with the job so ingest parses against the criteria the prompts were built from
+        "criteria": [{"criteria": c["criteria"], "category": c["category"], "factor": c.get("factor", "")} for c in criteria],
+        "documents": documents, "parts": parts,
+    }
+    _save_job(job_dir, job)
+
+    backend = get_batch_backend(backend_name, BATCH_WORK_DIR, batch_format)
+    for part in parts:
+        part["job_id"] = backend.submit(os.path.join(job_dir, part["input"]), model)
+        part["status"] = "running"
+        _save_job(job_dir, job)
+        print(f"Submitted {part['input']} ({part['requests']} requests) as {part['job_id']}")
+    for audit_request_id in {document["audit_request_id"] for document in documents}:
+        update_audit_request(audit_request_id, "in_progress", "Batch audit submitted")
+    return job_dir
+
+
+def refresh_status(job_dir: str, job: dict) -> dict:
+    """Poll the provider for every unfinished part and download finished output"""
+    backend = get_batch_backend(job["backend"], BATCH_WORK_DIR, job["format"])
+    for n, part in enumerate(job["parts"]):
+        if part["status"] in ("completed", "failed"):
+            continue
+        part["status"] = backend.status(part["job_id"])
+        if part["status"] in ("completed", "failed"):
+            part["output"] = f"output-{n:03d}.jsonl"
+            try:
+                backend.download(part["job_id"], os.path.join(job_dir, part["output"]))
+            except Exception as e:
+                print(f"Could not download output of {part['job_id']}: {str(e)}")
+                part["output"] = None
+    _save_job(job_dir, job)
+    return job
+
+
+def show_status(job_name: str):
+    job_dir = _job_dir(job_name)
+    job = refresh_status(job_dir, _load_job(job_dir))
+    for part in job["parts"]:
+        print(f"{part['input']}: {part['status']} ({part['requests']} requests, {part['job_id']})")
+    if job["ingested_at"]:
+        print(f"Ingested at {job['ingested_at']}")
+
+
+def _collect_results(job_dir: str, job: dict):
+    """(page, criterion index, result) per document index, and how many requests each document got an answer for"""
+    criteria = job["criteria"]
+    results, answered = defaultdict(list), defaultdict(int)
+    for part in job["parts"]:
+        if not part.get("output"):
+            continue
+        with open(os.path.join(job_dir, part["output"])) as f:
+            for raw in f:
+                if not raw.strip():
+                    continue
+                request_id, text, error = parse_output_line(json.loads(raw), job["format"])
+                match = REQUEST_ID.match(request_id or "")
+                if not match or error is not None:
+                    continue
+                d, page, i = (int(group) for group in match.groups())
+                answered[d] += 1
+                result = parse_page_response(text, page, criteria[i])
+                if result is not None:
+                    results[d].append((page, i, result))
+    return results, answered
+
+
+def ingest(job_name: str, wait: bool = True, poll_seconds: float = 300, allow_partial: bool = False):
+    """Wait for the batch, then persist each document's evidence; returns the number of documents skipped"""
+    job_dir = _job_dir(job_name)
+    job = refresh_status(job_dir, _load_job(job_dir))
+    while any(part["status"] not in ("completed", "failed") for part in job["parts"]):
+        if not wait:
+            sys.exit("Batch still running; run ingest again later")
+        time.sleep(poll_seconds)
+        job = refresh_status(job_dir, job)
+
+    results, answered = _collect_results(job_dir, job)
+    skipped = 0
+    for d, document in enumerate(job["documents"]):
+        missing = document["requests"] - answered[d]
+        label = f"{document['path']} ({document['document_id']})"
+        # A partial answer would let the evidence merge drop findings the failed requests would have kept
+        if missing and not allow_partial:
+            print(f"skip {label}: {missing} of {document['requests']} requests failed or missing")
+            skipped += 1
+            continue
+        # Output lines come back in any order; persist in page, then criterion order like the real-time path
+        page_order = dedupe_evidence([result for _, _, result in sorted(results[d], key=lambda item: item[:2])])
+        try:
+            insert_evidence_from_audit_results(page_order, document["audit_request_id"], document["document_id"])
+        except Exception as e:
+            print(f"fail {label}: {str(e)}")
+            skipped += 1
+            continue
+        print(f"ok   {label}: {len(page_order)} evidence records")
+    for audit_request_id in {document["audit_request_id"] for document in job["documents"]}:
+        update_audit_request(audit_request_id, "in_progress", "HITL in progress")
+    job["ingested_at"] = datetime.utcnow().isoformat()
+    _save_job(job_dir, job)
+    return skipped
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    submit_parser = commands.add_parser("submit", help="write and submit batch files for the documents in a CSV")
+    submit_parser.add_argument("documents", help="CSV with audit_request_id,document_id,path")
+    submit_parser.add_argument("--backend", choices=["openai", "gemini", "local"], required=True)
+    submit_parser.add_argument("--job", required=True, help=f"job name (a directory under {BATCH_WORK_DIR})")
+    submit_parser.add_argument("--model", help="default gpt-4o-mini (openai) or gemini-1.5-flash (gemini)")
+    submit_parser.add_argument("--format", choices=sorted(REQUEST_BUILDERS), help="batch file format for --backend local")
+    status_parser = commands.add_parser("status", help="poll the provider for a job")
+    status_parser.add_argument("job")
+    ingest_parser = commands.add_parser("ingest", help="wait for a job and persist its evidence")
+    ingest_parser.add_argument("job")
+    ingest_parser.add_argument("--no-wait", action="store_true", help="exit instead of polling while parts are running")
+    ingest_parser.add_argument("--poll-seconds", type=float, default=300)
+    ingest_parser.add_argument("--allow-partial", action="store_true",
+                               help="also persist documents with failed or missing requests")
+    args = parser.parse_args()
+
+    if args.command == "submit":
+        submit(args.documents, args.backend, args.job, args.model, args.format)
+    elif args.command == "status":
+        show_status(args.job)
+    else:
+        skipped = ingest(args.job, wait=not args.no_wait, poll_seconds=args.poll_seconds, allow_partial=args.allow_partial)
+        if skipped:
+            sys.exit(f"{skipped} document(s) not ingested")
+
+
+if __name__ == "__main__":
+    main()
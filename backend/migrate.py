@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Versioned schema migrations for IntelliAudit.
+
+Migrations live in migrations/NNNN_description.sql and are applied in
+version order; applied versions are recorded in <DB_SCHEMA>.schema_migrations.
+A migration whose first line is `-- migrate: no-transaction` runs statement
+by statement in autocommit mode (required for CREATE INDEX CONCURRENTLY);
+every other migration runs in a single transaction.
+
+A fresh database gets ../db_schema.sql first, then `up`.
+
+Usage (from backend/):
+    python migrate.py status
+    python migrate.py up
+    python migrate.py explain    # fails if a hot API query is planned with a sequential scan
+
+Uses the app's DB_* settings unless --database-url is given. Long
+CONCURRENTLY builds are best run over a direct connection (port 5432)
+rather than the Supabase transaction pooler (port 6543).
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+from collections import namedtuple
+
+import psycopg
+
+from app.config.database import DATABASE_URL, DB_SCHEMA
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+NO_TRANSACTION_MARKER = "-- migrate: no-transaction"
+SAMPLE_ID = "00000000-0000-0000-0000-000000000000"
+
+Migration = namedtuple("Migration", "version name path sql transactional checksum")
+
+
+def split_sql(script):
+    """Split a SQL script into statements, keeping $$-quoted blocks intact"""
+    script = re.sub(r"--[^\n]*", "", script)
+    statements, current, in_dollar = [], [], False
+    for part in re.split(r"(\$\$|;)", script):
+        if part == "$$":
+            in_dollar = not in_dollar
+            current.append(part)
+        elif part == ";" and not in_dollar:
+            statement = "".join(current).strip()
+            if statement:
+                statements.append(statement)
+            current = []
+        else:
+            current.append(part)
+    tail = "".join(current).strip()
+    if tail:
+        statements.append(tail)
+    return statements
+
+
+def load_migrations():
+    migrations = []
+    for filename in sorted(os.listdir(MIGRATIONS_DIR)):
+        match = re.match(r"^(\d{4})_(\w+)\.sql$", filename)
+        if not match:
+            continue
+        path = os.path.join(MIGRATIONS_DIR, filename)
+        with open(path) as f:
+            sql = f.read()
+        migrations.append(Migration(
+            version=match.group(1),
+            name=match.group(2),
+            path=path,
+            sql=sql,
+            transactional=not sql.lstrip().startswith(NO_TRANSACTION_MARKER),
+            checksum=hashlib.sha256(sql.encode()).hexdigest(),
+        ))
+    return migrations
+
+
+def _ensure_migrations_table(conn):
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {DB_SCHEMA}.schema_migrations (
+          version TEXT PRIMARY KEY,
+          name TEXT NOT NULL,
+          checksum TEXT NOT NULL,
+          applied_at TIMESTAMP DEFAULT now()
+        )
+    """)
+
+
+def _applied(conn):
+    rows = conn.execute(f"SELECT version, checksum FROM {DB_SCHEMA}.schema_migrations").fetchall()
+    return dict(rows)
+
+
+def _invalid_indexes(conn):
+    """Indexes left INVALID by a failed CREATE INDEX CONCURRENTLY"""
+    rows = conn.execute("""
+        SELECT c.relname
+        FROM pg_index i
+        JOIN pg_class c ON c.oid = i.indexrelid
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE NOT i.indisvalid AND n.nspname = %s
+    """, (DB_SCHEMA,)).fetchall()
+    return [r[0] for r in rows]
+
+
+def apply_migrations(database_url=DATABASE_URL):
+    """Apply pending migrations in order; returns the versions applied"""
+    applied_now = []
+    with psycopg.connect(database_url, autocommit=True) as conn:
+        _ensure_migrations_table(conn)
+        applied = _applied(conn)
+        for migration in load_migrations():
+            if migration.version in applied:
+                if applied[migration.version] != migration.checksum:
+                    print(f"warning: {migration.version}_{migration.name} changed after it was applied",
+                          file=sys.stderr)
+                continue
+
+            print(f"Applying {migration.version}_{migration.name}")
+            record = (
+                f"INSERT INTO {DB_SCHEMA}.schema_migrations (version, name, checksum) VALUES (%s, %s, %s)",
+                (migration.version, migration.name, migration.checksum),
+            )
+            if migration.transactional:
+                with conn.transaction():
+                    conn.execute(migration.sql)
+                    conn.execute(*record)
+            else:
+                for statement in split_sql(migration.sql):
+                    conn.execute(statement)
+                invalid = _invalid_indexes(conn)
+                if invalid:
+                    raise RuntimeError(
+                        f"{migration.version}_{migration.name} left invalid indexes {invalid}; "
+                        "drop them (DROP INDEX CONCURRENTLY) and run the migration again"
+                    )
+                conn.execute(*record)
+            applied_now.append(migration.version)
+    return applied_now
+
+
+def show_status(database_url=DATABASE_URL):
+    with psycopg.connect(database_url, autocommit=True) as conn:
+        _ensure_migrations_table(conn)
+        applied = _applied(conn)
+    for migration in load_migrations():
+        state = "applied" if migration.version in applied else "pending"
+        if state == "applied" and applied[migration.version] != migration.checksum:
+            state = "applied (file changed since)"
+        print(f"{migration.version}_{migration.name}: {state}")
+
+
+def _explain_checks():
+    """(label, psycopg SQL, params) for every list query the API serves per parent row"""
+    from app.api import audit_workflow as workflow
+    from app.api import config_management as config
+
+    by_audit = {"audit_id": SAMPLE_ID}
+    return [
+        ("GET /api/workflow/audits/{audit_id}/documents", workflow.AUDIT_DOCUMENTS_SQL, by_audit),
+        ("GET /api/workflow/audits/{audit_id}/findings", workflow.AUDIT_FINDINGS_SQL, by_audit),
+        ("GET /api/workflow/audits/{audit_id}/reports", workflow.AUDIT_REPORTS_SQL, by_audit),
+        ("GET /api/workflow/audits/{audit_id}/logs", workflow.AUDIT_LOGS_SQL, by_audit),
+        ("GET /api/workflow/audits/{audit_id}/progress", workflow.AUDIT_PROGRESS_SQL, by_audit),
+        ("GET /api/workflow/audits/{audit_id}/evidence",
+         workflow.evidence_list_sql(["audit_request_id = %s"]), (SAMPLE_ID, 101)),
+        ("GET /api/workflow/audits/{audit_id}/evidence?document_id=",
+         workflow.evidence_list_sql(["audit_request_id = %s", "document_id = %s"]), (SAMPLE_ID, SAMPLE_ID, 101)),
+        ("evidence by audit and document", workflow.EVIDENCE_BY_AUDIT_DOCUMENT_SQL, (SAMPLE_ID, SAMPLE_ID)),
+        ("GET /api/workflow/audits/{audit_id}/evidence/export", workflow.evidence_export_sql(False), (SAMPLE_ID,)),
+        ("GET /api/workflow/audits/{audit_id}/evidence/export?document_id=",
+         workflow.evidence_export_sql(True), (SAMPLE_ID, SAMPLE_ID)),
+        ("framework summary: process areas", config.FRAMEWORK_PROCESS_AREAS_SQL, (SAMPLE_ID,)),
+        ("framework summary: controls", config.PROCESS_AREA_CONTROLS_SQL, (SAMPLE_ID,)),
+        ("framework summary: criteria", config.CONTROL_CRITERIA_SQL, (SAMPLE_ID,)),
+        ("framework summary: rules", config.CRITERIA_RULES_SQL, (SAMPLE_ID,)),
+    ]
+
+
+def _plan_nodes(plan):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _plan_nodes(child)
+
+
+def explain_plan(conn, sql, params):
+    """(relations read by a Seq Scan, indexes used) in the plan of sql"""
+    row = conn.execute(f"EXPLAIN (FORMAT JSON) {sql}", params).fetchone()
+    plan = row[0] if isinstance(row[0], list) else json.loads(row[0])
+    nodes = list(_plan_nodes(plan[0]["Plan"]))
+    seq_scans = [n["Relation Name"] for n in nodes if n["Node Type"] == "Seq Scan"]
+    indexes = sorted({n["Index Name"] for n in nodes if "Index Name" in n})
+    return seq_scans, indexes
+
+
+def explain_connection(database_url=DATABASE_URL):
+    """Autocommit connection set up for explain_plan(): the app schema, with sequential scans disabled"""
+    conn = psycopg.connect(database_url, autocommit=True)
+    conn.execute(f"SET search_path TO {DB_SCHEMA}")
+    conn.execute("SET enable_seqscan = off")
+    return conn
+
+
+def explain_queries(database_url=DATABASE_URL):
+    """
+    EXPLAIN every hot API query with sequential scans disabled. The planner
+    still picks a Seq Scan when no usable index exists, so any Seq Scan left
+    in a plan is a missing index regardless of how much data is loaded.
+    Returns the number of failing queries.
+    """
+    failures = 0
+    with explain_connection(database_url) as conn:
+        for label, sql, params in _explain_checks():
+            seq_scans, indexes = explain_plan(conn, sql, params)
+            if seq_scans:
+                failures += 1
+                print(f"FAIL {label}: sequential scan on {', '.join(seq_scans)}")
+            else:
+                print(f"ok   {label}: {', '.join(indexes)}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["up", "status", "explain"], nargs="?", default="up")
+    parser.add_argument("--database-url", default=DATABASE_URL)
+    args = parser.parse_args()
+
+    if args.command == "status":
+        show_status(args.database_url)
+    elif args.command == "explain":
+        failures = explain_queries(args.database_url)
+        if failures:
+            sys.exit(f"{failures} queries are not index-backed")
+    else:
+        applied = apply_migrations(args.database_url)
+        print(f"Applied {len(applied)} migration(s)" if applied else "Database is up to date")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+-- migrate: no-transaction
+-- B-tree indexes for the workflow and configuration read paths. Built
+-- CONCURRENTLY so production tables stay writable while they build.
+
+-- Evidence listings per audit and per audit + document (keyset pagination)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_evidence_audit_created ON intelliaudit_dev.evidence(audit_request_id, created_at, evidence_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_evidence_audit_document_created ON intelliaudit_dev.evidence(audit_request_id, document_id, created_at, evidence_id);
+
+-- Per-audit child listings, ordered as the API returns them
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_documents_audit_request ON intelliaudit_dev.documents(audit_request_id, created_at);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_audit_findings_audit_request ON intelliaudit_dev.audit_findings(audit_request_id, created_at);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_reports_audit_request ON intelliaudit_dev.reports(audit_request_id, created_at);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_audit_logs_related ON intelliaudit_dev.audit_logs(related_id, created_at);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_audit_progress_audit_request ON intelliaudit_dev.audit_progress(audit_request_id, updated_at);
+
+-- Configuration hierarchy: process areas, controls and criteria are already covered by their
+-- UNIQUE(parent_id, code) constraints; assessment rules have no such constraint
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_config_assessment_rules_criteria ON intelliaudit_dev.config_assessment_rules(criteria_id, rule_name);
@@ -0,0 +1,25 @@
+-- migrate: no-transaction
+-- Natural key for evidence so re-audits can upsert instead of delete + insert.
+-- evidence_key = md5(criterion | page | md5(extracted text)); it must match
+-- evidence_key() in app/api/audit_workflow.py.
+
+ALTER TABLE intelliaudit_dev.evidence ADD COLUMN IF NOT EXISTS evidence_key TEXT;
+
+-- Backfill existing rows. When a document already has duplicates, only the oldest gets the key;
+-- the rest stay NULL and are removed the next time that document is re-audited.
+UPDATE intelliaudit_dev.evidence e
+SET evidence_key = k.evidence_key
+FROM (
+  SELECT evidence_id, evidence_key,
+         row_number() OVER (PARTITION BY audit_request_id, document_id, evidence_key ORDER BY created_at, evidence_id) AS n
+  FROM (
+    SELECT evidence_id, audit_request_id, document_id, created_at,
+           md5(coalesce(criteria->>'criteria', '') || '|' || coalesce(page_number::text, '') || '|' || md5(coalesce(extracted_text, ''))) AS evidence_key
+    FROM intelliaudit_dev.evidence
+    WHERE evidence_key IS NULL
+  ) keyed
+) k
+WHERE e.evidence_id = k.evidence_id AND k.n = 1;
+
+-- ON CONFLICT target for the upsert
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS uq_evidence_audit_document_key ON intelliaudit_dev.evidence(audit_request_id, document_id, evidence_key);
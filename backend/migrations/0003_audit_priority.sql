@@ -0,0 +1,7 @@
+-- Scheduling priority for audit requests. The shared audit scheduler
+-- (app/core/scheduler.py) uses it as the weight of the audit's LLM calls:
+-- a priority 4 audit gets four times the provider share of a priority 1 audit.
+
+ALTER TABLE intelliaudit_dev.audit_requests
+  ADD COLUMN IF NOT EXISTS priority SMALLINT NOT NULL DEFAULT 1
+  CONSTRAINT audit_requests_priority_range CHECK (priority BETWEEN 1 AND 10);
@@ -0,0 +1,17 @@
+-- Completed (page, criterion) evaluations of unfinished audit runs, so an
+-- interrupted audit can resume without calling the LLM again
+-- (app/core/checkpoint.py). result is NULL when the page had no evidence.
+-- Rows are deleted once the document's evidence has been persisted.
+
+CREATE TABLE IF NOT EXISTS intelliaudit_dev.audit_checkpoints (
+  audit_request_id UUID NOT NULL REFERENCES intelliaudit_dev.audit_requests(audit_request_id) ON DELETE CASCADE,
+  document_id UUID NOT NULL REFERENCES intelliaudit_dev.documents(document_id) ON DELETE CASCADE,
+  page_number INT NOT NULL,
+  criteria TEXT NOT NULL,
+  page_hash TEXT NOT NULL,
+  model TEXT,
+  provider TEXT,
+  result JSONB,
+  created_at TIMESTAMP DEFAULT now(),
+  PRIMARY KEY (audit_request_id, document_id, page_number, criteria)
+);
@@ -0,0 +1,5 @@
+-- Pages a piece of evidence was found on. Near-duplicate results of the same
+-- criterion (app/core/dedup.py) are stored once, on the first page they appear
+-- on (page_number), with every page of the cluster in pages.
+
+ALTER TABLE intelliaudit_dev.evidence ADD COLUMN IF NOT EXISTS pages INT[];
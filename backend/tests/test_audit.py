@@ -0,0 +1,68 @@
+import json
+
+from app.core.audit import build_page_prompt, load_criteria, parse_page_response
+
+CRITERION = {"criteria": "Access control", "category": "Security", "description": "Access is restricted", "factor": "AC"}
+
+
+def test_parse_page_response_found_false_is_no_evidence():
+    answer = {"found": False, "evidence": "", "explanation": "", "remarks": "", "compliance_score": 0, "risk_level": "Low"}
+    assert parse_page_response(json.dumps(answer), 4, CRITERION) is None
+
+
+def test_parse_page_response_found_false_wins_over_stray_evidence():
+    answer = {"found": False, "evidence": "Nothing relevant on this page", "compliance_score": 0}
+    assert parse_page_response(json.dumps(answer), 4, CRITERION) is None
+
+
+def test_parse_page_response_with_evidence():
+    answer = {"found": True, "evidence": "Badge access is required", "explanation": "Restricts entry",
+              "remarks": "", "compliance_score": 85, "risk_level": "Critical"}
+    result = parse_page_response("```json\n" + json.dumps(answer) + "\n```", 4, CRITERION)
+    assert result == {
+        "criteria": "Access control",
+        "category": "Security",
+        "factor": "AC",
+        "evidence": "Badge access is required",
+        "explanation": "Restricts entry",
+        "remarks": "",
+        "compliance_score": 85,
+        "risk_level": "Critical",
+        "page": 4,
+    }
+
+
+def test_parse_page_response_without_evidence():
+    assert parse_page_response("", 1, CRITERION) is None
+    assert parse_page_response(json.dumps({"evidence": "   "}), 1, CRITERION) is None
+
+
+def test_build_page_prompt():
+    structured = build_page_prompt(2, "Page text", CRITERION, structured=True)
+    assert '"found": false' in structured
+    assert "Low|Medium|High|Critical" in structured
+    assert "DO NOT respond" not in structured
+    assert "DO NOT respond at all" in build_page_prompt(2, "Page text", CRITERION, structured=False)
+
+
+NCQA_CRITERION = {**CRITERION, "compliance_requirements": ["Primary source verification of current license"]}
+
+
+def test_build_page_prompt_ncqa():
+    structured = build_page_prompt(2, "Page text", NCQA_CRITERION, structured=True)
+    assert "NCQA" in structured
+    assert "- Primary source verification of current license" in structured
+    assert '"found": false' in structured
+    assert '"found": true' in structured
+    assert "return nothing" not in structured
+    assert "Low|Medium|High|Critical" in structured
+
+    unstructured = build_page_prompt(2, "Page text", NCQA_CRITERION, structured=False)
+    assert "DO NOT respond at all" in unstructured
+    assert '"found"' not in unstructured
+
+
+def test_default_criteria_follow_the_schema_prompt():
+    # Every default criterion takes the NCQA branch, so it must ask for found: false too
+    for c in load_criteria():
+        assert '"found": false' in build_page_prompt(1, "Page text", c, structured=True)
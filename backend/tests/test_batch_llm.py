@@ -0,0 +1,84 @@
+from app.core import batch_llm
+from app.core.batch_llm import parse_output_line
+
+
+def test_openai_success():
+    line = {"custom_id": "d0-p1-c2", "response": {"status_code": 200, "body": {
+        "choices": [{"message": {"content": '{"found": false}'}}]}}}
+    assert parse_output_line(line, "openai") == ("d0-p1-c2", '{"found": false}', None)
+
+
+def test_openai_failed_request():
+    body = {"error": {"message": "Rate limited"}}
+    line = {"custom_id": "d0-p1-c2", "response": {"status_code": 429, "body": body}}
+    assert parse_output_line(line, "openai") == ("d0-p1-c2", None, body)
+
+    error = {"code": "batch_expired", "message": "Expired"}
+    assert parse_output_line({"custom_id": "x", "response": None, "error": error}, "openai") == ("x", None, error)
+
+
+def test_openai_without_choices_or_content():
+    line = {"custom_id": "x", "response": {"status_code": 200, "body": {"choices": []}}}
+    assert parse_output_line(line, "openai") == ("x", "", None)
+    line = {"custom_id": "x", "response": {"status_code": 200, "body": {"choices": [{"message": {"content": None}}]}}}
+    assert parse_output_line(line, "openai") == ("x", "", None)
+
+
+def test_gemini_success_joins_parts():
+    line = {"key": "d1-p3-c0", "response": {"candidates": [{"content": {"parts": [{"text": '{"found": '}, {"text": "true}"}]}}]}}
+    assert parse_output_line(line, "gemini") == ("d1-p3-c0", '{"found": true}', None)
+
+
+def test_gemini_error_and_empty_response():
+    error = {"code": 400, "message": "Bad request"}
+    assert parse_output_line({"key": "k", "error": error}, "gemini") == ("k", None, error)
+    assert parse_output_line({"key": "k", "response": {"candidates": []}}, "gemini") == ("k", "", None)
+
+
+class _Response:
+    def __init__(self, payload=None, content=b""):
+        self.status_code = 200
+        self.text = ""
+        self.content = content
+        self._payload = payload
+
+    def json(self):
+        return self._payload
+
+
+def _gemini_download(monkeypatch, tmp_path, batch):
+    calls = []
+
+    def request(method, url, **kwargs):
+        calls.append((method, url, kwargs))
+        if url.endswith(":download"):
+            return _Response(content=b'{"key": "d0-p1-c0"}\n')
+        return _Response(batch)
+
+    monkeypatch.setattr(batch_llm, "GEMINI_API_KEY", "test-key")
+    monkeypatch.setattr(batch_llm.requests, "request", request)
+    output = tmp_path / "output.jsonl"
+    batch_llm.GeminiBatchBackend().download("batches/123", str(output))
+    return calls, output.read_bytes()
+
+
+def test_gemini_download(monkeypatch, tmp_path):
+    calls, content = _gemini_download(monkeypatch, tmp_path, {"response": {"responsesFile": "files/out-1"}})
+    assert content == b'{"key": "d0-p1-c0"}\n'
+    (_, batch_url, batch_kwargs), (method, url, kwargs) = calls
+    assert batch_url.endswith("/v1beta/batches/123")
+    assert batch_kwargs["params"] == {"key": "test-key"}
+    assert (method, url) == ("GET", f"{batch_llm.GEMINI_API_ROOT}/download/v1beta/files/out-1:download")
+    assert kwargs["params"] == {"alt": "media", "key": "test-key"}
+
+
+def test_gemini_download_from_metadata_output(monkeypatch, tmp_path):
+    calls, content = _gemini_download(monkeypatch, tmp_path, {"metadata": {"output": {"responsesFile": "files/out-2"}}})
+    assert calls[-1][1].endswith("/files/out-2:download")
+    assert content
+
+
+def test_gemini_download_without_output_file(monkeypatch, tmp_path):
+    calls, content = _gemini_download(monkeypatch, tmp_path, {"metadata": {"state": "BATCH_STATE_SUCCEEDED"}})
+    assert len(calls) == 1
+    assert content == b""
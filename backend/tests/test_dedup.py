@@ -0,0 +1,60 @@
+from app.core.dedup import MinHasher, cluster, dedupe_evidence, jaccard, shingles
+
+POLICY = "All access to member health information is logged and reviewed quarterly by the privacy officer"
+
+
+def test_shingles_of_short_text_is_one_shingle():
+    assert shingles("Access Logged") == frozenset(["access logged"])
+
+
+def test_jaccard():
+    a, b = shingles("one two three four"), shingles("two three four five")
+    assert jaccard(a, b) == 1 / 3
+    assert jaccard(frozenset(), frozenset()) == 1.0
+
+
+def test_cluster_groups_near_duplicates_under_first_index():
+    texts = [
+        POLICY,
+        "Backups are encrypted and tested every month by the infrastructure team",
+        POLICY + ".",
+        POLICY.replace("quarterly", "quarterly,") + " as required",
+    ]
+    assert cluster(texts, threshold=0.7, hasher=MinHasher(64), bands=16) == [0, 1, 0, 0]
+
+
+def test_cluster_keeps_dissimilar_texts_apart():
+    texts = ["alpha beta gamma delta epsilon", "zeta eta theta iota kappa", "lambda mu nu xi omicron"]
+    assert cluster(texts, threshold=0.8) == [0, 1, 2]
+
+
+def _result(criteria, page, evidence):
+    return {"criteria": criteria, "page": page, "evidence": evidence, "compliance_score": 90}
+
+
+def test_dedupe_evidence_folds_per_criterion():
+    results = [
+        _result("Access control", 1, POLICY),
+        _result("Privacy", 1, POLICY),
+        _result("Access control", 3, POLICY),
+        _result("Access control", 2, POLICY + "."),
+    ]
+    deduped = dedupe_evidence(results, threshold=0.8, enabled=True)
+    assert [(r["criteria"], r["page"], r["pages"]) for r in deduped] == [
+        ("Access control", 1, [1, 2, 3]),
+        ("Privacy", 1, [1]),
+    ]
+    # The inputs are not modified
+    assert "pages" not in results[0]
+
+
+def test_dedupe_evidence_disabled_keeps_every_result():
+    results = [_result("Access control", 1, POLICY), _result("Access control", 2, POLICY)]
+    deduped = dedupe_evidence(results, enabled=False)
+    assert [r["pages"] for r in deduped] == [[1], [2]]
+
+
+def test_dedupe_evidence_orders_non_integer_pages_last():
+    results = [_result("c", "appendix", POLICY), _result("c", "10", POLICY), _result("c", 2, POLICY), _result("c", None, POLICY)]
+    [deduped] = dedupe_evidence(results, enabled=True)
+    assert deduped["pages"] == [2, "10", "appendix"]
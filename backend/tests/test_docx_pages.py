@@ -0,0 +1,83 @@
+import io
+import zipfile
+
+import pytest
+
+from app.core.docx_pages import extract_docx_pages
+
+NS = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+
+
+def _docx(body: str, part: str = "word/document.xml", rels: bool = True) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        if rels:
+            archive.writestr("_rels/.rels", (
+                '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+                '<Relationship Id="rId1" Target="/' + part + '" '
+                'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"/>'
+                '</Relationships>'
+            ))
+        archive.writestr(part, f'<w:document {NS}><w:body>{body}</w:body></w:document>')
+    return buffer.getvalue()
+
+
+def _p(*runs: str) -> str:
+    return "<w:p>" + "".join(runs) + "</w:p>"
+
+
+def _r(text: str) -> str:
+    return f"<w:r><w:t>{text}</w:t></w:r>"
+
+
+PAGE_BREAK = '<w:r><w:br w:type="page"/></w:r>'
+
+
+def test_paragraphs_split_at_page_breaks():
+    body = _p(_r("Intro")) + _p(_r("Before"), PAGE_BREAK, _r("After")) + _p(_r("Closing"))
+    assert extract_docx_pages(_docx(body)) == [
+        {"page": 1, "text": "Intro\nBefore"},
+        {"page": 2, "text": "After\nClosing"},
+    ]
+
+
+def test_page_break_before_and_section_break():
+    body = (
+        _p(_r("One"))
+        + '<w:p><w:pPr><w:pageBreakBefore/></w:pPr>' + _r("Two") + '</w:p>'
+        + '<w:p><w:pPr><w:sectPr/></w:pPr>' + _r("Still two") + '</w:p>'
+        + _p(_r("Three"))
+        + '<w:p><w:pPr><w:pageBreakBefore w:val="false"/></w:pPr>' + _r("Also three") + '</w:p>'
+    )
+    assert [page["text"] for page in extract_docx_pages(_docx(body))] == ["One", "Two\nStill two", "Three\nAlso three"]
+
+
+def test_tables_become_rows_and_breaks_inside_them_are_ignored():
+    cell = lambda *paragraphs: "<w:tc>" + "".join(paragraphs) + "</w:tc>"
+    nested = "<w:tbl><w:tr>" + cell(_p(_r("inner a"))) + cell(_p(_r("inner b"))) + "</w:tr></w:tbl>"
+    table = (
+        "<w:tbl>"
+        + "<w:tr>" + cell(_p(_r("Control"))) + cell(_p(_r("Evidence"))) + "</w:tr>"
+        + "<w:tr>" + cell(_p(_r("AC-1")), _p(_r("Access"), PAGE_BREAK, _r(" policy"))) + cell(nested) + "</w:tr>"
+        + "<w:tr>" + cell(_p()) + cell(_p()) + "</w:tr>"
+        + "</w:tbl>"
+    )
+    pages = extract_docx_pages(_docx(_p(_r("Matrix")) + table))
+    assert pages == [{"page": 1, "text": "Matrix\nControl | Evidence\nAC-1 Access policy | inner a | inner b"}]
+
+
+def test_long_pages_are_cut_at_paragraphs():
+    body = "".join(_p(_r(f"Paragraph {i} " + "x" * 40)) for i in range(6))
+    pages = extract_docx_pages(_docx(body), max_chars=100)
+    assert [page["text"].count("\n") + 1 for page in pages] == [2, 2, 2]
+    assert pages[-1]["text"].startswith("Paragraph 4")
+
+
+def test_main_part_is_found_through_package_relationships():
+    assert extract_docx_pages(_docx(_p(_r("Moved")), part="word/document2.xml"))[0]["text"] == "Moved"
+    assert extract_docx_pages(_docx(_p(_r("Default")), rels=False))[0]["text"] == "Default"
+
+
+def test_invalid_docx():
+    with pytest.raises(ValueError):
+        extract_docx_pages(b"not a zip")
@@ -0,0 +1,31 @@
+"""
+EXPLAIN regression test for the hot API queries (migrate.py explain as a test).
+
+Needs a disposable Postgres: set TEST_DATABASE_URL to run it; migrations are
+applied to that database first. Skipped otherwise.
+"""
+import os
+
+import pytest
+
+import migrate
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+pytestmark = pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL is not set")
+
+
+@pytest.fixture(scope="module")
+def conn():
+    migrate.apply_migrations(TEST_DATABASE_URL)
+    with migrate.explain_connection(TEST_DATABASE_URL) as conn:
+        yield conn
+
+
+@pytest.mark.parametrize("label, sql, params", [
+    pytest.param(label, sql, params, id=label) for label, sql, params in migrate._explain_checks()
+])
+def test_hot_query_uses_an_index(conn, label, sql, params):
+    seq_scans, indexes = migrate.explain_plan(conn, sql, params)
+    assert not seq_scans, f"{label}: sequential scan on {', '.join(seq_scans)}"
+    assert indexes
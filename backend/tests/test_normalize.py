@@ -0,0 +1,52 @@
+from app.core.normalize import collapse_whitespace, strip_boilerplate
+
+
+def _page(number, body):
+    return {"page": number, "text": "\n".join([
+        "ACME Health Plan   Confidential",
+        f"Policy Manual v{number}.0",
+        *body,
+        f"Page {number} of 3",
+    ])}
+
+
+PAGES = [
+    _page(1, ["Members may appeal a denial within 60 days.", "ACME Health Plan   Confidential"]),
+    _page(2, ["Appeals are decided by a clinician.", "Reviews   happen\t monthly."]),
+    _page(3, ["Decisions are sent in writing."]),
+]
+
+
+def test_strip_boilerplate_removes_repeated_edge_lines_and_page_numbers():
+    pages, report = strip_boilerplate(PAGES, edge=2, min_fraction=0.5, min_pages=3)
+    assert pages[0]["text"] == "Members may appeal a denial within 60 days."
+    assert pages[1]["text"] == "Appeals are decided by a clinician.\nReviews happen monthly."
+    assert pages[2]["text"] == "Decisions are sent in writing."
+    assert pages[0]["page"] == 1
+    assert report["lines_removed"] == 10
+    assert report["tokens_removed"] == report["tokens_before"] - report["tokens_after"] > 0
+
+
+def test_strip_boilerplate_keeps_body_lines():
+    # The repeated line sits in the body of the page, beyond the edge lines
+    pages = [{"page": i, "text": f"Intro {i}\nfirst\nsecond\nThis line repeats\nthird\nfourth\nOutro {i}"} for i in range(4)]
+    stripped, report = strip_boilerplate(pages, edge=1, min_fraction=0.5, min_pages=3)
+    assert all("This line repeats" in page["text"] for page in stripped)
+
+
+def test_strip_boilerplate_needs_min_pages():
+    stripped, _ = strip_boilerplate(PAGES[:2], edge=2, min_fraction=0.5, min_pages=3)
+    assert stripped[0]["text"].startswith("ACME Health Plan Confidential")
+    # Bare page numbers go regardless
+    assert "Page 1 of 3" not in stripped[0]["text"]
+
+
+def test_strip_boilerplate_with_no_edge_only_collapses_whitespace():
+    stripped, report = strip_boilerplate(PAGES, edge=0)
+    assert report["lines_removed"] == 0
+    assert stripped[1]["text"].splitlines()[-2] == "Reviews happen monthly."
+
+
+def test_collapse_whitespace():
+    assert collapse_whitespace("  a   b\n\n\n\n c  ") == "a b\n\nc"
+    assert collapse_whitespace(None) == ""
@@ -0,0 +1,71 @@
+import threading
+import time
+
+from app.core.scheduler import AuditScheduler, RateLimiter
+
+
+def _run_queued(submissions):
+    """Order in which a single-worker scheduler runs submissions queued while it is busy"""
+    scheduler = AuditScheduler(max_workers=1, requests_per_second=0)
+    started, release, order = threading.Event(), threading.Event(), []
+    blocker = scheduler.submit(lambda: (started.set(), release.wait()))
+    started.wait(5)
+    futures = [submit(scheduler, order) for submit in submissions]
+    release.set()
+    for future in [blocker] + futures:
+        future.result(5)
+    scheduler.shutdown()
+    return order
+
+
+def _llm(name, flow, weight=1.0):
+    return lambda scheduler, order: scheduler.submit_llm(order.append, name, flow=flow, weight=weight)
+
+
+def test_flows_are_interleaved_rather_than_first_come_first_served():
+    order = _run_queued([_llm(f"a{i}", "a") for i in range(4)] + [_llm(f"b{i}", "b") for i in range(2)])
+    assert order == ["a0", "b0", "a1", "b1", "a2", "a3"]
+
+
+def test_weight_gives_a_flow_a_larger_share():
+    order = _run_queued([_llm(f"a{i}", "a") for i in range(3)] + [_llm(f"b{i}", "b", weight=2) for i in range(4)])
+    assert order == ["b0", "a0", "b1", "b2", "a1", "b3", "a2"]
+
+
+def test_non_llm_work_goes_ahead_of_queued_llm_calls():
+    order = _run_queued([_llm("a0", "a"), _llm("a1", "a"),
+                         lambda scheduler, order: scheduler.submit(order.append, "extract")])
+    assert order == ["extract", "a0", "a1"]
+
+
+def test_skip_if_resolves_to_none_without_calling():
+    scheduler = AuditScheduler(max_workers=1, requests_per_second=0)
+    called = []
+    assert scheduler.submit_llm(called.append, 1, skip_if=lambda: True).result(5) is None
+    assert called == []
+    scheduler.shutdown()
+
+
+def test_rate_limiter_spaces_out_tokens_after_the_burst():
+    limiter = RateLimiter(20, burst=2)
+    start = time.monotonic()
+    for _ in range(6):
+        limiter.acquire()
+    # Two tokens up front, then one every 50 ms
+    assert 0.18 <= time.monotonic() - start < 1.0
+
+
+def test_rate_limiter_allows_the_burst_at_once():
+    limiter = RateLimiter(1, burst=3)
+    start = time.monotonic()
+    for _ in range(3):
+        limiter.acquire()
+    assert time.monotonic() - start < 0.1
+
+
+def test_rate_limiter_disabled():
+    limiter = RateLimiter(0)
+    start = time.monotonic()
+    for _ in range(1000):
+        limiter.acquire()
+    assert time.monotonic() - start < 0.1
@@ -0,0 +1,24 @@
+from app.core.audit import StopPolicy
+
+CRITERION = {"criteria": "Access control", "category": "Security", "description": "Access is restricted", "factor": "AC"}
+
+
+def test_stop_policy():
+    policy = StopPolicy([{**CRITERION, "stop_policy": {"findings": 2, "min_compliance_score": 80}},
+                         {**CRITERION, "criteria": "Unbounded"}])
+    unbounded = {**CRITERION, "criteria": "Unbounded"}
+
+    policy.record(CRITERION, {"compliance_score": 90})
+    policy.record(CRITERION, {"compliance_score": 50})
+    policy.record(CRITERION, {"compliance_score": "n/a"})
+    policy.record(CRITERION, None)
+    assert not policy.satisfied(CRITERION)
+    assert not policy.skip(CRITERION)
+
+    policy.record(CRITERION, {"compliance_score": "80"})
+    assert policy.satisfied(CRITERION)
+    assert policy.skip(CRITERION)
+
+    for _ in range(5):
+        policy.record(unbounded, {"compliance_score": 100})
+    assert not policy.satisfied(unbounded)
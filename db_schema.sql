@@ -83,6 +83,7 @@ CREATE TABLE IF NOT EXISTS intelliaudit_dev.audit_requests (
   compliance_score NUMERIC,    -- e.g., 75.0
   risk_assessment TEXT,        -- Low Risk, Medium Risk, High Risk
   final_comments TEXT,
+  priority SMALLINT NOT NULL DEFAULT 1 CONSTRAINT audit_requests_priority_range CHECK (priority BETWEEN 1 AND 10),  -- LLM scheduling weight
   created_by UUID,
   updated_by UUID,
   created_at TIMESTAMP DEFAULT now(),
@@ -156,10 +157,12 @@ CREATE TABLE IF NOT EXISTS intelliaudit_dev.evidence (
   evidence_id UUID PRIMARY KEY,
   audit_request_id UUID REFERENCES intelliaudit_dev.audit_requests(audit_request_id),
   document_id UUID REFERENCES intelliaudit_dev.documents(document_id),
+  evidence_key TEXT,           -- md5(criterion | page | md5(extracted_text)), unique per document
   audit_area TEXT,
   checklist_item TEXT,
   criteria JSONB,
   page_number INT,
+  pages INT[],                -- every page near-duplicate evidence was found on (page_number is the first)
   extracted_text TEXT,
   ai_explanation JSONB,       -- highlight, logic, confidence
   confidence_score NUMERIC,   -- e.g., 95.0
@@ -167,6 +170,8 @@ CREATE TABLE IF NOT EXISTS intelliaudit_dev.evidence (
   reviewed_by UUID,
   review_status TEXT,         -- approved, rejected, pending
   reviewed_at TIMESTAMP,
+  remarks TEXT,               -- LLM remarks / recommendations
+  risk_level TEXT,            -- Low, Medium, High, Critical
   created_by UUID,
   updated_by UUID,
   created_at TIMESTAMP DEFAULT now(),
@@ -248,6 +253,23 @@ CREATE TABLE IF NOT EXISTS intelliaudit_dev.audit_progress (
   created_at TIMESTAMP DEFAULT now()
 );
 
+-- =========================
+-- Table: audit_checkpoints
+-- Purpose: Completed (page, criterion) evaluations of unfinished audit runs, so an interrupted audit resumes without repeating LLM calls. Cleared once the document's evidence is persisted.
+-- =========================
+CREATE TABLE IF NOT EXISTS intelliaudit_dev.audit_checkpoints (
+  audit_request_id UUID NOT NULL REFERENCES intelliaudit_dev.audit_requests(audit_request_id) ON DELETE CASCADE,
+  document_id UUID NOT NULL REFERENCES intelliaudit_dev.documents(document_id) ON DELETE CASCADE,
+  page_number INT NOT NULL,
+  criteria TEXT NOT NULL,      -- criterion text, as in evidence.criteria->>'criteria'
+  page_hash TEXT NOT NULL,     -- md5 of the page text the result was computed from
+  model TEXT,
+  provider TEXT,
+  result JSONB,                -- evaluation result; NULL when the page had no evidence
+  created_at TIMESTAMP DEFAULT now(),
+  PRIMARY KEY (audit_request_id, document_id, page_number, criteria)
+);
+
 -- =========================
 -- Table: user_activity_log
 -- Purpose: Detailed user activity log for audit trail and compliance. Tracks user actions, details, and timestamps for each audit.
@@ -288,6 +310,16 @@ CREATE INDEX IF NOT EXISTS idx_audit_request_areas_request_area ON intelliaudit_
 CREATE INDEX IF NOT EXISTS idx_documents_ai_classification ON intelliaudit_dev.documents USING GIN (ai_classification);
 CREATE INDEX IF NOT EXISTS idx_evidence_ai_explanation ON intelliaudit_dev.evidence USING GIN (ai_explanation);
 CREATE INDEX IF NOT EXISTS idx_evidence_category_col ON intelliaudit_dev.evidence USING GIN (category_col);
+-- Keyset pagination for evidence listings (per audit, and per audit + document)
+CREATE INDEX IF NOT EXISTS idx_evidence_audit_created ON intelliaudit_dev.evidence(audit_request_id, created_at, evidence_id);
+CREATE INDEX IF NOT EXISTS idx_evidence_audit_document_created ON intelliaudit_dev.evidence(audit_request_id, document_id, created_at, evidence_id);
+CREATE UNIQUE INDEX IF NOT EXISTS uq_evidence_audit_document_key ON intelliaudit_dev.evidence(audit_request_id, document_id, evidence_key);
+-- Per-audit child listings (also shipped as backend/migrations/0001_hot_path_indexes.sql)
+CREATE INDEX IF NOT EXISTS idx_documents_audit_request ON intelliaudit_dev.documents(audit_request_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_audit_findings_audit_request ON intelliaudit_dev.audit_findings(audit_request_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_reports_audit_request ON intelliaudit_dev.reports(audit_request_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_audit_logs_related ON intelliaudit_dev.audit_logs(related_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_audit_progress_audit_request ON intelliaudit_dev.audit_progress(audit_request_id, updated_at);
 
 -- =========================
 -- Table: config_metadata_types
@@ -535,4 +567,8 @@ CREATE INDEX IF NOT EXISTS idx_projects_audit_frameworks_project ON intelliaudit
 CREATE INDEX IF NOT EXISTS idx_projects_audit_frameworks_framework ON intelliaudit_dev.projects_audit_frameworks(aud_frmwk_id);
 CREATE INDEX IF NOT EXISTS idx_projects_users_project ON intelliaudit_dev.projects_users(project_id);
 CREATE INDEX IF NOT EXISTS idx_projects_users_framework ON intelliaudit_dev.projects_users(aud_frmwk_id);
-CREATE INDEX IF NOT EXISTS idx_projects_users_user ON intelliaudit_dev.projects_users(user_uid);
\ No newline at end of file
+CREATE INDEX IF NOT EXISTS idx_projects_users_user ON intelliaudit_dev.projects_users(user_uid);
+
+-- Configuration hierarchy: process areas, controls and criteria are already covered by their
+-- UNIQUE(parent_id, code) constraints; assessment rules have no such constraint
+CREATE INDEX IF NOT EXISTS idx_config_assessment_rules_criteria ON intelliaudit_dev.config_assessment_rules(criteria_id, rule_name);